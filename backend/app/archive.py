@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import os
+import socket
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from .columnar import write_columnar
+from .database import StorageBackend, get_database, update_rows_digest, EXECUTION_COLUMNS
+
+def month_bounds(month: str) -> Tuple[datetime, datetime]:
+    """Inicio y fin (exclusivo) de un mes 'YYYY-MM'"""
+    year, number = (int(part) for part in month.split("-"))
+    start = datetime(year, number, 1)
+    end = datetime(year + number // 12, number % 12 + 1, 1)
+    return start, end
+
+def retention_cutoff(now: datetime, months: int) -> datetime:
+    """Primer día del mes más antiguo que se conserva en la tabla viva"""
+    index = now.year * 12 + (now.month - 1) - months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+def _timestamp(value: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(value).isoformat() if value else None
+
+class ExecutionArchiver:
+    """Mueve los meses fuera de la retención a archivos columnares comprimidos
+    
+    Los agregados (workflow_execution_stats, execution_buckets) no se tocan, así
+    que estadísticas y series temporales siguen incluyendo lo archivado.
+    """
+    
+    LEASE_NAME = "execution-archive"
+    
+    def __init__(self, db: StorageBackend, archive_dir: str, retention_months: int = 0,
+                 interval: float = 3600, row_group_size: int = 50000,
+                 lease_ttl: Optional[float] = None):
+        self.db = db
+        self.archive_dir = archive_dir
+        self.retention_months = retention_months
+        self.interval = interval
+        self.row_group_size = row_group_size
+        self.lease_ttl = lease_ttl or interval * 2
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._task: Optional[asyncio.Task] = None
+        
+        self.is_leader = False
+        self.last_run_finished_at: Optional[float] = None
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+    
+    @property
+    def enabled(self) -> bool:
+        return self.retention_months > 0 and self.interval > 0
+    
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+    
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self.is_leader:
+            await asyncio.to_thread(self.db.release_lease, self.LEASE_NAME, self.owner)
+            self.is_leader = False
+    
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Error archivando ejecuciones: {e}")
+            await asyncio.sleep(self.interval)
+    
+    async def run_once(self) -> bool:
+        """Archivar si este proceso tiene el lease; devuelve si se ejecutó"""
+        self.is_leader = await asyncio.to_thread(
+            self.db.try_acquire_lease, self.LEASE_NAME, self.owner, self.lease_ttl
+        )
+        if not self.is_leader:
+            return False
+        
+        try:
+            self.last_result = await asyncio.to_thread(self.archive_expired)
+            self.last_error = None
+        finally:
+            self.last_run_finished_at = time.time()
+        return True
+    
+    def archive_expired(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Archivar todos los meses anteriores al corte de retención"""
+        cutoff = retention_cutoff(now or datetime.now(), self.retention_months)
+        archived: List[Dict[str, Any]] = []
+        for month in self.db.get_execution_months(cutoff):
+            result = self.archive_month(month)
+            if result:
+                archived.append(result)
+        return {"cutoff": cutoff.isoformat(), "months": archived}
+    
+    def archive_month(self, month: str) -> Optional[Dict[str, Any]]:
+        """Escribir un mes a disco y, si coincide fila a fila, quitarlo de la tabla viva"""
+        start, end = month_bounds(month)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        # Un mes puede archivarse en varias partes si llegan ejecuciones atrasadas
+        path = os.path.abspath(os.path.join(
+            self.archive_dir, f"executions-{month}-{int(time.time() * 1000)}.cols.gz"
+        ))
+        
+        # Hash de lo exportado: antes de borrar se compara contra el contenido actual
+        digest = hashlib.sha256()
+        
+        def rows():
+            for batch in self.db.iter_execution_rows(start, end, batch_size=self.row_group_size):
+                update_rows_digest(digest, batch)
+                yield batch
+        
+        info = write_columnar(path, EXECUTION_COLUMNS, rows())
+        if info["rows"] == 0:
+            os.remove(path)
+            return None
+        
+        try:
+            self.db.archive_execution_range(start, end, {
+                "path": path,
+                "month": month,
+                "rows": info["rows"],
+                "min_start_time": info["min_time"],
+                "max_start_time": info["max_time"],
+                "digest": digest.hexdigest(),
+            })
+        except Exception:
+            os.remove(path)
+            raise
+        return {"month": month, "rows": info["rows"], "bytes": info["bytes"], "path": path}
+    
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "retention_months": self.retention_months,
+            "interval_seconds": self.interval,
+            "archive_dir": os.path.abspath(self.archive_dir),
+            "is_leader": self.is_leader,
+            "last_run_finished_at": _timestamp(self.last_run_finished_at),
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+_execution_archiver: Optional[ExecutionArchiver] = None
+
+def get_execution_archiver() -> ExecutionArchiver:
+    """Archivador compartido por todo el proceso"""
+    global _execution_archiver
+    if _execution_archiver is None:
+        _execution_archiver = ExecutionArchiver(
+            get_database(),
+            archive_dir=os.getenv("ARCHIVE_DIR", "./archive"),
+            retention_months=int(os.getenv("EXECUTION_RETENTION_MONTHS", 0)),
+            interval=float(os.getenv("ARCHIVE_INTERVAL_SECONDS", 3600))
+        )
+    return _execution_archiver
+
+async def close_execution_archiver():
+    global _execution_archiver
+    if _execution_archiver is not None:
+        await _execution_archiver.stop()
+        _execution_archiver = None
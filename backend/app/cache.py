@@ -0,0 +1,123 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+class _Flight:
+    """Cálculo en curso de una clave; los demás hilos esperan su resultado"""
+    __slots__ = ("event", "value", "error")
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+class TTLCache:
+    """LRU acotado con TTL por clave, invalidación por etiquetas y un solo cálculo por clave"""
+    
+    def __init__(self, max_entries: int = 1024, default_ttl: float = 10.0):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        # clave -> (vence, valor, etiquetas)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.coalesced = 0
+    
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any],
+                       ttl: Optional[float] = None, tags: Iterable[str] = ()) -> Any:
+        """Devolver el valor cacheado o calcularlo (una sola vez aunque haya concurrencia)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.expirations += 1
+            
+            self.misses += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                generation = self._generation
+            else:
+                self.coalesced += 1
+        
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        
+        try:
+            flight.value = compute()
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                # Si hubo una invalidación durante el cálculo el valor puede estar viejo
+                if flight.error is None and generation == self._generation:
+                    expires = time.monotonic() + (ttl if ttl is not None else self.default_ttl)
+                    self._entries[key] = (expires, flight.value, tuple(tags))
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+            flight.event.set()
+    
+    def invalidate(self, *tags: str):
+        """Eliminar las entradas con alguna de las etiquetas (todas si no se indica ninguna)"""
+        wanted = set(tags)
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, (_, _, entry_tags) in self._entries.items()
+                     if not wanted or wanted.intersection(entry_tags)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+def cached(tags: Tuple[str, ...], ttl: Optional[float] = None):
+    """Cachear un método de lectura en self.cache (si la instancia tiene cache)"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache: Optional[TTLCache] = getattr(self, "cache", None)
+            if cache is None:
+                return method(self, *args, **kwargs)
+            key = (method.__name__, args, tuple(sorted(kwargs.items())))
+            return cache.get_or_compute(
+                key, lambda: method(self, *args, **kwargs), ttl=ttl, tags=tags
+            )
+        # Permite volver a decorar el método original (p.ej. para medirlo)
+        wrapper.cache_options = (tags, ttl)
+        return wrapper
+    return decorator
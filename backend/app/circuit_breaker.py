@@ -0,0 +1,82 @@
+import time
+from typing import Any, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """Circuit breaker para un servicio externo (un solo event loop, sin locks)
+    
+    closed: las llamadas pasan y se cuentan los fallos seguidos.
+    open: tras failure_threshold fallos se rechaza todo durante reset_timeout s.
+    half_open: pasado ese tiempo se deja pasar una llamada de prueba; si sale
+    bien el circuito se cierra y si falla vuelve a abrirse.
+    """
+    
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_failure: Optional[str] = None
+        self.transitions: Dict[str, int] = {CLOSED: 0, OPEN: 0, HALF_OPEN: 0}
+        self._probe_started_at: Optional[float] = None
+    
+    def _transition(self, state: str):
+        if state != self.state:
+            self.state = state
+            self.transitions[state] += 1
+    
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN
+    
+    def allow_request(self) -> bool:
+        """Si la llamada puede salir; en half_open sólo pasa una prueba a la vez"""
+        now = time.monotonic()
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if now - self.opened_at < self.reset_timeout:
+                return False
+            self._transition(HALF_OPEN)
+            self._probe_started_at = None
+        # Una prueba que nunca terminó (p.ej. cancelada) no bloquea el circuito para siempre
+        if self._probe_started_at is None or now - self._probe_started_at >= self.reset_timeout:
+            self._probe_started_at = now
+            return True
+        return False
+    
+    def record_success(self):
+        self.consecutive_failures = 0
+        self._probe_started_at = None
+        self._transition(CLOSED)
+    
+    def record_failure(self, reason: str):
+        self.consecutive_failures += 1
+        self.last_failure = reason
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._probe_started_at = None
+            self._transition(OPEN)
+    
+    def retry_after(self) -> float:
+        """Segundos hasta la próxima llamada de prueba"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+    
+    def status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout_seconds": self.reset_timeout,
+            "retry_after_seconds": round(self.retry_after(), 1),
+            "last_failure": self.last_failure,
+            "transitions": dict(self.transitions),
+        }
@@ -0,0 +1,65 @@
+import gzip
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Archivo gzip con una línea de cabecera y luego un grupo de filas por línea.
+# Cada grupo guarda sus columnas como listas (más compresible que fila a fila)
+# junto con el rango de start_time, para saltar grupos sin mirar sus filas.
+COLUMNAR_FORMAT = "columnar-json"
+COLUMNAR_VERSION = 1
+
+def write_columnar(path: str, columns: Sequence[str], row_groups: Iterable[List[Tuple]],
+                   time_column: str = "start_time") -> Dict[str, Any]:
+    """Escribir grupos de filas (tuplas en el orden de columns) de forma atómica"""
+    time_index = list(columns).index(time_column)
+    rows = 0
+    min_time: Optional[str] = None
+    max_time: Optional[str] = None
+    tmp_path = f"{path}.tmp"
+    
+    with open(tmp_path, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as gz:
+            header = {"format": COLUMNAR_FORMAT, "version": COLUMNAR_VERSION,
+                      "columns": list(columns)}
+            gz.write((json.dumps(header) + "\n").encode())
+            for group in row_groups:
+                if not group:
+                    continue
+                times = [row[time_index] for row in group]
+                group_min, group_max = min(times), max(times)
+                gz.write((json.dumps({
+                    "rows": len(group),
+                    "min_time": group_min,
+                    "max_time": group_max,
+                    "data": {column: [row[i] for row in group] for i, column in enumerate(columns)},
+                }, separators=(",", ":")) + "\n").encode())
+                rows += len(group)
+                min_time = group_min if min_time is None else min(min_time, group_min)
+                max_time = group_max if max_time is None else max(max_time, group_max)
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, path)
+    
+    return {"rows": rows, "min_time": min_time, "max_time": max_time,
+            "bytes": os.path.getsize(path)}
+
+def read_columnar(path: str, start_time: Optional[datetime] = None,
+                  end_time: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+    """Filas (dict) de un archivo columnar; omite los grupos fuera de [start_time, end_time)"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("format") != COLUMNAR_FORMAT:
+            raise ValueError(f"Formato de archivo desconocido: {path}")
+        columns = header["columns"]
+        
+        for line in f:
+            group = json.loads(line)
+            if start_time and datetime.fromisoformat(group["max_time"]) < start_time:
+                continue
+            if end_time and datetime.fromisoformat(group["min_time"]) >= end_time:
+                continue
+            data = group["data"]
+            for values in zip(*(data[column] for column in columns)):
+                yield dict(zip(columns, values))
@@ -0,0 +1,27 @@
+import os
+import threading
+
+# backend/.env, sin depender del directorio desde el que se arranque
+ENV_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env")
+
+_loaded = False
+_lock = threading.Lock()
+
+def load_config():
+    """Cargar backend/.env una sola vez, la primera vez que se necesita configuración
+    
+    Las variables ya definidas en el entorno tienen prioridad sobre el archivo.
+    """
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            # Import diferido: importar un módulo de la app no debe leer archivos
+            from dotenv import load_dotenv
+            load_dotenv(ENV_FILE)
+            _loaded = True
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """Variable de entorno booleana ('true' / 'false')"""
+    return os.getenv(name, str(default)).lower() == "true"
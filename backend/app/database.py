@@ -1,25 +1,930 @@
+import abc
+import base64
+import hashlib
+import heapq
+import inspect
 import sqlite3
 import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import List, Optional
-from .models import Workflow, Execution, DashboardStats, ChartData
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from .models import (
+    Workflow, Execution, DashboardStats, ChartData, WorkflowAnalytics, AnalyticsWindow, DurationSummary
+)
+from .cache import TTLCache, cached
+from .columnar import read_columnar
+from .sketch import MIN_INDEXABLE_VALUE, DDSketch, merge_sketches, summarize_sketch
+from .serialization import (
+    EXECUTION_FIELDS, WORKFLOW_FIELDS, encode_executions, encode_execution_models, encode_workflows
+)
+from .config import load_config, env_flag
+from .metrics import DB_QUERY_DURATION, DB_QUERY_ERRORS, timed
 import random
 
-class Database:
-    def __init__(self, db_path: str = "business_automation.db"):
-        self.db_path = db_path
-        self.init_database()
-        self.seed_sample_data()
+# PRAGMAs aplicados a cada conexión nueva del pool
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA mmap_size = 134217728",
+    "PRAGMA busy_timeout = 5000",
+)
+
+# Columnas de executions; la proyección compacta omite las de texto libre
+EXECUTION_COLUMNS = (
+    "id", "workflow_id", "workflow_name", "n8n_execution_id", "status", "start_time",
+    "end_time", "duration", "triggered_by", "data_processed", "error_message",
+)
+EXECUTION_COMPACT_COLUMNS = tuple(c for c in EXECUTION_COLUMNS if c != "error_message")
+
+def execution_json_columns(include_error: bool = True) -> List[str]:
+    """Columnas en el orden de EXECUTION_FIELDS para encode_executions"""
+    return [c if include_error or c != "error_message" else f"NULL AS {c}" for c in EXECUTION_FIELDS]
+
+# Largo del prefijo ISO de start_time que identifica cada bucket
+BUCKET_RESOLUTIONS = {
+    "minute": 16,  # 2024-01-30T16:30
+    "hour": 13,    # 2024-01-30T16
+    "day": 10,     # 2024-01-30
+}
+BUCKET_STEPS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+# Sketches de duración por workflow: el acumulado (resolution 'all', bucket '')
+# y uno por hora y por día para las ventanas, borrados pasada su retención
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_RETENTION = {
+    "hour": timedelta(days=2),
+    "day": timedelta(days=31),
+}
+
+# Ventanas de analytics: (largo, resolución de los contadores, resolución de los sketches)
+ANALYTICS_WINDOWS = {
+    "1h": (timedelta(hours=1), "minute", "hour"),
+    "24h": (timedelta(days=1), "hour", "hour"),
+    "7d": (timedelta(days=7), "day", "day"),
+    "30d": (timedelta(days=30), "day", "day"),
+}
+
+def bucket_key(value: datetime, resolution: str) -> str:
+    """Clave de bucket para un instante, p.ej. '2024-01-30T16' en resolución hour"""
+    return value.isoformat()[:BUCKET_RESOLUTIONS[resolution]]
+
+def to_local_naive(value: datetime) -> datetime:
+    """Los timestamps se guardan en hora local sin zona; normalizar los que traen zona"""
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+def truncate_to_bucket(value: datetime, resolution: str) -> datetime:
+    """Inicio del bucket que contiene el instante dado"""
+    value = value.replace(second=0, microsecond=0)
+    if resolution in ("hour", "day"):
+        value = value.replace(minute=0)
+    if resolution == "day":
+        value = value.replace(hour=0)
+    return value
+
+def bucket_key_sql(column: str, resolution: str) -> str:
+    """Expresión SQL equivalente a bucket_key (acepta 'T' o espacio como separador)"""
+    return f"replace(substr({column}, 1, {BUCKET_RESOLUTIONS[resolution]}), ' ', 'T')"
+
+def time_range_sql(column: str) -> str:
+    """Condición [inicio, fin) sobre un timestamp guardado con 'T' o con espacio
     
-    def get_connection(self):
-        conn = sqlite3.connect(self.db_path)
+    El espacio ordena antes que 'T': el rango crudo (que usa el índice) abarca
+    los dos formatos y replace() deja solo las filas del intervalo.
+    """
+    normalized = f"replace({column}, ' ', 'T')"
+    return f"{column} >= ? AND {column} < ? AND {normalized} >= ? AND {normalized} < ?"
+
+def time_range_params(start_time: datetime, end_time: datetime) -> Tuple[str, str, str, str]:
+    """Parámetros de time_range_sql"""
+    return (start_time.isoformat(" "), end_time.isoformat(),
+            start_time.isoformat(), end_time.isoformat())
+
+def update_rows_digest(digest: Any, rows: Iterable[Sequence[Any]]):
+    """Sumar filas (todas sus columnas, en orden) a un hash de contenido"""
+    for row in rows:
+        digest.update(repr(tuple(row)).encode())
+
+def encode_cursor(start_time: str, execution_id: str) -> str:
+    """Cursor opaco de paginación a partir de la última fila entregada"""
+    raw = json.dumps([start_time, execution_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> List[str]:
+    """Inverso de encode_cursor; ValueError si el cursor no es válido"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        start_time, execution_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise ValueError("Cursor inválido")
+    return [str(start_time), str(execution_id)]
+
+def pending_execution_events(executions: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Evento vigente por n8n_execution_id: el último, salvo que ya haya uno success/error"""
+    pending = {}
+    for e in executions:
+        current = pending.get(e["n8n_execution_id"])
+        if current is None or current["status"] not in ("success", "error"):
+            pending[e["n8n_execution_id"]] = e
+    return pending
+
+def execution_event_updates(pending: Dict[str, Dict[str, Any]],
+                            rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Cambios de estado (como los de update_execution_statuses) para las filas en curso"""
+    updates = []
+    for row in rows:
+        event = pending[row["n8n_execution_id"]]
+        if event["status"] == row["status"]:
+            continue
+        start_time = row["start_time"]
+        if isinstance(start_time, str):
+            start_time = datetime.fromisoformat(start_time)
+        end_time = datetime.fromisoformat(event["end_time"]) if event["end_time"] else None
+        updates.append({
+            "id": row["id"],
+            "workflow_id": row["workflow_id"],
+            "start_time": row["start_time"],
+            "status": event["status"],
+            "end_time": end_time,
+            # La duración se mide desde el inicio registrado, no desde el del evento
+            "duration": (end_time - start_time).total_seconds() * 1000 if end_time else None,
+            "error_message": event["error_message"],
+            # 0 = el evento no lo informa: se conserva el valor del inicio
+            "data_processed": event["data_processed"] or None,
+        })
+    return updates
+
+def start_bucket_key(start_time: Any, resolution: str) -> str:
+    """bucket_key de un start_time que puede venir como datetime o como texto ISO"""
+    text = start_time.isoformat() if isinstance(start_time, datetime) else str(start_time)
+    return text[:BUCKET_RESOLUTIONS[resolution]].replace(" ", "T")
+
+def sketch_cutoffs(now: datetime) -> Dict[str, str]:
+    """Primer bucket que se conserva de cada resolución de sketch"""
+    return {resolution: bucket_key(now - keep, resolution)
+            for resolution, keep in SKETCH_RETENTION.items()}
+
+def duration_samples(executions: Iterable[Dict[str, Any]]) -> Dict[Tuple[str, str, str], List[float]]:
+    """Duraciones de ejecuciones terminadas por sketch (resolution, bucket, workflow_id)"""
+    cutoffs = sketch_cutoffs(datetime.now())
+    samples: Dict[Tuple[str, str, str], List[float]] = {}
+    for e in executions:
+        duration = e.get("duration")
+        if duration is None or duration < 0 or e["status"] not in ("success", "error"):
+            continue
+        keys = [("all", "", e["workflow_id"])]
+        for resolution, cutoff in cutoffs.items():
+            # Las importaciones viejas sólo suman al acumulado
+            bucket = start_bucket_key(e["start_time"], resolution)
+            if bucket >= cutoff:
+                keys.append((resolution, bucket, e["workflow_id"]))
+        for key in keys:
+            samples.setdefault(key, []).append(float(duration))
+    return samples
+
+def updated_sketches(samples: Dict[Tuple[str, str, str], List[float]],
+                     stored: Dict[Tuple[str, str, str], bytes]) -> List[Dict[str, Any]]:
+    """Filas de workflow_duration_sketches con las muestras sumadas a lo guardado"""
+    rows = []
+    for key, values in samples.items():
+        blob = stored.get(key)
+        sketch = DDSketch.from_bytes(blob) if blob else DDSketch(SKETCH_RELATIVE_ACCURACY)
+        for value in values:
+            sketch.add(value)
+        rows.append(sketch_row(key, sketch))
+    return rows
+
+def sketches_from_bins(rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Filas de sketches desde bins agregados en SQL
+    
+    Cada fila es (resolution, bucket, workflow_id, bin, cantidad, suma, mínimo, máximo).
+    """
+    sketches: Dict[Tuple[str, str, str], DDSketch] = {}
+    for resolution, bucket, workflow_id, key, count, total, low, high in rows:
+        sketch = sketches.get((resolution, bucket, workflow_id))
+        if sketch is None:
+            sketch = sketches[(resolution, bucket, workflow_id)] = DDSketch(SKETCH_RELATIVE_ACCURACY)
+        sketch.add_bin(key, count, total, low, high)
+    return [sketch_row(key, sketch) for key, sketch in sketches.items()]
+
+def sketch_row(key: Tuple[str, str, str], sketch: DDSketch) -> Dict[str, Any]:
+    resolution, bucket, workflow_id = key
+    return {"resolution": resolution, "bucket": bucket, "workflow_id": workflow_id,
+            "samples": sketch.count, "total_duration": sketch.sum, "sketch": sketch.to_bytes()}
+
+def analytics_cutoffs(now: datetime) -> Dict[str, str]:
+    """Primer bucket a leer de cada resolución para cubrir todas las ventanas"""
+    cutoffs: Dict[str, str] = {}
+    for length, counts, sketches in ANALYTICS_WINDOWS.values():
+        for resolution in (counts, sketches):
+            key = bucket_key(now - length, resolution)
+            cutoffs[resolution] = min(cutoffs.get(resolution, key), key)
+    return cutoffs
+
+class ConnectionPool:
+    """Pool acotado de conexiones SQLite reutilizables entre peticiones"""
+
+    def __init__(self, db_path: str, size: int = 5, timeout: float = 30.0,
+                 cached_statements: int = 256):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._waits = 0
+        self._wait_seconds = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
         conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
         return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Tomar una conexión libre, creando una nueva si hay cupo"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("El pool de conexiones está cerrado")
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+
+        start = time.perf_counter()
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"No hay conexiones libres tras {self.timeout}s (pool de {self.size})"
+            )
+        finally:
+            with self._lock:
+                self._waits += 1
+                self._wait_seconds += time.perf_counter() - start
+
+    def release(self, conn: sqlite3.Connection):
+        """Devolver una conexión al pool"""
+        if conn.in_transaction:
+            conn.rollback()
+        if self._closed:
+            conn.close()
+            return
+        self._idle.put_nowait(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        finally:
+            self.release(conn)
+
+    def stats(self) -> Dict[str, float]:
+        """Uso del pool: conexiones abiertas, libres y esperas por falta de cupo"""
+        idle = self._idle.qsize()
+        return {
+            "max": self.size,
+            "open": self._created,
+            "idle": idle,
+            "in_use": self._created - idle,
+            "waits": self._waits,
+            "wait_seconds": self._wait_seconds,
+        }
+
+    def close(self):
+        """Cerrar todas las conexiones inactivas del pool"""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+# Workflows de ejemplo para una base vacía
+SAMPLE_WORKFLOWS = [
+    {
+        'id': 'wf-001',
+        'n8n_id': '1',
+        'name': 'E-commerce Order Processing',
+        'description': 'Automatiza el procesamiento de pedidos desde Shopify hasta el sistema de inventario',
+        'category': 'E-commerce',
+        'status': 'active',
+        'total_executions': 1247,
+        'success_rate': 98.5,
+        'avg_execution_time': 2340,
+        'time_saved_hours': 156.2,
+        'triggers': '["Shopify Webhook", "Schedule"]',
+        'actions': '["Update Inventory", "Send Email", "Create Invoice"]'
+    },
+    {
+        'id': 'wf-002',
+        'n8n_id': '2',
+        'name': 'Lead Qualification System',
+        'description': 'Califica leads automáticamente y los asigna al equipo de ventas apropiado',
+        'category': 'Sales',
+        'status': 'active',
+        'total_executions': 892,
+        'success_rate': 96.8,
+        'avg_execution_time': 1890,
+        'time_saved_hours': 89.3,
+        'triggers': '["Form Submission", "CRM Update"]',
+        'actions': '["Score Lead", "Assign Sales Rep", "Send Notification"]'
+    },
+    {
+        'id': 'wf-003',
+        'n8n_id': '3',
+        'name': 'Social Media Content Sync',
+        'description': 'Sincroniza contenido entre múltiples plataformas sociales',
+        'category': 'Marketing',
+        'status': 'error',
+        'total_executions': 445,
+        'success_rate': 94.2,
+        'avg_execution_time': 3200,
+        'time_saved_hours': 67.8,
+        'triggers': '["Content Published", "Schedule"]',
+        'actions': '["Post to Twitter", "Post to LinkedIn", "Update Analytics"]'
+    }
+]
+
+# Etiquetas de cache que invalida cada tipo de escritura
+CACHE_TAGS_BY_EVENT = {
+    "executions_inserted": ("executions", "stats", "workflows"),
+    "executions_updated": ("executions", "stats", "workflows"),
+    "workflows_changed": ("workflows", "stats"),
+    "executions_archived": ("executions",),
+}
+
+class StorageBackend(abc.ABC):
+    """Contrato común de almacenamiento (SQLite, PostgreSQL)
+    
+    Todas las implementaciones devuelven los mismos modelos y avisan a los
+    listeners después de cada escritura confirmada.
+    """
+    
+    # Métodos públicos que no tocan la base y no se miden
+    UNTIMED_METHODS = frozenset({"close", "get_connection", "add_listener", "remove_listener",
+                                 "replay_event", "pool_stats"})
+    
+    def __init_subclass__(cls, **kwargs):
+        """Medir cada método público de los backends concretos (db_query_duration_seconds)"""
+        super().__init_subclass__(**kwargs)
+        for name, attr in list(vars(cls).items()):
+            if (name.startswith("_") or name in cls.UNTIMED_METHODS
+                    or not inspect.isfunction(attr) or inspect.isgeneratorfunction(attr)):
+                continue
+            measure = timed(DB_QUERY_DURATION, DB_QUERY_ERRORS, cls.__name__, name)
+            options = getattr(attr, "cache_options", None)
+            if options:
+                # Con cache se mide sólo el cálculo real, no los aciertos
+                setattr(cls, name, cached(*options)(measure(attr.__wrapped__)))
+            else:
+                setattr(cls, name, measure(attr))
+    
+    def __init__(self, cache: Optional[TTLCache] = None):
+        self.cache = cache
+        self._listeners: List[Callable[[str, Any], None]] = []
+    
+    @abc.abstractmethod
+    def close(self):
+        """Cerrar el pool de conexiones"""
+    
+    @abc.abstractmethod
+    def pool_stats(self) -> Dict[str, float]:
+        """Uso del pool de conexiones (max, open, idle, in_use, waits, wait_seconds)"""
+    
+    # Esquema
+    
+    # Migraciones en orden: (nombre, método); la versión es su posición desde 1
+    MIGRATIONS: Tuple[Tuple[str, str], ...] = ()
+    
+    @abc.abstractmethod
+    def get_schema_version(self) -> int:
+        """Última migración aplicada (0 si la base está vacía)"""
+    
+    def migrate(self) -> List[int]:
+        """Aplicar las migraciones pendientes; con el esquema al día es una sola lectura"""
+        if self.get_schema_version() >= len(self.MIGRATIONS):
+            return []
+        return self._apply_migrations()
+    
+    @abc.abstractmethod
+    def _apply_migrations(self) -> List[int]:
+        """Aplicar bajo lock las migraciones posteriores a la versión actual"""
+    
+    @abc.abstractmethod
+    def seed_sample_data(self):
+        """Poblar con datos de ejemplo si la DB está vacía"""
+    
+    def add_listener(self, callback: Callable[[str, Any], None]):
+        """Registrar un callback(evento, datos) que se llama tras cada escritura confirmada"""
+        self._listeners.append(callback)
+    
+    def remove_listener(self, callback: Callable[[str, Any], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    
+    def replay_event(self, event: str, payload: Any):
+        """Aplicar una escritura hecha por otro proceso: invalidar la cache y avisar a los listeners"""
+        self._notify(event, payload)
+    
+    def _notify(self, event: str, payload: Any):
+        # Invalidar antes de avisar, para que los listeners ya lean datos frescos
+        if self.cache is not None:
+            self.cache.invalidate(*CACHE_TAGS_BY_EVENT.get(event, ()))
+        for callback in list(self._listeners):
+            try:
+                callback(event, payload)
+            except Exception as e:
+                print(f"Error notificando '{event}': {e}")
+    
+    # Lecturas
+    
+    @abc.abstractmethod
+    def get_table_version(self, name: str) -> int:
+        """Versión actual de una tabla (cambia con cada escritura)"""
+    
+    @abc.abstractmethod
+    def get_workflows(self, category: Optional[str] = None,
+                      status: Optional[str] = None) -> List[Workflow]:
+        """Obtener workflows, opcionalmente filtrados por categoría y estado"""
+    
+    def get_executions(self, workflow_id: Optional[str] = None, limit: int = 50,
+                       **filters) -> List[Execution]:
+        """Obtener ejecuciones"""
+        return self.get_executions_page(workflow_id=workflow_id, limit=limit, **filters)[0]
+    
+    @abc.abstractmethod
+    def get_executions_page(self, workflow_id: Optional[str] = None, limit: int = 50,
+                            status: Optional[str] = None, triggered_by: Optional[str] = None,
+                            start_time: Optional[datetime] = None,
+                            end_time: Optional[datetime] = None,
+                            cursor: Optional[str] = None,
+                            include_error: bool = True,
+                            include_archived: bool = False) -> Tuple[List[Execution], Optional[str]]:
+        """Página de ejecuciones (más recientes primero) y cursor de la siguiente"""
+    
+    @abc.abstractmethod
+    def get_workflows_json(self, category: Optional[str] = None, status: Optional[str] = None,
+                           version: Optional[int] = None) -> Tuple[int, bytes]:
+        """Lo mismo que get_workflows, ya codificado como JSON sin crear un modelo por fila
+        
+        Devuelve (versión de la tabla, cuerpo) leídos en la misma transacción.
+        version es la que ya vio quien llama y sólo forma parte de la clave de
+        cache: con una versión nueva nunca se responde un cuerpo cacheado viejo.
+        """
+    
+    @abc.abstractmethod
+    def get_executions_json(self, workflow_id: Optional[str] = None, limit: int = 50,
+                            status: Optional[str] = None, triggered_by: Optional[str] = None,
+                            start_time: Optional[datetime] = None,
+                            end_time: Optional[datetime] = None,
+                            cursor: Optional[str] = None,
+                            include_error: bool = True,
+                            include_archived: bool = False) -> Tuple[bytes, Optional[str]]:
+        """Lo mismo que get_executions_page, ya codificado como JSON sin crear un modelo por fila"""
+    
+    @abc.abstractmethod
+    def iter_executions(self, workflow_id: Optional[str] = None, status: Optional[str] = None,
+                        triggered_by: Optional[str] = None,
+                        start_time: Optional[datetime] = None,
+                        end_time: Optional[datetime] = None,
+                        include_error: bool = True,
+                        include_archived: bool = False,
+                        batch_size: int = 5000) -> Iterator[List[Sequence[Any]]]:
+        """Lotes de ejecuciones filtradas (más antiguas primero) en el orden de EXECUTION_FIELDS
+        
+        Para exportar rangos grandes: la memoria no depende de cuántas filas haya.
+        """
+    
+    @abc.abstractmethod
+    def get_workflow_watermarks(self) -> Dict[str, Optional[str]]:
+        """Último updatedAt de N8N conocido para cada workflow sincronizado"""
+    
+    @abc.abstractmethod
+    def resolve_workflows(self, workflow_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Mapear ids locales o de N8N a su workflow (id, n8n_id, name, n8n_updated_at)"""
+    
+    @abc.abstractmethod
+    def get_known_n8n_execution_ids(self, n8n_execution_ids: Iterable[str]) -> set:
+        """Subconjunto de ids de ejecución de N8N que ya están registrados"""
+    
+    @abc.abstractmethod
+    def get_workflow_definition(self, n8n_id: str) -> Optional[Dict[str, Any]]:
+        """Definición guardada de un workflow de N8N (n8n_id, updated_at, etag, definition, fetched_at)"""
     
-    def init_database(self):
-        """Inicializar tablas de la base de datos"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    @abc.abstractmethod
+    def get_inflight_executions(self, limit: int = 10000) -> List[Dict[str, Any]]:
+        """Ejecuciones de N8N todavía running o waiting, las más antiguas primero
+        
+        Cada una con id, workflow_id, n8n_execution_id, status y start_time (datetime).
+        """
+    
+    @abc.abstractmethod
+    def get_timeseries(self, resolution: str, start_time: datetime, end_time: datetime,
+                       workflow_id: Optional[str] = None) -> List[ChartData]:
+        """Serie temporal de ejecuciones leída de los buckets precalculados"""
+    
+    @abc.abstractmethod
+    def get_workflow_analytics(self, workflow_id: str) -> Optional[WorkflowAnalytics]:
+        """Percentiles de duración, tasa de error y throughput por ventana (None si no existe)"""
+    
+    @abc.abstractmethod
+    def get_execution_months(self, before: datetime) -> List[str]:
+        """Meses (YYYY-MM) con ejecuciones en la tabla viva anteriores a la fecha dada"""
+    
+    @abc.abstractmethod
+    def iter_execution_rows(self, start_time: datetime, end_time: datetime,
+                            batch_size: int = 10000) -> Iterator[List[Tuple]]:
+        """Lotes de filas de [start_time, end_time) en el orden de EXECUTION_COLUMNS, fechas en ISO"""
+    
+    @abc.abstractmethod
+    def get_execution_archives(self) -> List[Dict[str, Any]]:
+        """Catálogo de archivos con ejecuciones archivadas"""
+    
+    @abc.abstractmethod
+    def get_dashboard_stats(self) -> DashboardStats:
+        """Calcular estadísticas del dashboard a partir de los agregados"""
+    
+    # Escrituras
+    
+    @abc.abstractmethod
+    def upsert_workflows(self, workflows: List[Dict[str, Any]]) -> int:
+        """Insertar o actualizar workflows de N8N usando n8n_id como clave"""
+    
+    @abc.abstractmethod
+    def set_workflow_status(self, workflow_id: str, status: str) -> bool:
+        """Cambiar el estado local de un workflow (por id local o de N8N)"""
+    
+    @abc.abstractmethod
+    def save_workflow_definition(self, definition: Dict[str, Any]):
+        """Guardar o reemplazar la definición de un workflow de N8N"""
+    
+    @abc.abstractmethod
+    def insert_executions(self, executions: List[Dict[str, Any]]) -> int:
+        """Insertar varias ejecuciones en una sola transacción"""
+    
+    @abc.abstractmethod
+    def update_execution_statuses(self, updates: List[Dict[str, Any]]) -> int:
+        """Aplicar en una transacción los cambios de estado de ejecuciones en curso
+        
+        Cada cambio trae id, status, end_time, duration y error_message. Sólo se
+        tocan filas que siguen running o waiting; devuelve cuántas cambiaron.
+        """
+    
+    @abc.abstractmethod
+    def record_execution_events(self, executions: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Registrar eventos de ejecución de N8N en una transacción
+        
+        Cada evento viene como fila de executions. Si el n8n_execution_id no
+        existe se inserta; si existe y sigue running o waiting pasa al estado del
+        evento; si ya terminó se ignora, así que repetir eventos no cambia nada.
+        Devuelve (insertadas, actualizadas).
+        """
+    
+    @abc.abstractmethod
+    def try_acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """Tomar o renovar un lease; falla si otro dueño lo tiene vigente"""
+    
+    @abc.abstractmethod
+    def release_lease(self, name: str, owner: str):
+        """Liberar un lease propio para que otro proceso lo tome de inmediato"""
+    
+    @abc.abstractmethod
+    def archive_execution_range(self, start_time: datetime, end_time: datetime,
+                                archive: Dict[str, Any]) -> int:
+        """Registrar un archivo en el catálogo y borrar su rango de la tabla viva (una transacción)
+
+        Falla sin borrar nada si el rango ya no tiene exactamente las filas
+        archivadas: archive["digest"] es update_rows_digest (sha256) de lo que
+        devolvió iter_execution_rows, estados incluidos.
+        """
+    
+    # Utilidades compartidas por las implementaciones
+    
+    def _workflow_from_row(self, row: Any) -> Workflow:
+        workflow_dict = dict(row)
+        workflow_dict['triggers'] = json.loads(workflow_dict['triggers'])
+        workflow_dict['actions'] = json.loads(workflow_dict['actions'])
+        return Workflow(**workflow_dict)
+    
+    def _resolve_rows(self, rows: List[Any], requested: set) -> Dict[str, Dict[str, Any]]:
+        resolved = {}
+        for row in rows:
+            # El id local tiene prioridad sobre un n8n_id coincidente
+            if row["id"] in requested:
+                resolved[row["id"]] = dict(row)
+        for row in rows:
+            if row["n8n_id"] in requested:
+                resolved.setdefault(row["n8n_id"], dict(row))
+        return resolved
+    
+    def _timeseries_from_rows(self, rows: Iterable[Any], resolution: str,
+                              start_time: datetime, end_time: datetime) -> List[ChartData]:
+        """Serie completa a partir de filas (bucket, ejecuciones, éxitos, errores, ahorro)"""
+        buckets = {row[0]: row for row in rows}
+        
+        # Completar los intervalos sin ejecuciones con ceros
+        series = []
+        step = BUCKET_STEPS[resolution]
+        current = truncate_to_bucket(start_time, resolution)
+        while current <= end_time:
+            key = bucket_key(current, resolution)
+            row = buckets.get(key)
+            series.append(ChartData(
+                date=key,
+                executions=row[1] if row else 0,
+                successes=row[2] if row else 0,
+                errors=row[3] if row else 0,
+                time_saved=round(row[4], 2) if row else 0.0
+            ))
+            current += step
+        return series
+    
+    def _analytics_from_rows(self, workflow_id: str, sketch_rows: Iterable[Sequence[Any]],
+                             count_rows: Iterable[Sequence[Any]], now: datetime) -> WorkflowAnalytics:
+        """Analytics a partir de filas (resolution, bucket, sketch) y (resolution, bucket, ejecuciones, éxitos, errores)
+        
+        Cada ventana empieza en el bucket que contiene now - largo: los
+        contadores por minuto/hora/día y los sketches por hora/día la cubren
+        con, como mucho, un bucket de más al principio.
+        """
+        sketch_rows = list(sketch_rows)
+        count_rows = list(count_rows)
+        lifetime = merge_sketches(row[2] for row in sketch_rows if row[0] == "all")
+        
+        # Las ventanas de una misma resolución se anidan: los sketches se suman
+        # una sola vez, del bucket más nuevo al más viejo
+        durations: Dict[str, DurationSummary] = {}
+        for resolution in {sketches for _, _, sketches in ANALYTICS_WINDOWS.values()}:
+            names = sorted((name for name, window in ANALYTICS_WINDOWS.items() if window[2] == resolution),
+                           key=lambda name: ANALYTICS_WINDOWS[name][0])
+            rows = sorted((row for row in sketch_rows if row[0] == resolution),
+                          key=lambda row: row[1], reverse=True)
+            merged = DDSketch(SKETCH_RELATIVE_ACCURACY)
+            position = 0
+            for name in names:
+                since = bucket_key(now - ANALYTICS_WINDOWS[name][0], resolution)
+                while position < len(rows) and rows[position][1] >= since:
+                    merged.merge(DDSketch.from_bytes(rows[position][2]))
+                    position += 1
+                durations[name] = DurationSummary(**summarize_sketch(merged))
+        
+        windows = []
+        for name, (length, counts, _) in ANALYTICS_WINDOWS.items():
+            since = bucket_key(now - length, counts)
+            executions = successes = errors = 0
+            for resolution, bucket, bucket_executions, bucket_successes, bucket_errors in count_rows:
+                if resolution == counts and bucket >= since:
+                    executions += bucket_executions
+                    successes += bucket_successes
+                    errors += bucket_errors
+            
+            # Igual que success_rate: sobre ejecuciones terminadas
+            finished = successes + errors
+            windows.append(AnalyticsWindow(
+                window=name,
+                executions=executions,
+                successes=successes,
+                errors=errors,
+                error_rate=round(errors * 100 / finished, 1) if finished else 0.0,
+                throughput_per_hour=round(executions / (length.total_seconds() / 3600), 2),
+                duration=durations[name]
+            ))
+        
+        return WorkflowAnalytics(
+            workflow_id=workflow_id,
+            relative_accuracy=SKETCH_RELATIVE_ACCURACY,
+            duration=DurationSummary(**summarize_sketch(lifetime)),
+            windows=windows
+        )
+    
+    def _dashboard_stats_from_row(self, row: Iterable[Any]) -> DashboardStats:
+        (total_workflows, active_workflows, total_time_saved,
+         total_executions, successful_executions,
+         executions_today, errors_today) = row
+        
+        success_rate = (successful_executions / total_executions * 100) if total_executions > 0 else 0
+        
+        # Tiempo ahorrado y ROI
+        total_roi = total_time_saved * 25  # $25/hora
+        
+        return DashboardStats(
+            total_workflows=total_workflows,
+            active_workflows=active_workflows,
+            total_executions=total_executions,
+            success_rate=round(success_rate, 1),
+            total_time_saved=total_time_saved,
+            total_roi=total_roi,
+            executions_today=executions_today,
+            errors_today=errors_today
+        )
+    
+    def _merge_archived(self, page: List[Execution], limit: int,
+                        workflow_id: Optional[str] = None, status: Optional[str] = None,
+                        triggered_by: Optional[str] = None,
+                        start_time: Optional[datetime] = None,
+                        end_time: Optional[datetime] = None,
+                        cursor: Optional[str] = None,
+                        include_error: bool = True) -> Tuple[List[Execution], Optional[str]]:
+        """Completar una página de la tabla viva con las ejecuciones archivadas que le tocan"""
+        low = to_local_naive(start_time) if start_time else None
+        high = to_local_naive(end_time) if end_time else None
+        before = None
+        if cursor:
+            cursor_time, cursor_id = decode_cursor(cursor)
+            before = (datetime.fromisoformat(cursor_time), cursor_id)
+        
+        candidates: List[Tuple[Tuple[datetime, str], Any]] = [((e.start_time, e.id), e) for e in page]
+        archives = sorted(self.get_execution_archives(),
+                          key=lambda a: a["max_start_time"], reverse=True)
+        for archive in archives:
+            archive_min = datetime.fromisoformat(archive["min_start_time"])
+            archive_max = datetime.fromisoformat(archive["max_start_time"])
+            # Ordenados por fecha máxima: los siguientes son todavía más antiguos
+            if low and archive_max < low:
+                break
+            if len(candidates) >= limit and archive_max < candidates[-1][0][0]:
+                break
+            if (high and archive_min >= high) or (before and archive_min > before[0]):
+                continue
+            
+            try:
+                for row in read_columnar(archive["path"], low, high):
+                    if ((workflow_id and row["workflow_id"] != workflow_id)
+                            or (status and row["status"] != status)
+                            or (triggered_by and row["triggered_by"] != triggered_by)):
+                        continue
+                    key = (datetime.fromisoformat(row["start_time"]), row["id"])
+                    if (low and key[0] < low) or (high and key[0] >= high) or (before and key >= before):
+                        continue
+                    if not include_error:
+                        row["error_message"] = None
+                    candidates.append((key, row))
+            except OSError as e:
+                print(f"Error leyendo el archivo {archive['path']}: {e}")
+            candidates = heapq.nlargest(limit, candidates, key=lambda c: c[0])
+        
+        candidates = heapq.nlargest(limit, candidates, key=lambda c: c[0])
+        executions = [item if isinstance(item, Execution) else Execution(**item)
+                      for _, item in candidates]
+        next_cursor = None
+        if len(candidates) == limit:
+            last_time, last_id = candidates[-1][0]
+            next_cursor = encode_cursor(last_time.isoformat(), last_id)
+        return executions, next_cursor
+    
+    def _archived_batches(self, batch_size: int, workflow_id: Optional[str] = None,
+                          status: Optional[str] = None, triggered_by: Optional[str] = None,
+                          start_time: Optional[datetime] = None,
+                          end_time: Optional[datetime] = None,
+                          include_error: bool = True) -> Iterator[List[Tuple]]:
+        """Lotes de los meses archivados que tocan el rango, del más antiguo al más reciente"""
+        low = to_local_naive(start_time) if start_time else None
+        high = to_local_naive(end_time) if end_time else None
+        batch: List[Tuple] = []
+        for archive in sorted(self.get_execution_archives(), key=lambda a: a["min_start_time"]):
+            if ((low and datetime.fromisoformat(archive["max_start_time"]) < low)
+                    or (high and datetime.fromisoformat(archive["min_start_time"]) >= high)):
+                continue
+            for row in read_columnar(archive["path"], low, high):
+                if ((workflow_id and row["workflow_id"] != workflow_id)
+                        or (status and row["status"] != status)
+                        or (triggered_by and row["triggered_by"] != triggered_by)):
+                    continue
+                started = datetime.fromisoformat(row["start_time"])
+                if (low and started < low) or (high and started >= high):
+                    continue
+                if not include_error:
+                    row["error_message"] = None
+                batch.append(tuple(row.get(field) for field in EXECUTION_FIELDS))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+    
+    def _sample_executions(self, count: int = 50) -> List[Dict[str, Any]]:
+        """Ejecuciones de ejemplo repartidas entre SAMPLE_WORKFLOWS"""
+        names = {w['id']: w['name'] for w in SAMPLE_WORKFLOWS}
+        executions = []
+        for i in range(count):
+            workflow_id = random.choice(list(names))
+            status = random.choices(['success', 'error'], weights=[95, 5])[0]
+            start_time = datetime.now() - timedelta(days=random.randint(0, 30))
+            duration = random.randint(1000, 5000) if status == 'success' else random.randint(5000, 10000)
+            
+            executions.append({
+                'id': f'exec-{i+1:03d}',
+                'workflow_id': workflow_id,
+                'workflow_name': names[workflow_id],
+                'n8n_execution_id': f'n8n-exec-{i+1}',
+                'status': status,
+                'start_time': start_time.isoformat(),
+                'end_time': (start_time + timedelta(milliseconds=duration)).isoformat(),
+                'duration': duration,
+                'triggered_by': random.choice(['Webhook', 'Schedule', 'Manual']),
+                'data_processed': random.randint(1, 20),
+                'error_message': 'API rate limit exceeded' if status == 'error' else None
+            })
+        return executions
+
+class Database(StorageBackend):
+    """Almacenamiento SQLite (implementación por defecto)"""
+    
+    MIGRATIONS = (
+        ("baseline", "_create_base_schema"),
+        ("n8n_workflow_definitions", "_create_workflow_definitions"),
+        ("workflow_duration_sketches", "_create_duration_sketches"),
+    )
+    
+    def __init__(self, db_path: str = "business_automation.db", pool_size: int = 5,
+                 cache: Optional[TTLCache] = None, migrate: bool = True):
+        super().__init__(cache)
+        self.db_path = db_path
+        self.pool = ConnectionPool(db_path, size=pool_size)
+        if migrate:
+            self.migrate()
+    
+    def get_connection(self):
+        """Context manager que presta una conexión del pool"""
+        return self.pool.connection()
+    
+    def close(self):
+        self.pool.close()
+    
+    def pool_stats(self) -> Dict[str, float]:
+        return self.pool.stats()
+
+    def get_schema_version(self) -> int:
+        """Última migración aplicada (0 si la base está vacía)"""
+        with self.get_connection() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_migrations'"
+            ).fetchone()
+            if exists is None:
+                return 0
+            return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations").fetchone()[0]
+    
+    def _apply_migrations(self) -> List[int]:
+        """Aplicar bajo lock las migraciones posteriores a la versión actual"""
+        applied = []
+        with self.get_connection() as conn:
+            # El lock de escritura serializa a los procesos que arrancan a la vez:
+            # el primero migra y los demás ven la versión nueva al entrar
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+            current = cursor.fetchone()[0]
+            for version, (name, method) in enumerate(self.MIGRATIONS, start=1):
+                if version <= current:
+                    continue
+                getattr(self, method)(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (?, ?)", (version, name)
+                )
+                applied.append(version)
+        return applied
+    
+    def _create_base_schema(self, cursor):
+        """Migración 1: tablas, índices y agregados (idempotente para bases anteriores)"""
         
         # Tabla de workflows
         cursor.execute('''
@@ -60,213 +965,961 @@ class Database:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        # Índices para consultas por rango de tiempo y paginación por (start_time, id)
+        for old_index in ('idx_executions_start_time', 'idx_executions_workflow_start',
+                          'idx_executions_status_start'):
+            cursor.execute(f'DROP INDEX IF EXISTS {old_index}')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_executions_start_id
+            ON executions (start_time, id)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_executions_workflow_start_id
+            ON executions (workflow_id, start_time, id)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_executions_status_start_id
+            ON executions (status, start_time, id)
+        ''')
+        
+        # Sincronización incremental con N8N: marca updatedAt por workflow
+        self._add_column_if_missing(cursor, 'workflows', 'n8n_updated_at', 'TEXT')
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_workflows_n8n_id
+            ON workflows (n8n_id)
+        ''')
+        
+        # Importación de ejecuciones desde N8N sin duplicados
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_executions_n8n_execution_id
+            ON executions (n8n_execution_id)
+        ''')
+        
+        # Leases para coordinar tareas periódicas entre procesos
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scheduler_leases (
+                name TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+        
+        # Catálogo de meses archivados en disco
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS execution_archives (
+                path TEXT PRIMARY KEY,
+                month TEXT NOT NULL,
+                row_count INTEGER NOT NULL,
+                min_start_time TEXT,
+                max_start_time TEXT,
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Filtros del listado de workflows
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_workflows_category
+            ON workflows (category COLLATE NOCASE)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_workflows_status
+            ON workflows (status)
+        ''')
+        
+        self._init_rollups(cursor)
+        self._init_table_versions(cursor)
     
-    def seed_sample_data(self):
-        """Poblar con datos de ejemplo si la DB está vacía"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def _create_workflow_definitions(self, cursor):
+        """Migración 2: definiciones completas de workflows de N8N (JSON tal como llegó)"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS n8n_workflow_definitions (
+                n8n_id TEXT PRIMARY KEY,
+                updated_at TEXT,
+                etag TEXT,
+                definition TEXT NOT NULL,
+                fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+    
+    def _create_duration_sketches(self, cursor):
+        """Migración 3: sketches de duración por workflow, cargados desde las ejecuciones existentes"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS workflow_duration_sketches (
+                resolution TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                workflow_id TEXT NOT NULL,
+                samples INTEGER NOT NULL,
+                total_duration REAL NOT NULL,
+                sketch BLOB NOT NULL,
+                PRIMARY KEY (workflow_id, resolution, bucket)
+            ) WITHOUT ROWID
+        ''')
+        # Para borrar los sketches por hora y por día vencidos
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_workflow_duration_sketches_bucket
+            ON workflow_duration_sketches (resolution, bucket)
+        ''')
         
-        # Verificar si ya hay datos
-        cursor.execute("SELECT COUNT(*) FROM workflows")
-        if cursor.fetchone()[0] > 0:
-            conn.close()
-            return
+        # Los bins se agrupan en SQL: a Python sólo llega una fila por bin
+        sketch = DDSketch(SKETCH_RELATIVE_ACCURACY)
+        cursor.connection.create_function(
+            "sketch_key", 1, lambda value: sketch.key(value) if value > MIN_INDEXABLE_VALUE else None,
+            deterministic=True
+        )
+        groups = [("'all'", "''", "", ())]
+        for resolution, cutoff in sketch_cutoffs(datetime.now()).items():
+            # start_time >= ... (con espacio, que ordena antes que 'T') deja usar el índice
+            bucket = bucket_key_sql("start_time", resolution)
+            groups.append((f"'{resolution}'", bucket, f"AND start_time >= ? AND {bucket} >= ?",
+                           (cutoff.replace("T", " "), cutoff)))
+        for resolution, bucket, condition, params in groups:
+            rows = cursor.execute(f'''
+                SELECT {resolution}, {bucket}, workflow_id, sketch_key(duration),
+                       COUNT(*), SUM(duration), MIN(duration), MAX(duration)
+                FROM executions
+                WHERE status IN ('success', 'error') AND duration >= 0 {condition}
+                GROUP BY 2, 3, 4
+            ''', params).fetchall()
+            cursor.executemany('''
+                INSERT OR REPLACE INTO workflow_duration_sketches
+                    (resolution, bucket, workflow_id, samples, total_duration, sketch)
+                VALUES (:resolution, :bucket, :workflow_id, :samples, :total_duration, :sketch)
+            ''', sketches_from_bins(rows))
+        
+        cursor.execute('''
+            UPDATE workflows SET avg_execution_time = ROUND(d.total_duration / d.samples, 1)
+            FROM workflow_duration_sketches AS d
+            WHERE d.resolution = 'all' AND d.bucket = '' AND d.workflow_id = workflows.id
+        ''')
+    
+    def _init_table_versions(self, cursor):
+        """Contador de versión por tabla, incrementado por triggers en cada escritura"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS table_versions (
+                name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO table_versions (name) VALUES ('workflows')")
+        for operation in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_workflows_version_{operation.lower()}
+                AFTER {operation} ON workflows
+                BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE name = 'workflows';
+                END
+            ''')
+    
+    def _add_column_if_missing(self, cursor, table: str, column: str, definition: str):
+        """Agregar una columna a una tabla existente si todavía no la tiene"""
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column not in {row["name"] for row in cursor.fetchall()}:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    
+    def _init_rollups(self, cursor):
+        """Crear las tablas de agregados y los triggers que las mantienen"""
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'workflow_execution_stats'"
+        )
+        needs_backfill = cursor.fetchone() is None
+        
+        # Contadores acumulados por workflow
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS workflow_execution_stats (
+                workflow_id TEXT PRIMARY KEY,
+                executions INTEGER NOT NULL DEFAULT 0,
+                successes INTEGER NOT NULL DEFAULT 0,
+                errors INTEGER NOT NULL DEFAULT 0,
+                last_execution TIMESTAMP
+            )
+        ''')
+        
+        # Contadores por intervalo de tiempo (resolution = minute / hour / day)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS execution_buckets (
+                resolution TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                workflow_id TEXT NOT NULL,
+                executions INTEGER NOT NULL DEFAULT 0,
+                successes INTEGER NOT NULL DEFAULT 0,
+                errors INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (resolution, bucket, workflow_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_execution_buckets_workflow
+            ON execution_buckets (resolution, workflow_id, bucket)
+        ''')
+        
+        bucket_inserts = "".join(f'''
+                INSERT INTO execution_buckets
+                    (resolution, bucket, workflow_id, executions, successes, errors)
+                VALUES ('{resolution}', {bucket_key_sql('NEW.start_time', resolution)},
+                        NEW.workflow_id, 1, NEW.status = 'success', NEW.status = 'error')
+                ON CONFLICT (resolution, bucket, workflow_id) DO UPDATE SET
+                    executions = executions + 1,
+                    successes = successes + excluded.successes,
+                    errors = errors + excluded.errors;
+        ''' for resolution in BUCKET_RESOLUTIONS)
+        bucket_updates = "".join(f'''
+                UPDATE execution_buckets SET
+                    successes = successes + (NEW.status = 'success') - (OLD.status = 'success'),
+                    errors = errors + (NEW.status = 'error') - (OLD.status = 'error')
+                WHERE resolution = '{resolution}'
+                  AND bucket = {bucket_key_sql('NEW.start_time', resolution)}
+                  AND workflow_id = NEW.workflow_id;
+        ''' for resolution in BUCKET_RESOLUTIONS)
         
-        # Datos de ejemplo
-        sample_workflows = [
-            {
-                'id': 'wf-001',
-                'n8n_id': '1',
-                'name': 'E-commerce Order Processing',
-                'description': 'Automatiza el procesamiento de pedidos desde Shopify hasta el sistema de inventario',
-                'category': 'E-commerce',
-                'status': 'active',
-                'total_executions': 1247,
-                'success_rate': 98.5,
-                'avg_execution_time': 2340,
-                'time_saved_hours': 156.2,
-                'triggers': '["Shopify Webhook", "Schedule"]',
-                'actions': '["Update Inventory", "Send Email", "Create Invoice"]'
-            },
-            {
-                'id': 'wf-002',
-                'n8n_id': '2',
-                'name': 'Lead Qualification System',
-                'description': 'Califica leads automáticamente y los asigna al equipo de ventas apropiado',
-                'category': 'Sales',
-                'status': 'active',
-                'total_executions': 892,
-                'success_rate': 96.8,
-                'avg_execution_time': 1890,
-                'time_saved_hours': 89.3,
-                'triggers': '["Form Submission", "CRM Update"]',
-                'actions': '["Score Lead", "Assign Sales Rep", "Send Notification"]'
-            },
-            {
-                'id': 'wf-003',
-                'n8n_id': '3',
-                'name': 'Social Media Content Sync',
-                'description': 'Sincroniza contenido entre múltiples plataformas sociales',
-                'category': 'Marketing',
-                'status': 'error',
-                'total_executions': 445,
-                'success_rate': 94.2,
-                'avg_execution_time': 3200,
-                'time_saved_hours': 67.8,
-                'triggers': '["Content Published", "Schedule"]',
-                'actions': '["Post to Twitter", "Post to LinkedIn", "Update Analytics"]'
-            }
-        ]
-        
-        for workflow in sample_workflows:
+        # Los triggers se recrean para incorporar resoluciones nuevas
+        cursor.execute("DROP TRIGGER IF EXISTS trg_executions_rollup_insert")
+        cursor.execute("DROP TRIGGER IF EXISTS trg_executions_rollup_status")
+        
+        # Cada ejecución insertada suma en todos los agregados
+        cursor.execute(f'''
+            CREATE TRIGGER trg_executions_rollup_insert
+            AFTER INSERT ON executions
+            BEGIN
+                INSERT INTO workflow_execution_stats
+                    (workflow_id, executions, successes, errors, last_execution)
+                VALUES (NEW.workflow_id, 1, NEW.status = 'success',
+                        NEW.status = 'error', NEW.start_time)
+                ON CONFLICT (workflow_id) DO UPDATE SET
+                    executions = executions + 1,
+                    successes = successes + excluded.successes,
+                    errors = errors + excluded.errors,
+                    last_execution = MAX(COALESCE(last_execution, ''), excluded.last_execution);
+                {bucket_inserts}
+            END
+        ''')
+        
+        # Un cambio de estado (p.ej. running -> success) mueve los contadores
+        cursor.execute(f'''
+            CREATE TRIGGER trg_executions_rollup_status
+            AFTER UPDATE OF status ON executions
+            WHEN OLD.status IS NOT NEW.status
+            BEGIN
+                UPDATE workflow_execution_stats SET
+                    successes = successes + (NEW.status = 'success') - (OLD.status = 'success'),
+                    errors = errors + (NEW.status = 'error') - (OLD.status = 'error')
+                WHERE workflow_id = NEW.workflow_id;
+                {bucket_updates}
+            END
+        ''')
+        
+        if needs_backfill:
             cursor.execute('''
-                INSERT INTO workflows (id, n8n_id, name, description, category, status, 
-                                     total_executions, success_rate, avg_execution_time, 
-                                     time_saved_hours, triggers, actions)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                workflow['id'], workflow['n8n_id'], workflow['name'], 
-                workflow['description'], workflow['category'], workflow['status'],
-                workflow['total_executions'], workflow['success_rate'], 
-                workflow['avg_execution_time'], workflow['time_saved_hours'],
-                workflow['triggers'], workflow['actions']
-            ))
+                INSERT INTO workflow_execution_stats
+                    (workflow_id, executions, successes, errors, last_execution)
+                SELECT workflow_id, COUNT(*), SUM(status = 'success'),
+                       SUM(status = 'error'), MAX(start_time)
+                FROM executions
+                GROUP BY workflow_id
+            ''')
         
-        # Generar ejecuciones de ejemplo
-        execution_data = []
-        for i in range(50):
-            workflow_id = random.choice(['wf-001', 'wf-002', 'wf-003'])
-            workflow_name = {
-                'wf-001': 'E-commerce Order Processing',
-                'wf-002': 'Lead Qualification System', 
-                'wf-003': 'Social Media Content Sync'
-            }[workflow_id]
+        for resolution in BUCKET_RESOLUTIONS:
+            cursor.execute(
+                "SELECT 1 FROM execution_buckets WHERE resolution = ? LIMIT 1", (resolution,)
+            )
+            if cursor.fetchone() is not None:
+                continue
+            bucket = bucket_key_sql('start_time', resolution)
+            cursor.execute(f'''
+                INSERT INTO execution_buckets
+                    (resolution, bucket, workflow_id, executions, successes, errors)
+                SELECT '{resolution}', {bucket}, workflow_id, COUNT(*),
+                       SUM(status = 'success'), SUM(status = 'error')
+                FROM executions
+                GROUP BY {bucket}, workflow_id
+            ''')
+    
+    def seed_sample_data(self):
+        """Poblar con datos de ejemplo si la DB está vacía"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
             
-            status = random.choices(['success', 'error'], weights=[95, 5])[0]
-            start_time = datetime.now() - timedelta(days=random.randint(0, 30))
-            duration = random.randint(1000, 5000) if status == 'success' else random.randint(5000, 10000)
+            # Verificar si ya hay datos
+            cursor.execute("SELECT COUNT(*) FROM workflows")
+            if cursor.fetchone()[0] > 0:
+                return
             
-            execution_data.append((
-                f'exec-{i+1:03d}',
-                workflow_id,
-                workflow_name,
-                f'n8n-exec-{i+1}',
-                status,
-                start_time.isoformat(),
-                (start_time + timedelta(milliseconds=duration)).isoformat(),
-                duration,
-                random.choice(['Webhook', 'Schedule', 'Manual']),
-                random.randint(1, 20),
-                'API rate limit exceeded' if status == 'error' else None
-            ))
-        
-        cursor.executemany('''
-            INSERT INTO executions (id, workflow_id, workflow_name, n8n_execution_id,
-                                  status, start_time, end_time, duration, triggered_by,
-                                  data_processed, error_message)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', execution_data)
+            for workflow in SAMPLE_WORKFLOWS:
+                cursor.execute('''
+                    INSERT INTO workflows (id, n8n_id, name, description, category, status, 
+                                         total_executions, success_rate, avg_execution_time, 
+                                         time_saved_hours, triggers, actions)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    workflow['id'], workflow['n8n_id'], workflow['name'], 
+                    workflow['description'], workflow['category'], workflow['status'],
+                    workflow['total_executions'], workflow['success_rate'], 
+                    workflow['avg_execution_time'], workflow['time_saved_hours'],
+                    workflow['triggers'], workflow['actions']
+                ))
+            
+            # Generar ejecuciones de ejemplo
+            executions = self._sample_executions()
+            cursor.executemany('''
+                INSERT INTO executions (id, workflow_id, workflow_name, n8n_execution_id,
+                                      status, start_time, end_time, duration, triggered_by,
+                                      data_processed, error_message)
+                VALUES (:id, :workflow_id, :workflow_name, :n8n_execution_id,
+                        :status, :start_time, :end_time, :duration, :triggered_by,
+                        :data_processed, :error_message)
+            ''', executions)
+            self._record_durations(conn, executions)
+    
+    def get_table_version(self, name: str) -> int:
+        """Versión actual de una tabla (cambia con cada escritura)"""
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT version FROM table_versions WHERE name = ?", (name,)
+            ).fetchone()
+        return row[0] if row else 0
+    
+    @cached(tags=("workflows",), ttl=30)
+    def get_workflows(self, category: Optional[str] = None,
+                      status: Optional[str] = None) -> List[Workflow]:
+        """Obtener workflows, opcionalmente filtrados por categoría y estado"""
+        query, params = self._workflows_query("*", category, status)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(query, params)
+            
+            return [self._workflow_from_row(row) for row in cursor.fetchall()]
+    
+    @cached(tags=("workflows",), ttl=30)
+    def get_workflows_json(self, category: Optional[str] = None, status: Optional[str] = None,
+                           version: Optional[int] = None) -> Tuple[int, bytes]:
+        """Lo mismo que get_workflows, ya codificado como JSON, con la versión de la tabla"""
+        query, params = self._workflows_query(", ".join(WORKFLOW_FIELDS), category, status)
+        with self.get_connection() as conn:
+            # Una sola transacción de lectura: en WAL ambas consultas ven el mismo snapshot
+            conn.execute("BEGIN")
+            row = conn.execute(
+                "SELECT version FROM table_versions WHERE name = 'workflows'"
+            ).fetchone()
+            rows = conn.execute(query, params).fetchall()
+        return (row[0] if row else 0), encode_workflows(rows)
+    
+    def _workflows_query(self, columns: str, category: Optional[str] = None,
+                         status: Optional[str] = None) -> Tuple[str, List[Any]]:
+        conditions = []
+        params = []
+        if category:
+            conditions.append("category = ? COLLATE NOCASE")
+            params.append(category)
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return f"SELECT {columns} FROM workflows {where} ORDER BY total_executions DESC", params
+    
+    @cached(tags=("executions",), ttl=10)
+    def get_executions_page(self, workflow_id: Optional[str] = None, limit: int = 50,
+                            status: Optional[str] = None, triggered_by: Optional[str] = None,
+                            start_time: Optional[datetime] = None,
+                            end_time: Optional[datetime] = None,
+                            cursor: Optional[str] = None,
+                            include_error: bool = True,
+                            include_archived: bool = False) -> Tuple[List[Execution], Optional[str]]:
+        """Página de ejecuciones (más recientes primero) y cursor de la siguiente"""
+        columns = EXECUTION_COLUMNS if include_error else EXECUTION_COMPACT_COLUMNS
+        query, params = self._execution_page_query(
+            columns, workflow_id, limit, status, triggered_by, start_time, end_time, cursor
+        )
+        with self.get_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
         
-        conn.commit()
-        conn.close()
+        executions = [Execution(**dict(row)) for row in rows]
+        if include_archived:
+            return self._merge_archived(executions, limit, workflow_id, status, triggered_by,
+                                        start_time, end_time, cursor, include_error)
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = encode_cursor(rows[-1]["start_time"], rows[-1]["id"])
+        return executions, next_cursor
     
-    def get_workflows(self) -> List[Workflow]:
-        """Obtener todos los workflows"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    @cached(tags=("executions",), ttl=10)
+    def get_executions_json(self, workflow_id: Optional[str] = None, limit: int = 50,
+                            status: Optional[str] = None, triggered_by: Optional[str] = None,
+                            start_time: Optional[datetime] = None,
+                            end_time: Optional[datetime] = None,
+                            cursor: Optional[str] = None,
+                            include_error: bool = True,
+                            include_archived: bool = False) -> Tuple[bytes, Optional[str]]:
+        """Lo mismo que get_executions_page, ya codificado como JSON sin crear un modelo por fila"""
+        if include_archived:
+            executions, next_cursor = self.get_executions_page(
+                workflow_id, limit, status, triggered_by, start_time, end_time, cursor,
+                include_error, include_archived
+            )
+            return encode_execution_models(executions), next_cursor
         
-        cursor.execute('''
-            SELECT * FROM workflows ORDER BY total_executions DESC
-        ''')
+        query, params = self._execution_page_query(
+            execution_json_columns(include_error), workflow_id, limit, status, triggered_by,
+            start_time, end_time, cursor
+        )
+        with self.get_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
         
-        workflows = []
-        for row in cursor.fetchall():
-            workflow_dict = dict(row)
-            workflow_dict['triggers'] = json.loads(workflow_dict['triggers'])
-            workflow_dict['actions'] = json.loads(workflow_dict['actions'])
-            workflows.append(Workflow(**workflow_dict))
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = encode_cursor(rows[-1]["start_time"], rows[-1]["id"])
+        return encode_executions(rows), next_cursor
+    
+    def _execution_page_query(self, columns: Iterable[str], workflow_id: Optional[str],
+                              limit: int, status: Optional[str], triggered_by: Optional[str],
+                              start_time: Optional[datetime], end_time: Optional[datetime],
+                              cursor: Optional[str]) -> Tuple[str, List[Any]]:
+        conditions, params = self._execution_filters(
+            workflow_id, status, triggered_by, start_time, end_time
+        )
+        if cursor:
+            # Keyset: continuar justo después de la última fila entregada
+            conditions.append("(start_time, id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
         
-        conn.close()
-        return workflows
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return f'''
+            SELECT {", ".join(columns)} FROM executions
+            {where}
+            ORDER BY start_time DESC, id DESC
+            LIMIT ?
+        ''', params + [limit]
     
-    def get_executions(self, workflow_id: Optional[str] = None, limit: int = 50) -> List[Execution]:
-        """Obtener ejecuciones"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def iter_executions(self, workflow_id: Optional[str] = None, status: Optional[str] = None,
+                        triggered_by: Optional[str] = None,
+                        start_time: Optional[datetime] = None,
+                        end_time: Optional[datetime] = None,
+                        include_error: bool = True,
+                        include_archived: bool = False,
+                        batch_size: int = 5000) -> Iterator[List[Sequence[Any]]]:
+        """Lotes de ejecuciones filtradas (más antiguas primero) en el orden de EXECUTION_FIELDS
+        
+        Cada lote es una consulta keyset aparte: entre lotes no se retiene una
+        conexión del pool ni una transacción de lectura abierta (que en WAL
+        impediría los checkpoints) mientras el cliente descarga.
+        """
+        if include_archived:
+            yield from self._archived_batches(batch_size, workflow_id, status, triggered_by,
+                                              start_time, end_time, include_error)
         
+        conditions, params = self._execution_filters(
+            workflow_id, status, triggered_by, start_time, end_time
+        )
+        start_index = EXECUTION_FIELDS.index("start_time")
+        id_index = EXECUTION_FIELDS.index("id")
+        after: List[Any] = []
+        while True:
+            page_conditions = conditions + ["(start_time, id) > (?, ?)"] if after else conditions
+            where = f"WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+            with self.get_connection() as conn:
+                rows = conn.execute(f'''
+                    SELECT {", ".join(execution_json_columns(include_error))} FROM executions
+                    {where}
+                    ORDER BY start_time, id
+                    LIMIT ?
+                ''', params + after + [batch_size]).fetchall()
+            if rows:
+                yield rows
+            if len(rows) < batch_size:
+                break
+            after = [rows[-1][start_index], rows[-1][id_index]]
+    
+    def _execution_filters(self, workflow_id: Optional[str] = None, status: Optional[str] = None,
+                           triggered_by: Optional[str] = None,
+                           start_time: Optional[datetime] = None,
+                           end_time: Optional[datetime] = None) -> Tuple[List[str], List[Any]]:
+        """Condiciones WHERE comunes a los listados de ejecuciones"""
+        conditions: List[str] = []
+        params: List[Any] = []
         if workflow_id:
-            cursor.execute('''
-                SELECT * FROM executions 
-                WHERE workflow_id = ? 
-                ORDER BY start_time DESC 
-                LIMIT ?
-            ''', (workflow_id, limit))
-        else:
-            cursor.execute('''
-                SELECT * FROM executions 
-                ORDER BY start_time DESC 
-                LIMIT ?
-            ''', (limit,))
+            conditions.append("workflow_id = ?")
+            params.append(workflow_id)
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if triggered_by:
+            conditions.append("triggered_by = ?")
+            params.append(triggered_by)
+        if start_time:
+            conditions.append("start_time >= ?")
+            params.append(to_local_naive(start_time).isoformat())
+        if end_time:
+            conditions.append("start_time < ?")
+            params.append(to_local_naive(end_time).isoformat())
+        return conditions, params
+    
+    def get_workflow_watermarks(self) -> Dict[str, Optional[str]]:
+        """Último updatedAt de N8N conocido para cada workflow sincronizado"""
+        with self.get_connection() as conn:
+            rows = conn.execute('''
+                SELECT n8n_id, n8n_updated_at FROM workflows WHERE n8n_id IS NOT NULL
+            ''').fetchall()
+        return {row["n8n_id"]: row["n8n_updated_at"] for row in rows}
+    
+    def upsert_workflows(self, workflows: List[Dict[str, Any]]) -> int:
+        """Insertar o actualizar workflows de N8N usando n8n_id como clave"""
+        if not workflows:
+            return 0
         
-        executions = []
-        for row in cursor.fetchall():
-            executions.append(Execution(**dict(row)))
+        with self.get_connection() as conn:
+            conn.executemany('''
+                INSERT INTO workflows (id, n8n_id, name, status, created_at, updated_at,
+                                       triggers, actions, n8n_updated_at)
+                VALUES (:id, :n8n_id, :name, :status, COALESCE(:created_at, CURRENT_TIMESTAMP), CURRENT_TIMESTAMP,
+                        :triggers, :actions, :n8n_updated_at)
+                ON CONFLICT (n8n_id) DO UPDATE SET
+                    name = excluded.name,
+                    status = excluded.status,
+                    triggers = excluded.triggers,
+                    actions = excluded.actions,
+                    n8n_updated_at = excluded.n8n_updated_at,
+                    updated_at = CURRENT_TIMESTAMP
+            ''', workflows)
+        
+        self._notify("workflows_changed", [
+            {"n8n_id": w["n8n_id"], "name": w["name"], "status": w["status"]} for w in workflows
+        ])
+        return len(workflows)
+    
+    def set_workflow_status(self, workflow_id: str, status: str) -> bool:
+        """Cambiar el estado local de un workflow (por id local o de N8N)"""
+        with self.get_connection() as conn:
+            rows = conn.execute('''
+                UPDATE workflows SET status = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? OR n8n_id = ?
+                RETURNING id, n8n_id, name, status
+            ''', (status, workflow_id, workflow_id)).fetchall()
+        
+        if not rows:
+            return False
+        self._notify("workflows_changed", [dict(row) for row in rows])
+        return True
+    
+    def resolve_workflows(self, workflow_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Mapear ids locales o de N8N a su workflow (id, n8n_id, name, n8n_updated_at)"""
+        requested = set(workflow_ids)
+        if not requested:
+            return {}
         
-        conn.close()
+        ids = list(requested)
+        placeholders = ",".join("?" * len(ids))
+        with self.get_connection() as conn:
+            rows = conn.execute(f'''
+                SELECT id, n8n_id, name, n8n_updated_at FROM workflows
+                WHERE id IN ({placeholders}) OR n8n_id IN ({placeholders})
+            ''', ids + ids).fetchall()
+        return self._resolve_rows(rows, requested)
+    
+    def insert_executions(self, executions: List[Dict[str, Any]]) -> int:
+        """Insertar varias ejecuciones en una sola transacción"""
+        if not executions:
+            return 0
+        
+        with self.get_connection() as conn:
+            executions = self._insert_execution_rows(conn, executions)
+            self._record_durations(conn, executions)
+            self._refresh_workflow_counters(conn, {e["workflow_id"] for e in executions})
+        
+        if executions:
+            self._notify("executions_inserted", executions)
+        return len(executions)
+    
+    def _insert_execution_rows(self, conn, executions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """INSERT OR IGNORE del lote; devuelve las ejecuciones que realmente entraron"""
+        # Las ejecuciones de N8N ya registradas (mismo n8n_execution_id) se ignoran
+        cursor = conn.executemany('''
+            INSERT OR IGNORE INTO executions (id, workflow_id, workflow_name, n8n_execution_id,
+                                  status, start_time, end_time, duration, triggered_by,
+                                  data_processed, error_message)
+            VALUES (:id, :workflow_id, :workflow_name, :n8n_execution_id,
+                    :status, :start_time, :end_time, :duration, :triggered_by,
+                    :data_processed, :error_message)
+        ''', executions)
+        inserted = cursor.rowcount
+        if inserted < len(executions):
+            # Quedarse sólo con las filas que realmente entraron: dentro de la
+            # transacción las nuevas son las de rowid más alto entre los ids del lote
+            placeholders = ",".join("?" * len(executions))
+            present = {row[0] for row in conn.execute(
+                f"SELECT id FROM executions WHERE id IN ({placeholders}) "
+                f"ORDER BY rowid DESC LIMIT ?",
+                [e["id"] for e in executions] + [inserted]
+            )}
+            executions = [e for e in executions if e["id"] in present]
         return executions
     
-    def get_dashboard_stats(self) -> DashboardStats:
-        """Calcular estadísticas del dashboard"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def _record_durations(self, conn, executions: Iterable[Dict[str, Any]]):
+        """Sumar las duraciones de ejecuciones terminadas a los sketches (dentro de la transacción de escritura)"""
+        samples = duration_samples(executions)
+        if not samples:
+            return
         
-        # Estadísticas de workflows
-        cursor.execute('SELECT COUNT(*) FROM workflows')
-        total_workflows = cursor.fetchone()[0]
+        keys = list(samples)
+        values = ",".join("(?, ?, ?)" for _ in keys)
+        stored = {(row[0], row[1], row[2]): row[3] for row in conn.execute(f'''
+            SELECT resolution, bucket, workflow_id, sketch FROM workflow_duration_sketches
+            WHERE (workflow_id, resolution, bucket) IN (VALUES {values})
+        ''', [part for resolution, bucket, workflow_id in keys for part in (workflow_id, resolution, bucket)])}
+        conn.executemany('''
+            INSERT INTO workflow_duration_sketches
+                (resolution, bucket, workflow_id, samples, total_duration, sketch)
+            VALUES (:resolution, :bucket, :workflow_id, :samples, :total_duration, :sketch)
+            ON CONFLICT (workflow_id, resolution, bucket) DO UPDATE SET
+                samples = excluded.samples,
+                total_duration = excluded.total_duration,
+                sketch = excluded.sketch
+        ''', updated_sketches(samples, stored))
+        for resolution, cutoff in sketch_cutoffs(datetime.now()).items():
+            conn.execute(
+                "DELETE FROM workflow_duration_sketches WHERE resolution = ? AND bucket < ?",
+                (resolution, cutoff)
+            )
+    
+    def _refresh_workflow_counters(self, conn, workflow_ids: Iterable[str]):
+        """Recalcular total_executions, success_rate, avg_execution_time y last_execution desde los agregados"""
+        ids = list(workflow_ids)
+        if not ids:
+            return
         
-        cursor.execute("SELECT COUNT(*) FROM workflows WHERE status = 'active'")
-        active_workflows = cursor.fetchone()[0]
+        placeholders = ",".join("?" * len(ids))
+        # success_rate sobre ejecuciones terminadas (success + error); avg_execution_time
+        # desde el sketch acumulado (se conserva el valor anterior si no hay duraciones)
+        conn.execute(f'''
+            UPDATE workflows SET
+                total_executions = s.executions,
+                success_rate = CASE WHEN s.successes + s.errors > 0
+                    THEN ROUND(s.successes * 100.0 / (s.successes + s.errors), 1)
+                    ELSE workflows.success_rate END,
+                avg_execution_time = COALESCE((
+                    SELECT ROUND(d.total_duration / d.samples, 1) FROM workflow_duration_sketches AS d
+                    WHERE d.resolution = 'all' AND d.bucket = '' AND d.workflow_id = workflows.id
+                ), workflows.avg_execution_time),
+                last_execution = s.last_execution
+            FROM workflow_execution_stats AS s
+            WHERE s.workflow_id = workflows.id AND workflows.id IN ({placeholders})
+        ''', ids)
+    
+    def get_known_n8n_execution_ids(self, n8n_execution_ids: Iterable[str]) -> set:
+        """Subconjunto de ids de ejecución de N8N que ya están registrados"""
+        ids = list(set(n8n_execution_ids))
+        if not ids:
+            return set()
         
-        # Estadísticas de ejecuciones
-        cursor.execute('SELECT COUNT(*) FROM executions')
-        total_executions = cursor.fetchone()[0]
+        placeholders = ",".join("?" * len(ids))
+        with self.get_connection() as conn:
+            rows = conn.execute(f'''
+                SELECT n8n_execution_id FROM executions
+                WHERE n8n_execution_id IN ({placeholders})
+            ''', ids).fetchall()
+        return {row[0] for row in rows}
+    
+    def get_workflow_definition(self, n8n_id: str) -> Optional[Dict[str, Any]]:
+        """Definición guardada de un workflow de N8N (n8n_id, updated_at, etag, definition, fetched_at)"""
+        with self.get_connection() as conn:
+            row = conn.execute('''
+                SELECT n8n_id, updated_at, etag, definition, fetched_at
+                FROM n8n_workflow_definitions WHERE n8n_id = ?
+            ''', (n8n_id,)).fetchone()
+        return dict(row) if row else None
+    
+    def save_workflow_definition(self, definition: Dict[str, Any]):
+        """Guardar o reemplazar la definición de un workflow de N8N"""
+        with self.get_connection() as conn:
+            conn.execute('''
+                INSERT INTO n8n_workflow_definitions (n8n_id, updated_at, etag, definition, fetched_at)
+                VALUES (:n8n_id, :updated_at, :etag, :definition, CURRENT_TIMESTAMP)
+                ON CONFLICT (n8n_id) DO UPDATE SET
+                    updated_at = excluded.updated_at,
+                    etag = excluded.etag,
+                    definition = excluded.definition,
+                    fetched_at = excluded.fetched_at
+            ''', definition)
+    
+    def get_inflight_executions(self, limit: int = 10000) -> List[Dict[str, Any]]:
+        """Ejecuciones de N8N todavía running o waiting, las más antiguas primero"""
+        with self.get_connection() as conn:
+            rows = conn.execute('''
+                SELECT id, workflow_id, n8n_execution_id, status, start_time FROM executions
+                WHERE status IN ('running', 'waiting') AND n8n_execution_id IS NOT NULL
+                ORDER BY start_time
+                LIMIT ?
+            ''', (limit,)).fetchall()
+        return [{**dict(row), "start_time": datetime.fromisoformat(row["start_time"])} for row in rows]
+    
+    def update_execution_statuses(self, updates: List[Dict[str, Any]]) -> int:
+        """Aplicar en una transacción los cambios de estado de ejecuciones en curso"""
+        if not updates:
+            return 0
         
-        cursor.execute("SELECT COUNT(*) FROM executions WHERE status = 'success'")
-        successful_executions = cursor.fetchone()[0]
+        by_id = {u["id"]: u for u in updates}
+        ids = list(by_id)
+        placeholders = ",".join("?" * len(ids))
+        with self.get_connection() as conn:
+            # Lock de escritura antes de leer: nadie cambia estas filas entre el SELECT y el UPDATE
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(f'''
+                SELECT id, workflow_id, start_time FROM executions
+                WHERE id IN ({placeholders}) AND status IN ('running', 'waiting')
+            ''', ids).fetchall()
+            changed = [{**by_id[row["id"]], "workflow_id": row["workflow_id"],
+                        "start_time": row["start_time"]} for row in rows]
+            self._update_execution_rows(conn, changed)
+            self._record_durations(conn, changed)
+            self._refresh_workflow_counters(conn, {u["workflow_id"] for u in changed})
         
-        success_rate = (successful_executions / total_executions * 100) if total_executions > 0 else 0
+        if changed:
+            self._notify("executions_updated", changed)
+        return len(changed)
+    
+    def _update_execution_rows(self, conn, updates: List[Dict[str, Any]]):
+        """UPDATE de estado por id; los triggers de agregados mueven los contadores de running a success/error"""
+        conn.executemany('''
+            UPDATE executions SET
+                status = :status, end_time = :end_time, duration = :duration,
+                error_message = :error_message,
+                data_processed = COALESCE(:data_processed, data_processed)
+            WHERE id = :id
+        ''', [{"data_processed": None, **u,
+               "end_time": u["end_time"].isoformat() if u["end_time"] else None}
+              for u in updates])
+    
+    def record_execution_events(self, executions: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Registrar eventos de ejecución de N8N en una transacción"""
+        if not executions:
+            return 0, 0
         
-        # Estadísticas de hoy
-        today = datetime.now().date()
-        cursor.execute('''
-            SELECT COUNT(*) FROM executions 
-            WHERE DATE(start_time) = ?
-        ''', (today,))
-        executions_today = cursor.fetchone()[0]
+        with self.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            inserted = self._insert_execution_rows(conn, executions)
+            inserted_ids = {e["id"] for e in inserted}
+            pending = pending_execution_events(e for e in executions if e["id"] not in inserted_ids)
+            changed = []
+            if pending:
+                ids = list(pending)
+                placeholders = ",".join("?" * len(ids))
+                rows = conn.execute(f'''
+                    SELECT id, workflow_id, n8n_execution_id, status, start_time FROM executions
+                    WHERE n8n_execution_id IN ({placeholders}) AND status IN ('running', 'waiting')
+                ''', ids).fetchall()
+                changed = execution_event_updates(pending, [dict(row) for row in rows])
+                self._update_execution_rows(conn, changed)
+            self._record_durations(conn, inserted + changed)
+            self._refresh_workflow_counters(
+                conn, {e["workflow_id"] for e in inserted} | {u["workflow_id"] for u in changed}
+            )
         
-        cursor.execute('''
-            SELECT COUNT(*) FROM executions 
-            WHERE DATE(start_time) = ? AND status = 'error'
-        ''', (today,))
-        errors_today = cursor.fetchone()[0]
+        if inserted:
+            self._notify("executions_inserted", inserted)
+        if changed:
+            self._notify("executions_updated", changed)
+        return len(inserted), len(changed)
+    
+    def try_acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """Tomar o renovar un lease; falla si otro dueño lo tiene vigente"""
+        now = time.time()
+        with self.get_connection() as conn:
+            cursor = conn.execute('''
+                INSERT INTO scheduler_leases (name, owner, expires_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET
+                    owner = excluded.owner,
+                    expires_at = excluded.expires_at
+                WHERE scheduler_leases.owner = excluded.owner
+                   OR scheduler_leases.expires_at < ?
+            ''', (name, owner, now + ttl, now))
+            return cursor.rowcount > 0
+    
+    def release_lease(self, name: str, owner: str):
+        """Liberar un lease propio para que otro proceso lo tome de inmediato"""
+        with self.get_connection() as conn:
+            conn.execute(
+                "DELETE FROM scheduler_leases WHERE name = ? AND owner = ?", (name, owner)
+            )
+    
+    def get_execution_months(self, before: datetime) -> List[str]:
+        """Meses (YYYY-MM) con ejecuciones en la tabla viva anteriores a la fecha dada"""
+        before = to_local_naive(before).isoformat()
+        with self.get_connection() as conn:
+            rows = conn.execute('''
+                SELECT DISTINCT substr(start_time, 1, 7) FROM executions
+                WHERE start_time < ? AND replace(start_time, ' ', 'T') < ?
+                ORDER BY 1
+            ''', (before, before)).fetchall()
+        return [row[0] for row in rows]
+    
+    def iter_execution_rows(self, start_time: datetime, end_time: datetime,
+                            batch_size: int = 10000) -> Iterator[List[Tuple]]:
+        """Lotes de filas de [start_time, end_time) en el orden de EXECUTION_COLUMNS, fechas en ISO"""
+        with self.get_connection() as conn:
+            cursor = conn.execute(f'''
+                SELECT {", ".join(EXECUTION_COLUMNS)} FROM executions
+                WHERE {time_range_sql("start_time")}
+                ORDER BY start_time, id
+            ''', time_range_params(start_time, end_time))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [tuple(row) for row in rows]
+    
+    def get_execution_archives(self) -> List[Dict[str, Any]]:
+        """Catálogo de archivos con ejecuciones archivadas"""
+        with self.get_connection() as conn:
+            rows = conn.execute('''
+                SELECT path, month, row_count, min_start_time, max_start_time, archived_at
+                FROM execution_archives
+                ORDER BY month
+            ''').fetchall()
+        return [dict(row) for row in rows]
+    
+    def archive_execution_range(self, start_time: datetime, end_time: datetime,
+                                archive: Dict[str, Any]) -> int:
+        """Registrar un archivo en el catálogo y borrar su rango de la tabla viva (una transacción)"""
+        condition = time_range_sql("start_time")
+        params = time_range_params(start_time, end_time)
+        with self.get_connection() as conn:
+            # Lock de escritura antes de comparar: nadie cambia el rango entre la comparación y el DELETE
+            conn.execute("BEGIN IMMEDIATE")
+            digest = hashlib.sha256()
+            update_rows_digest(digest, conn.execute(f'''
+                SELECT {", ".join(EXECUTION_COLUMNS)} FROM executions
+                WHERE {condition}
+                ORDER BY start_time, id
+            ''', params))
+            if digest.hexdigest() != archive["digest"]:
+                # Entraron o cambiaron filas mientras se exportaba: se reintenta luego
+                raise RuntimeError(f"El mes {archive['month']} cambió durante el archivado")
+            deleted = conn.execute(f"DELETE FROM executions WHERE {condition}", params).rowcount
+            conn.execute('''
+                INSERT INTO execution_archives
+                    (path, month, row_count, min_start_time, max_start_time)
+                VALUES (:path, :month, :rows, :min_start_time, :max_start_time)
+            ''', archive)
         
-        # Tiempo ahorrado y ROI
-        cursor.execute('SELECT SUM(time_saved_hours) FROM workflows')
-        total_time_saved = cursor.fetchone()[0] or 0
+        self._notify("executions_archived", archive)
+        return deleted
+    
+    def get_timeseries(self, resolution: str, start_time: datetime, end_time: datetime,
+                       workflow_id: Optional[str] = None) -> List[ChartData]:
+        """Serie temporal de ejecuciones leída de los buckets precalculados"""
+        start_time, end_time = to_local_naive(start_time), to_local_naive(end_time)
+        conditions = ["b.resolution = ?", "b.bucket >= ?", "b.bucket <= ?"]
+        params: List[Any] = [resolution, bucket_key(start_time, resolution),
+                             bucket_key(end_time, resolution)]
+        if workflow_id:
+            conditions.append("b.workflow_id = ?")
+            params.append(workflow_id)
         
-        total_roi = total_time_saved * 25  # $25/hora
+        # El tiempo ahorrado se reparte según lo que ahorra cada ejecución exitosa del workflow
+        with self.get_connection() as conn:
+            rows = conn.execute(f'''
+                SELECT b.bucket,
+                       SUM(b.executions), SUM(b.successes), SUM(b.errors),
+                       SUM(b.successes * COALESCE(
+                           w.time_saved_hours / NULLIF(w.total_executions, 0), 0))
+                FROM execution_buckets AS b
+                LEFT JOIN workflows AS w ON w.id = b.workflow_id
+                WHERE {' AND '.join(conditions)}
+                GROUP BY b.bucket
+            ''', params).fetchall()
+        return self._timeseries_from_rows(rows, resolution, start_time, end_time)
+    
+    @cached(tags=("stats",), ttl=10)
+    def get_workflow_analytics(self, workflow_id: str) -> Optional[WorkflowAnalytics]:
+        """Analytics de un workflow leídas de los sketches y buckets precalculados"""
+        workflow = self.resolve_workflows([workflow_id]).get(workflow_id)
+        if workflow is None:
+            return None
         
-        conn.close()
+        now = datetime.now()
+        cutoffs = analytics_cutoffs(now)
+        sketch_ranges = [r for r in SKETCH_RETENTION if r in cutoffs]
+        with self.get_connection() as conn:
+            sketch_rows = conn.execute(f'''
+                SELECT resolution, bucket, sketch FROM workflow_duration_sketches
+                WHERE workflow_id = ? AND ((resolution = 'all' AND bucket = '')
+                    {"".join(" OR (resolution = ? AND bucket >= ?)" for _ in sketch_ranges)})
+            ''', [workflow["id"]] + [v for r in sketch_ranges for v in (r, cutoffs[r])]).fetchall()
+            count_rows = conn.execute(f'''
+                SELECT resolution, bucket, executions, successes, errors FROM execution_buckets
+                WHERE workflow_id = ? AND ({" OR ".join("(resolution = ? AND bucket >= ?)" for _ in cutoffs)})
+            ''', [workflow["id"]] + [v for item in cutoffs.items() for v in item]).fetchall()
+        return self._analytics_from_rows(workflow["id"], sketch_rows, count_rows, now)
+    
+    @cached(tags=("stats",), ttl=10)
+    def get_dashboard_stats(self) -> DashboardStats:
+        """Calcular estadísticas del dashboard a partir de los agregados"""
+        today = datetime.now().date().isoformat()
         
-        return DashboardStats(
-            total_workflows=total_workflows,
-            active_workflows=active_workflows,
-            total_executions=total_executions,
-            success_rate=round(success_rate, 1),
-            total_time_saved=total_time_saved,
-            total_roi=total_roi,
-            executions_today=executions_today,
-            errors_today=errors_today
-        )
\ No newline at end of file
+        with self.get_connection() as conn:
+            row = conn.execute('''
+                SELECT w.total, w.active, w.time_saved,
+                       e.total, e.successes,
+                       d.total, d.errors
+                FROM (
+                    SELECT COUNT(*) AS total,
+                           COALESCE(SUM(status = 'active'), 0) AS active,
+                           COALESCE(SUM(time_saved_hours), 0) AS time_saved
+                    FROM workflows
+                ) AS w,
+                (
+                    SELECT COALESCE(SUM(executions), 0) AS total,
+                           COALESCE(SUM(successes), 0) AS successes
+                    FROM workflow_execution_stats
+                ) AS e,
+                (
+                    SELECT COALESCE(SUM(executions), 0) AS total,
+                           COALESCE(SUM(errors), 0) AS errors
+                    FROM execution_buckets
+                    WHERE resolution = 'day' AND bucket = ?
+                ) AS d
+            ''', (today,)).fetchone()
+        
+        return self._dashboard_stats_from_row(row)
+
+def create_database(url: str, pool_size: int = 5, cache: Optional[TTLCache] = None,
+                    migrate: bool = True) -> StorageBackend:
+    """Crear el backend de almacenamiento que corresponde al esquema de la URL"""
+    if url.startswith(("postgresql://", "postgres://")):
+        # Import diferido: psycopg sólo hace falta con PostgreSQL
+        from .database_postgres import PostgresDatabase
+        return PostgresDatabase(url, pool_size=pool_size, cache=cache, migrate=migrate)
+    if url.startswith("sqlite:///"):
+        url = url[len("sqlite:///"):]
+    return Database(url, pool_size=pool_size, cache=cache, migrate=migrate)
+
+_database: Optional[StorageBackend] = None
+_database_lock = threading.Lock()
+
+def get_database() -> StorageBackend:
+    """Instancia única del almacenamiento compartida por todo el proceso"""
+    global _database
+    if _database is None:
+        with _database_lock:
+            if _database is None:
+                load_config()
+                cache = None
+                if env_flag("CACHE_ENABLED", True):
+                    cache = TTLCache(max_entries=int(os.getenv("CACHE_MAX_ENTRIES", 1024)))
+                database = create_database(
+                    os.getenv("DATABASE_URL", "sqlite:///./business_automation.db"),
+                    pool_size=int(os.getenv("DATABASE_POOL_SIZE", 5)),
+                    cache=cache,
+                    migrate=env_flag("DATABASE_AUTO_MIGRATE", True)
+                )
+                # Datos de ejemplo sólo a pedido (o con: python -m app.manage seed)
+                if env_flag("SEED_SAMPLE_DATA"):
+                    database.seed_sample_data()
+                _database = database
+    return _database
+
+def close_database():
+    """Cerrar el pool de la instancia compartida (al apagar la app)"""
+    global _database
+    with _database_lock:
+        if _database is not None:
+            _database.close()
+            _database = None
@@ -0,0 +1,1087 @@
+import hashlib
+import math
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import time
+
+from psycopg.rows import dict_row, tuple_row
+from psycopg_pool import ConnectionPool
+
+from .cache import TTLCache, cached
+from .database import (
+    StorageBackend, SAMPLE_WORKFLOWS, EXECUTION_COLUMNS, EXECUTION_COMPACT_COLUMNS,
+    BUCKET_RESOLUTIONS, bucket_key, decode_cursor, encode_cursor, to_local_naive, truncate_to_bucket,
+    execution_json_columns, execution_event_updates, pending_execution_events,
+    SKETCH_RELATIVE_ACCURACY, SKETCH_RETENTION, analytics_cutoffs, duration_samples, sketch_cutoffs,
+    sketches_from_bins, updated_sketches, update_rows_digest,
+)
+from .sketch import MIN_INDEXABLE_VALUE, DDSketch
+from .serialization import (
+    EXECUTION_FIELDS, WORKFLOW_FIELDS, encode_executions, encode_execution_models, encode_workflows
+)
+from .models import Workflow, Execution, DashboardStats, ChartData, WorkflowAnalytics
+
+# Formato de to_char equivalente a bucket_key para cada resolución
+BUCKET_FORMATS = {
+    "minute": 'YYYY-MM-DD"T"HH24:MI',
+    "hour": 'YYYY-MM-DD"T"HH24',
+    "day": 'YYYY-MM-DD',
+}
+
+# Tipo de cada columna de EXECUTION_COLUMNS para la inserción por arrays (unnest)
+EXECUTION_COLUMN_TYPES = {
+    "id": "text", "workflow_id": "text", "workflow_name": "text",
+    "n8n_execution_id": "text", "status": "text", "start_time": "timestamp",
+    "end_time": "timestamp", "duration": "float8", "triggered_by": "text",
+    "data_processed": "int4", "error_message": "text",
+}
+
+# Igual que CURRENT_TIMESTAMP en SQLite: hora UTC sin zona
+UTC_NOW = "(now() AT TIME ZONE 'utc')"
+
+# Serializa la creación del esquema cuando arrancan varios procesos a la vez
+SCHEMA_LOCK_ID = 727361
+
+def _bucket_resolutions_sql() -> str:
+    """VALUES (resolución, formato) para expandir cada fila a todos sus buckets"""
+    return ", ".join(f"('{r}', '{BUCKET_FORMATS[r]}')" for r in BUCKET_RESOLUTIONS)
+
+def _column_array(executions: List[Dict[str, Any]], column: str) -> List[Any]:
+    """Valores de una columna con un solo tipo de Python por array"""
+    kind = EXECUTION_COLUMN_TYPES[column]
+    values = [e.get(column) for e in executions]
+    if kind == "timestamp":
+        return [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    if kind == "float8":
+        return [float(v) if v is not None else None for v in values]
+    if kind == "int4":
+        return [int(v) if v is not None else None for v in values]
+    return values
+
+def _iso_row(row: Sequence[Any]) -> Tuple:
+    """Fila con los timestamps en ISO, como las devuelve el backend SQLite"""
+    return tuple(v.isoformat() if isinstance(v, datetime) else v for v in row)
+
+class PostgresDatabase(StorageBackend):
+    """Almacenamiento PostgreSQL con pool de conexiones de psycopg"""
+    
+    MIGRATIONS = (
+        ("baseline", "_create_base_schema"),
+        ("n8n_workflow_definitions", "_create_workflow_definitions"),
+        ("workflow_duration_sketches", "_create_duration_sketches"),
+    )
+    
+    def __init__(self, url: str, pool_size: int = 5, cache: Optional[TTLCache] = None,
+                 migrate: bool = True):
+        super().__init__(cache)
+        self.url = url
+        self.pool = ConnectionPool(
+            url, min_size=1, max_size=pool_size,
+            kwargs={"row_factory": dict_row}, open=True
+        )
+        if migrate:
+            self.migrate()
+    
+    def get_connection(self):
+        """Context manager que presta una conexión del pool (commit al salir)"""
+        return self.pool.connection()
+    
+    def close(self):
+        self.pool.close()
+    
+    def pool_stats(self) -> Dict[str, float]:
+        stats = self.pool.get_stats()
+        return {
+            "max": stats.get("pool_max", 0),
+            "open": stats.get("pool_size", 0),
+            "idle": stats.get("pool_available", 0),
+            "in_use": stats.get("pool_size", 0) - stats.get("pool_available", 0),
+            "waits": stats.get("requests_queued", 0),
+            "wait_seconds": stats.get("requests_wait_ms", 0) / 1000,
+        }
+    
+    def get_schema_version(self) -> int:
+        """Última migración aplicada (0 si la base está vacía)"""
+        with self.get_connection() as conn:
+            if conn.execute("SELECT to_regclass('schema_migrations') AS name").fetchone()["name"] is None:
+                return 0
+            return conn.execute(
+                "SELECT COALESCE(MAX(version), 0) AS version FROM schema_migrations"
+            ).fetchone()["version"]
+    
+    def _apply_migrations(self) -> List[int]:
+        """Aplicar bajo lock las migraciones posteriores a la versión actual"""
+        applied = []
+        with self.get_connection() as conn:
+            conn.execute("SELECT pg_advisory_xact_lock(%s)", (SCHEMA_LOCK_ID,))
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TIMESTAMP DEFAULT {UTC_NOW}
+                )
+            ''')
+            current = conn.execute(
+                "SELECT COALESCE(MAX(version), 0) AS version FROM schema_migrations"
+            ).fetchone()["version"]
+            for version, (name, method) in enumerate(self.MIGRATIONS, start=1):
+                if version <= current:
+                    continue
+                getattr(self, method)(conn)
+                conn.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name)
+                )
+                applied.append(version)
+        return applied
+    
+    def _create_base_schema(self, conn):
+        """Migración 1: tablas, índices y triggers de agregados"""
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS workflows (
+                id TEXT PRIMARY KEY,
+                n8n_id TEXT UNIQUE,
+                name TEXT NOT NULL,
+                description TEXT,
+                category TEXT DEFAULT 'General',
+                status TEXT DEFAULT 'inactive',
+                created_at TIMESTAMP DEFAULT {UTC_NOW},
+                updated_at TIMESTAMP DEFAULT {UTC_NOW},
+                last_execution TIMESTAMP,
+                total_executions INTEGER DEFAULT 0,
+                success_rate DOUBLE PRECISION DEFAULT 0.0,
+                avg_execution_time DOUBLE PRECISION DEFAULT 0.0,
+                time_saved_hours DOUBLE PRECISION DEFAULT 0.0,
+                triggers TEXT DEFAULT '[]',
+                actions TEXT DEFAULT '[]',
+                n8n_updated_at TEXT
+            )
+        ''')
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS executions (
+                id TEXT PRIMARY KEY,
+                workflow_id TEXT NOT NULL,
+                workflow_name TEXT NOT NULL,
+                n8n_execution_id TEXT UNIQUE,
+                status TEXT NOT NULL,
+                start_time TIMESTAMP DEFAULT {UTC_NOW},
+                end_time TIMESTAMP,
+                duration DOUBLE PRECISION,
+                triggered_by TEXT DEFAULT 'manual',
+                data_processed INTEGER DEFAULT 0,
+                error_message TEXT
+            )
+        ''')
+        
+        # Mismos índices que en SQLite: rangos de tiempo y paginación por (start_time, id)
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_executions_start_id
+            ON executions (start_time, id)
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_executions_workflow_start_id
+            ON executions (workflow_id, start_time, id)
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_executions_status_start_id
+            ON executions (status, start_time, id)
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_workflows_category
+            ON workflows (lower(category))
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_workflows_status
+            ON workflows (status)
+        ''')
+        
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS scheduler_leases (
+                name TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at DOUBLE PRECISION NOT NULL
+            )
+        ''')
+        
+        # Catálogo de meses archivados en disco
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS execution_archives (
+                path TEXT PRIMARY KEY,
+                month TEXT NOT NULL,
+                row_count INTEGER NOT NULL,
+                min_start_time TEXT,
+                max_start_time TEXT,
+                archived_at TIMESTAMP DEFAULT {UTC_NOW}
+            )
+        ''')
+        
+        self._init_rollups(conn)
+        self._init_table_versions(conn)
+    
+    def _create_workflow_definitions(self, conn):
+        """Migración 2: definiciones completas de workflows de N8N (JSON tal como llegó)"""
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS n8n_workflow_definitions (
+                n8n_id TEXT PRIMARY KEY,
+                updated_at TEXT,
+                etag TEXT,
+                definition TEXT NOT NULL,
+                fetched_at TIMESTAMP DEFAULT {UTC_NOW}
+            )
+        ''')
+    
+    def _create_duration_sketches(self, conn):
+        """Migración 3: sketches de duración por workflow, cargados desde las ejecuciones existentes"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS workflow_duration_sketches (
+                resolution TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                workflow_id TEXT NOT NULL,
+                samples BIGINT NOT NULL,
+                total_duration DOUBLE PRECISION NOT NULL,
+                sketch BYTEA NOT NULL,
+                PRIMARY KEY (workflow_id, resolution, bucket)
+            )
+        ''')
+        # Para borrar los sketches por hora y por día vencidos
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_workflow_duration_sketches_bucket
+            ON workflow_duration_sketches (resolution, bucket)
+        ''')
+        
+        # Los bins se agrupan en SQL (mismo índice que DDSketch.key): llega una fila por bin
+        log_gamma = math.log(DDSketch(SKETCH_RELATIVE_ACCURACY).gamma)
+        now = datetime.now()
+        groups = [("'all'", "''", "", ())]
+        for resolution, keep in SKETCH_RETENTION.items():
+            groups.append((f"'{resolution}'", f"to_char(start_time, '{BUCKET_FORMATS[resolution]}')",
+                           "AND start_time >= %s", (truncate_to_bucket(now - keep, resolution),)))
+        for resolution, bucket, condition, params in groups:
+            rows = conn.cursor(row_factory=tuple_row).execute(f'''
+                SELECT {resolution}, {bucket}, workflow_id,
+                       CASE WHEN duration > %s THEN ceil(ln(duration) / %s)::int END,
+                       COUNT(*), SUM(duration), MIN(duration), MAX(duration)
+                FROM executions
+                WHERE status IN ('success', 'error') AND duration >= 0 {condition}
+                GROUP BY 2, 3, 4
+            ''', (MIN_INDEXABLE_VALUE, log_gamma, *params)).fetchall()
+            conn.cursor().executemany('''
+                INSERT INTO workflow_duration_sketches
+                    (resolution, bucket, workflow_id, samples, total_duration, sketch)
+                VALUES (%(resolution)s, %(bucket)s, %(workflow_id)s, %(samples)s,
+                        %(total_duration)s, %(sketch)s)
+                ON CONFLICT (workflow_id, resolution, bucket) DO NOTHING
+            ''', sketches_from_bins(rows))
+        
+        conn.execute('''
+            UPDATE workflows SET avg_execution_time = ROUND((d.total_duration / d.samples)::numeric, 1)
+            FROM workflow_duration_sketches AS d
+            WHERE d.resolution = 'all' AND d.bucket = '' AND d.workflow_id = workflows.id
+        ''')
+    
+    def _init_table_versions(self, conn):
+        """Contador de versión por tabla, incrementado por un trigger por sentencia"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS table_versions (
+                name TEXT PRIMARY KEY,
+                version BIGINT NOT NULL DEFAULT 0
+            )
+        ''')
+        conn.execute('''
+            INSERT INTO table_versions (name) VALUES ('workflows')
+            ON CONFLICT (name) DO NOTHING
+        ''')
+        conn.execute('''
+            CREATE OR REPLACE FUNCTION bump_workflows_version() RETURNS trigger AS $$
+            BEGIN
+                UPDATE table_versions SET version = version + 1 WHERE name = 'workflows';
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        ''')
+        conn.execute("DROP TRIGGER IF EXISTS trg_workflows_version ON workflows")
+        conn.execute('''
+            CREATE TRIGGER trg_workflows_version
+            AFTER INSERT OR UPDATE OR DELETE ON workflows
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_workflows_version()
+        ''')
+    
+    def _init_rollups(self, conn):
+        """Crear las tablas de agregados y los triggers que las mantienen"""
+        needs_backfill = conn.execute(
+            "SELECT to_regclass('workflow_execution_stats') IS NULL AS missing"
+        ).fetchone()["missing"]
+        
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS workflow_execution_stats (
+                workflow_id TEXT PRIMARY KEY,
+                executions BIGINT NOT NULL DEFAULT 0,
+                successes BIGINT NOT NULL DEFAULT 0,
+                errors BIGINT NOT NULL DEFAULT 0,
+                last_execution TIMESTAMP
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS execution_buckets (
+                resolution TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                workflow_id TEXT NOT NULL,
+                executions BIGINT NOT NULL DEFAULT 0,
+                successes BIGINT NOT NULL DEFAULT 0,
+                errors BIGINT NOT NULL DEFAULT 0,
+                PRIMARY KEY (resolution, bucket, workflow_id)
+            )
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_execution_buckets_workflow
+            ON execution_buckets (resolution, workflow_id, bucket)
+        ''')
+        
+        resolutions = _bucket_resolutions_sql()
+        
+        # Triggers por sentencia: un lote de N filas actualiza cada agregado una sola vez.
+        # Las filas se bloquean siempre en orden de clave para evitar deadlocks entre lotes
+        conn.execute(f'''
+            CREATE OR REPLACE FUNCTION executions_rollup_insert() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO workflow_execution_stats AS s
+                    (workflow_id, executions, successes, errors, last_execution)
+                SELECT workflow_id, COUNT(*),
+                       COUNT(*) FILTER (WHERE status = 'success'),
+                       COUNT(*) FILTER (WHERE status = 'error'),
+                       MAX(start_time)
+                FROM new_rows
+                GROUP BY workflow_id
+                ORDER BY workflow_id
+                ON CONFLICT (workflow_id) DO UPDATE SET
+                    executions = s.executions + excluded.executions,
+                    successes = s.successes + excluded.successes,
+                    errors = s.errors + excluded.errors,
+                    last_execution = GREATEST(s.last_execution, excluded.last_execution);
+                
+                INSERT INTO execution_buckets AS b
+                    (resolution, bucket, workflow_id, executions, successes, errors)
+                SELECT r.resolution, to_char(n.start_time, r.format), n.workflow_id, COUNT(*),
+                       COUNT(*) FILTER (WHERE n.status = 'success'),
+                       COUNT(*) FILTER (WHERE n.status = 'error')
+                FROM new_rows AS n
+                CROSS JOIN (VALUES {resolutions}) AS r (resolution, format)
+                GROUP BY 1, 2, 3
+                ORDER BY 1, 2, 3
+                ON CONFLICT (resolution, bucket, workflow_id) DO UPDATE SET
+                    executions = b.executions + excluded.executions,
+                    successes = b.successes + excluded.successes,
+                    errors = b.errors + excluded.errors;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        ''')
+        
+        # Un cambio de estado (p.ej. running -> success) mueve los contadores
+        conn.execute(f'''
+            CREATE OR REPLACE FUNCTION executions_rollup_status() RETURNS trigger AS $$
+            BEGIN
+                WITH changes AS (
+                    SELECT n.workflow_id, n.start_time,
+                           (n.status = 'success')::int - (o.status = 'success')::int AS successes,
+                           (n.status = 'error')::int - (o.status = 'error')::int AS errors
+                    FROM new_rows AS n
+                    JOIN old_rows AS o ON o.id = n.id
+                    WHERE n.status IS DISTINCT FROM o.status
+                ), stats AS (
+                    UPDATE workflow_execution_stats AS s SET
+                        successes = s.successes + c.successes,
+                        errors = s.errors + c.errors
+                    FROM (
+                        SELECT workflow_id, SUM(successes) AS successes, SUM(errors) AS errors
+                        FROM changes GROUP BY workflow_id
+                    ) AS c
+                    WHERE s.workflow_id = c.workflow_id
+                )
+                UPDATE execution_buckets AS b SET
+                    successes = b.successes + c.successes,
+                    errors = b.errors + c.errors
+                FROM (
+                    SELECT r.resolution, to_char(ch.start_time, r.format) AS bucket, ch.workflow_id,
+                           SUM(ch.successes) AS successes, SUM(ch.errors) AS errors
+                    FROM changes AS ch
+                    CROSS JOIN (VALUES {resolutions}) AS r (resolution, format)
+                    GROUP BY 1, 2, 3
+                ) AS c
+                WHERE b.resolution = c.resolution AND b.bucket = c.bucket
+                  AND b.workflow_id = c.workflow_id;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        ''')
+        
+        conn.execute("DROP TRIGGER IF EXISTS trg_executions_rollup_insert ON executions")
+        conn.execute("DROP TRIGGER IF EXISTS trg_executions_rollup_status ON executions")
+        conn.execute('''
+            CREATE TRIGGER trg_executions_rollup_insert
+            AFTER INSERT ON executions
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION executions_rollup_insert()
+        ''')
+        conn.execute('''
+            CREATE TRIGGER trg_executions_rollup_status
+            AFTER UPDATE ON executions
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION executions_rollup_status()
+        ''')
+        
+        if needs_backfill:
+            conn.execute('''
+                INSERT INTO workflow_execution_stats
+                    (workflow_id, executions, successes, errors, last_execution)
+                SELECT workflow_id, COUNT(*),
+                       COUNT(*) FILTER (WHERE status = 'success'),
+                       COUNT(*) FILTER (WHERE status = 'error'),
+                       MAX(start_time)
+                FROM executions
+                GROUP BY workflow_id
+            ''')
+        
+        for resolution, format in BUCKET_FORMATS.items():
+            if conn.execute(
+                "SELECT 1 FROM execution_buckets WHERE resolution = %s LIMIT 1", (resolution,)
+            ).fetchone():
+                continue
+            conn.execute('''
+                INSERT INTO execution_buckets
+                    (resolution, bucket, workflow_id, executions, successes, errors)
+                SELECT %s, to_char(start_time, %s), workflow_id, COUNT(*),
+                       COUNT(*) FILTER (WHERE status = 'success'),
+                       COUNT(*) FILTER (WHERE status = 'error')
+                FROM executions
+                GROUP BY 2, 3
+            ''', (resolution, format))
+    
+    def seed_sample_data(self):
+        """Poblar con datos de ejemplo si la DB está vacía"""
+        with self.get_connection() as conn:
+            conn.execute("SELECT pg_advisory_xact_lock(%s)", (SCHEMA_LOCK_ID,))
+            if conn.execute("SELECT COUNT(*) AS total FROM workflows").fetchone()["total"] > 0:
+                return
+            
+            conn.cursor().executemany('''
+                INSERT INTO workflows (id, n8n_id, name, description, category, status,
+                                       total_executions, success_rate, avg_execution_time,
+                                       time_saved_hours, triggers, actions)
+                VALUES (%(id)s, %(n8n_id)s, %(name)s, %(description)s, %(category)s, %(status)s,
+                        %(total_executions)s, %(success_rate)s, %(avg_execution_time)s,
+                        %(time_saved_hours)s, %(triggers)s, %(actions)s)
+            ''', SAMPLE_WORKFLOWS)
+            executions = self._sample_executions()
+            self._insert_execution_rows(conn, executions)
+            self._record_durations(conn, executions)
+    
+    def get_table_version(self, name: str) -> int:
+        """Versión actual de una tabla (cambia con cada escritura)"""
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT version FROM table_versions WHERE name = %s", (name,)
+            ).fetchone()
+        return row["version"] if row else 0
+    
+    @cached(tags=("workflows",), ttl=30)
+    def get_workflows(self, category: Optional[str] = None,
+                      status: Optional[str] = None) -> List[Workflow]:
+        """Obtener workflows, opcionalmente filtrados por categoría y estado"""
+        query, params = self._workflows_query("*", category, status)
+        with self.get_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [self._workflow_from_row(row) for row in rows]
+    
+    @cached(tags=("workflows",), ttl=30)
+    def get_workflows_json(self, category: Optional[str] = None, status: Optional[str] = None,
+                           version: Optional[int] = None) -> Tuple[int, bytes]:
+        """Lo mismo que get_workflows, ya codificado como JSON, con la versión de la tabla"""
+        query, params = self._workflows_query(", ".join(WORKFLOW_FIELDS), category, status)
+        with self.get_connection() as conn:
+            cursor = conn.cursor(row_factory=tuple_row)
+            # Con READ COMMITTED cada consulta vería su propio snapshot
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+            row = cursor.execute(
+                "SELECT version FROM table_versions WHERE name = 'workflows'"
+            ).fetchone()
+            rows = cursor.execute(query, params).fetchall()
+        return (row[0] if row else 0), encode_workflows(rows)
+    
+    def _workflows_query(self, columns: str, category: Optional[str] = None,
+                         status: Optional[str] = None) -> Tuple[str, List[Any]]:
+        conditions = []
+        params = []
+        if category:
+            conditions.append("lower(category) = lower(%s)")
+            params.append(category)
+        if status:
+            conditions.append("status = %s")
+            params.append(status)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return f"SELECT {columns} FROM workflows {where} ORDER BY total_executions DESC", params
+    
+    @cached(tags=("executions",), ttl=10)
+    def get_executions_page(self, workflow_id: Optional[str] = None, limit: int = 50,
+                            status: Optional[str] = None, triggered_by: Optional[str] = None,
+                            start_time: Optional[datetime] = None,
+                            end_time: Optional[datetime] = None,
+                            cursor: Optional[str] = None,
+                            include_error: bool = True,
+                            include_archived: bool = False) -> Tuple[List[Execution], Optional[str]]:
+        """Página de ejecuciones (más recientes primero) y cursor de la siguiente"""
+        columns = EXECUTION_COLUMNS if include_error else EXECUTION_COMPACT_COLUMNS
+        query, params = self._execution_page_query(
+            columns, workflow_id, limit, status, triggered_by, start_time, end_time, cursor
+        )
+        with self.get_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        
+        executions = [Execution(**row) for row in rows]
+        if include_archived:
+            return self._merge_archived(executions, limit, workflow_id, status, triggered_by,
+                                        start_time, end_time, cursor, include_error)
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = encode_cursor(rows[-1]["start_time"].isoformat(), rows[-1]["id"])
+        return executions, next_cursor
+    
+    @cached(tags=("executions",), ttl=10)
+    def get_executions_json(self, workflow_id: Optional[str] = None, limit: int = 50,
+                            status: Optional[str] = None, triggered_by: Optional[str] = None,
+                            start_time: Optional[datetime] = None,
+                            end_time: Optional[datetime] = None,
+                            cursor: Optional[str] = None,
+                            include_error: bool = True,
+                            include_archived: bool = False) -> Tuple[bytes, Optional[str]]:
+        """Lo mismo que get_executions_page, ya codificado como JSON sin crear un modelo por fila"""
+        if include_archived:
+            executions, next_cursor = self.get_executions_page(
+                workflow_id, limit, status, triggered_by, start_time, end_time, cursor,
+                include_error, include_archived
+            )
+            return encode_execution_models(executions), next_cursor
+        
+        columns = execution_json_columns(include_error)
+        query, params = self._execution_page_query(
+            columns, workflow_id, limit, status, triggered_by, start_time, end_time, cursor
+        )
+        with self.get_connection() as conn:
+            rows = conn.cursor(row_factory=tuple_row).execute(query, params).fetchall()
+        
+        next_cursor = None
+        if len(rows) == limit:
+            last = dict(zip(EXECUTION_FIELDS, rows[-1]))
+            next_cursor = encode_cursor(last["start_time"].isoformat(), last["id"])
+        return encode_executions(rows), next_cursor
+    
+    def _execution_page_query(self, columns: Iterable[str], workflow_id: Optional[str],
+                              limit: int, status: Optional[str], triggered_by: Optional[str],
+                              start_time: Optional[datetime], end_time: Optional[datetime],
+                              cursor: Optional[str]) -> Tuple[str, List[Any]]:
+        conditions, params = self._execution_filters(
+            workflow_id, status, triggered_by, start_time, end_time
+        )
+        if cursor:
+            # Keyset: continuar justo después de la última fila entregada
+            cursor_time, cursor_id = decode_cursor(cursor)
+            conditions.append("(start_time, id) < (%s, %s)")
+            params.extend([datetime.fromisoformat(cursor_time), cursor_id])
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return f'''
+            SELECT {", ".join(columns)} FROM executions
+            {where}
+            ORDER BY start_time DESC, id DESC
+            LIMIT %s
+        ''', params + [limit]
+    
+    def iter_executions(self, workflow_id: Optional[str] = None, status: Optional[str] = None,
+                        triggered_by: Optional[str] = None,
+                        start_time: Optional[datetime] = None,
+                        end_time: Optional[datetime] = None,
+                        include_error: bool = True,
+                        include_archived: bool = False,
+                        batch_size: int = 5000) -> Iterator[List[Sequence[Any]]]:
+        """Lotes de ejecuciones filtradas (más antiguas primero) en el orden de EXECUTION_FIELDS
+        
+        Usa un cursor del lado del servidor: retiene una conexión del pool
+        mientras dure la exportación (el router limita cuántas corren a la vez).
+        """
+        if include_archived:
+            yield from self._archived_batches(batch_size, workflow_id, status, triggered_by,
+                                              start_time, end_time, include_error)
+        
+        conditions, params = self._execution_filters(
+            workflow_id, status, triggered_by, start_time, end_time
+        )
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self.get_connection() as conn:
+            cursor = conn.cursor(name="iter_executions", row_factory=tuple_row)
+            cursor.itersize = batch_size
+            cursor.execute(f'''
+                SELECT {", ".join(execution_json_columns(include_error))} FROM executions
+                {where}
+                ORDER BY start_time, id
+            ''', params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+            cursor.close()
+    
+    def _execution_filters(self, workflow_id: Optional[str] = None, status: Optional[str] = None,
+                           triggered_by: Optional[str] = None,
+                           start_time: Optional[datetime] = None,
+                           end_time: Optional[datetime] = None) -> Tuple[List[str], List[Any]]:
+        """Condiciones WHERE comunes a los listados de ejecuciones"""
+        conditions: List[str] = []
+        params: List[Any] = []
+        if workflow_id:
+            conditions.append("workflow_id = %s")
+            params.append(workflow_id)
+        if status:
+            conditions.append("status = %s")
+            params.append(status)
+        if triggered_by:
+            conditions.append("triggered_by = %s")
+            params.append(triggered_by)
+        if start_time:
+            conditions.append("start_time >= %s")
+            params.append(to_local_naive(start_time))
+        if end_time:
+            conditions.append("start_time < %s")
+            params.append(to_local_naive(end_time))
+        return conditions, params
+    
+    def get_workflow_watermarks(self) -> Dict[str, Optional[str]]:
+        """Último updatedAt de N8N conocido para cada workflow sincronizado"""
+        with self.get_connection() as conn:
+            rows = conn.execute('''
+                SELECT n8n_id, n8n_updated_at FROM workflows WHERE n8n_id IS NOT NULL
+            ''').fetchall()
+        return {row["n8n_id"]: row["n8n_updated_at"] for row in rows}
+    
+    def upsert_workflows(self, workflows: List[Dict[str, Any]]) -> int:
+        """Insertar o actualizar workflows de N8N usando n8n_id como clave"""
+        if not workflows:
+            return 0
+        
+        with self.get_connection() as conn:
+            conn.cursor().executemany(f'''
+                INSERT INTO workflows (id, n8n_id, name, status, created_at, updated_at,
+                                       triggers, actions, n8n_updated_at)
+                VALUES (%(id)s, %(n8n_id)s, %(name)s, %(status)s,
+                        COALESCE(%(created_at)s::timestamp, {UTC_NOW}), {UTC_NOW},
+                        %(triggers)s, %(actions)s, %(n8n_updated_at)s)
+                ON CONFLICT (n8n_id) DO UPDATE SET
+                    name = excluded.name,
+                    status = excluded.status,
+                    triggers = excluded.triggers,
+                    actions = excluded.actions,
+                    n8n_updated_at = excluded.n8n_updated_at,
+                    updated_at = {UTC_NOW}
+            ''', workflows)
+        
+        self._notify("workflows_changed", [
+            {"n8n_id": w["n8n_id"], "name": w["name"], "status": w["status"]} for w in workflows
+        ])
+        return len(workflows)
+    
+    def set_workflow_status(self, workflow_id: str, status: str) -> bool:
+        """Cambiar el estado local de un workflow (por id local o de N8N)"""
+        with self.get_connection() as conn:
+            rows = conn.execute(f'''
+                UPDATE workflows SET status = %s, updated_at = {UTC_NOW}
+                WHERE id = %s OR n8n_id = %s
+                RETURNING id, n8n_id, name, status
+            ''', (status, workflow_id, workflow_id)).fetchall()
+        
+        if not rows:
+            return False
+        self._notify("workflows_changed", rows)
+        return True
+    
+    def resolve_workflows(self, workflow_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Mapear ids locales o de N8N a su workflow (id, n8n_id, name, n8n_updated_at)"""
+        requested = set(workflow_ids)
+        if not requested:
+            return {}
+        
+        ids = list(requested)
+        with self.get_connection() as conn:
+            rows = conn.execute('''
+                SELECT id, n8n_id, name, n8n_updated_at FROM workflows
+                WHERE id = ANY(%s) OR n8n_id = ANY(%s)
+            ''', (ids, ids)).fetchall()
+        return self._resolve_rows(rows, requested)
+    
+    def insert_executions(self, executions: List[Dict[str, Any]]) -> int:
+        """Insertar varias ejecuciones en una sola sentencia"""
+        if not executions:
+            return 0
+        
+        with self.get_connection() as conn:
+            inserted_ids = self._insert_execution_rows(conn, executions)
+            executions = [e for e in executions if e["id"] in inserted_ids]
+            self._record_durations(conn, executions)
+            self._refresh_workflow_counters(conn, {e["workflow_id"] for e in executions})
+        
+        if executions:
+            self._notify("executions_inserted", executions)
+        return len(executions)
+    
+    def _insert_execution_rows(self, conn, executions: List[Dict[str, Any]]) -> set:
+        """INSERT ... SELECT FROM unnest(arrays); devuelve los ids que realmente entraron"""
+        arrays = ", ".join(f"%s::{EXECUTION_COLUMN_TYPES[c]}[]" for c in EXECUTION_COLUMNS)
+        # Las ejecuciones de N8N ya registradas (mismo id o n8n_execution_id) se ignoran
+        rows = conn.execute(f'''
+            INSERT INTO executions ({", ".join(EXECUTION_COLUMNS)})
+            SELECT * FROM unnest({arrays})
+            ON CONFLICT DO NOTHING
+            RETURNING id
+        ''', [_column_array(executions, c) for c in EXECUTION_COLUMNS]).fetchall()
+        return {row["id"] for row in rows}
+    
+    def _record_durations(self, conn, executions: Iterable[Dict[str, Any]]):
+        """Sumar las duraciones de ejecuciones terminadas a los sketches (dentro de la transacción de escritura)"""
+        samples = duration_samples(executions)
+        if not samples:
+            return
+        
+        # Los sketches se leen y reescriben: el lock de los workflows (en orden
+        # de id, como _refresh_workflow_counters) serializa a los escritores
+        conn.execute(
+            "SELECT 1 FROM workflows WHERE id = ANY(%s) ORDER BY id FOR UPDATE",
+            (list({key[2] for key in samples}),)
+        )
+        keys = list(samples)
+        rows = conn.execute('''
+            SELECT resolution, bucket, workflow_id, sketch FROM workflow_duration_sketches
+            WHERE (resolution, bucket, workflow_id) IN (
+                SELECT * FROM unnest(%s::text[], %s::text[], %s::text[])
+            )
+        ''', ([k[0] for k in keys], [k[1] for k in keys], [k[2] for k in keys])).fetchall()
+        stored = {(row["resolution"], row["bucket"], row["workflow_id"]): row["sketch"] for row in rows}
+        conn.cursor().executemany('''
+            INSERT INTO workflow_duration_sketches
+                (resolution, bucket, workflow_id, samples, total_duration, sketch)
+            VALUES (%(resolution)s, %(bucket)s, %(workflow_id)s, %(samples)s,
+                    %(total_duration)s, %(sketch)s)
+            ON CONFLICT (workflow_id, resolution, bucket) DO UPDATE SET
+                samples = excluded.samples,
+                total_duration = excluded.total_duration,
+                sketch = excluded.sketch
+        ''', updated_sketches(samples, stored))
+        for resolution, cutoff in sketch_cutoffs(datetime.now()).items():
+            conn.execute(
+                "DELETE FROM workflow_duration_sketches WHERE resolution = %s AND bucket < %s",
+                (resolution, cutoff)
+            )
+    
+    def _refresh_workflow_counters(self, conn, workflow_ids: Iterable[str]):
+        """Recalcular total_executions, success_rate, avg_execution_time y last_execution desde los agregados"""
+        ids = list(workflow_ids)
+        if not ids:
+            return
+        
+        # Bloquear en orden de id, igual que los agregados, para evitar deadlocks
+        conn.execute(
+            "SELECT 1 FROM workflows WHERE id = ANY(%s) ORDER BY id FOR UPDATE", (ids,)
+        )
+        # success_rate sobre ejecuciones terminadas (success + error); avg_execution_time
+        # desde el sketch acumulado (se conserva el valor anterior si no hay duraciones)
+        conn.execute('''
+            UPDATE workflows SET
+                total_executions = s.executions,
+                success_rate = CASE WHEN s.successes + s.errors > 0
+                    THEN ROUND(s.successes * 100.0 / (s.successes + s.errors), 1)
+                    ELSE workflows.success_rate END,
+                avg_execution_time = COALESCE((
+                    SELECT ROUND((d.total_duration / d.samples)::numeric, 1)
+                    FROM workflow_duration_sketches AS d
+                    WHERE d.resolution = 'all' AND d.bucket = '' AND d.workflow_id = workflows.id
+                ), workflows.avg_execution_time),
+                last_execution = s.last_execution
+            FROM workflow_execution_stats AS s
+            WHERE s.workflow_id = workflows.id AND workflows.id = ANY(%s)
+        ''', (ids,))
+    
+    def get_known_n8n_execution_ids(self, n8n_execution_ids: Iterable[str]) -> set:
+        """Subconjunto de ids de ejecución de N8N que ya están registrados"""
+        ids = list(set(n8n_execution_ids))
+        if not ids:
+            return set()
+        
+        with self.get_connection() as conn:
+            rows = conn.execute('''
+                SELECT n8n_execution_id FROM executions
+                WHERE n8n_execution_id = ANY(%s)
+            ''', (ids,)).fetchall()
+        return {row["n8n_execution_id"] for row in rows}
+    
+    def get_workflow_definition(self, n8n_id: str) -> Optional[Dict[str, Any]]:
+        """Definición guardada de un workflow de N8N (n8n_id, updated_at, etag, definition, fetched_at)"""
+        with self.get_connection() as conn:
+            return conn.execute('''
+                SELECT n8n_id, updated_at, etag, definition, fetched_at
+                FROM n8n_workflow_definitions WHERE n8n_id = %s
+            ''', (n8n_id,)).fetchone()
+    
+    def save_workflow_definition(self, definition: Dict[str, Any]):
+        """Guardar o reemplazar la definición de un workflow de N8N"""
+        with self.get_connection() as conn:
+            conn.execute(f'''
+                INSERT INTO n8n_workflow_definitions (n8n_id, updated_at, etag, definition, fetched_at)
+                VALUES (%(n8n_id)s, %(updated_at)s, %(etag)s, %(definition)s, {UTC_NOW})
+                ON CONFLICT (n8n_id) DO UPDATE SET
+                    updated_at = excluded.updated_at,
+                    etag = excluded.etag,
+                    definition = excluded.definition,
+                    fetched_at = excluded.fetched_at
+            ''', definition)
+    
+    def get_inflight_executions(self, limit: int = 10000) -> List[Dict[str, Any]]:
+        """Ejecuciones de N8N todavía running o waiting, las más antiguas primero"""
+        with self.get_connection() as conn:
+            return conn.execute('''
+                SELECT id, workflow_id, n8n_execution_id, status, start_time FROM executions
+                WHERE status IN ('running', 'waiting') AND n8n_execution_id IS NOT NULL
+                ORDER BY start_time
+                LIMIT %s
+            ''', (limit,)).fetchall()
+    
+    def update_execution_statuses(self, updates: List[Dict[str, Any]]) -> int:
+        """Aplicar en una sola sentencia los cambios de estado de ejecuciones en curso"""
+        if not updates:
+            return 0
+        
+        with self.get_connection() as conn:
+            changed = self._update_execution_rows(conn, updates)
+            self._record_durations(conn, changed)
+            self._refresh_workflow_counters(conn, {u["workflow_id"] for u in changed})
+        
+        if changed:
+            self._notify("executions_updated", changed)
+        return len(changed)
+    
+    def _update_execution_rows(self, conn, updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Un solo UPDATE por id sobre filas en curso: el trigger por sentencia ajusta cada agregado una vez"""
+        return conn.execute('''
+            UPDATE executions AS e SET
+                status = u.status, end_time = u.end_time, duration = u.duration,
+                error_message = u.error_message,
+                data_processed = COALESCE(u.data_processed, e.data_processed)
+            FROM unnest(%s::text[], %s::text[], %s::timestamp[], %s::float8[], %s::text[],
+                        %s::int4[])
+                AS u (id, status, end_time, duration, error_message, data_processed)
+            WHERE e.id = u.id AND e.status IN ('running', 'waiting')
+            RETURNING e.id, e.workflow_id, e.status, e.start_time, e.end_time, e.duration,
+                      e.error_message
+        ''', (
+            [u["id"] for u in updates],
+            [u["status"] for u in updates],
+            [u["end_time"] for u in updates],
+            [float(u["duration"]) if u["duration"] is not None else None for u in updates],
+            [u["error_message"] for u in updates],
+            [u.get("data_processed") for u in updates],
+        )).fetchall()
+    
+    def record_execution_events(self, executions: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Registrar eventos de ejecución de N8N en una transacción"""
+        if not executions:
+            return 0, 0
+        
+        with self.get_connection() as conn:
+            inserted_ids = self._insert_execution_rows(conn, executions)
+            inserted = [e for e in executions if e["id"] in inserted_ids]
+            pending = pending_execution_events(e for e in executions if e["id"] not in inserted_ids)
+            changed = []
+            if pending:
+                # FOR UPDATE: el conciliador no cambia estas filas entre el SELECT y el UPDATE
+                rows = conn.execute('''
+                    SELECT id, workflow_id, n8n_execution_id, status, start_time FROM executions
+                    WHERE n8n_execution_id = ANY(%s) AND status IN ('running', 'waiting')
+                    ORDER BY id FOR UPDATE
+                ''', (list(pending),)).fetchall()
+                updates = execution_event_updates(pending, rows)
+                if updates:
+                    changed = self._update_execution_rows(conn, updates)
+            self._record_durations(conn, inserted + changed)
+            self._refresh_workflow_counters(
+                conn, {e["workflow_id"] for e in inserted} | {u["workflow_id"] for u in changed}
+            )
+        
+        if inserted:
+            self._notify("executions_inserted", inserted)
+        if changed:
+            self._notify("executions_updated", changed)
+        return len(inserted), len(changed)
+    
+    def try_acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """Tomar o renovar un lease; falla si otro dueño lo tiene vigente"""
+        now = time.time()
+        with self.get_connection() as conn:
+            cursor = conn.execute('''
+                INSERT INTO scheduler_leases (name, owner, expires_at)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (name) DO UPDATE SET
+                    owner = excluded.owner,
+                    expires_at = excluded.expires_at
+                WHERE scheduler_leases.owner = excluded.owner
+                   OR scheduler_leases.expires_at < %s
+            ''', (name, owner, now + ttl, now))
+            return cursor.rowcount > 0
+    
+    def release_lease(self, name: str, owner: str):
+        """Liberar un lease propio para que otro proceso lo tome de inmediato"""
+        with self.get_connection() as conn:
+            conn.execute(
+                "DELETE FROM scheduler_leases WHERE name = %s AND owner = %s", (name, owner)
+            )
+    
+    def get_execution_months(self, before: datetime) -> List[str]:
+        """Meses (YYYY-MM) con ejecuciones en la tabla viva anteriores a la fecha dada"""
+        with self.get_connection() as conn:
+            rows = conn.execute('''
+                SELECT DISTINCT to_char(start_time, 'YYYY-MM') AS month FROM executions
+                WHERE start_time < %s
+                ORDER BY 1
+            ''', (to_local_naive(before),)).fetchall()
+        return [row["month"] for row in rows]
+    
+    def iter_execution_rows(self, start_time: datetime, end_time: datetime,
+                            batch_size: int = 10000) -> Iterator[List[Tuple]]:
+        """Lotes de filas de [start_time, end_time) en el orden de EXECUTION_COLUMNS, fechas en ISO"""
+        with self.get_connection() as conn:
+            # Cursor del lado del servidor: el mes no se carga entero en memoria
+            cursor = conn.cursor(name="iter_execution_rows", row_factory=tuple_row)
+            cursor.execute(f'''
+                SELECT {", ".join(EXECUTION_COLUMNS)} FROM executions
+                WHERE start_time >= %s AND start_time < %s
+                ORDER BY start_time, id
+            ''', (start_time, end_time))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [_iso_row(row) for row in rows]
+            cursor.close()
+    
+    def get_execution_archives(self) -> List[Dict[str, Any]]:
+        """Catálogo de archivos con ejecuciones archivadas"""
+        with self.get_connection() as conn:
+            return conn.execute('''
+                SELECT path, month, row_count, min_start_time, max_start_time, archived_at
+                FROM execution_archives
+                ORDER BY month
+            ''').fetchall()
+    
+    def archive_execution_range(self, start_time: datetime, end_time: datetime,
+                                archive: Dict[str, Any]) -> int:
+        """Registrar un archivo en el catálogo y borrar su rango de la tabla viva (una transacción)"""
+        with self.get_connection() as conn:
+            # FOR UPDATE: nadie cambia estas filas entre la comparación y el DELETE
+            cursor = conn.cursor(row_factory=tuple_row)
+            cursor.execute(f'''
+                SELECT {", ".join(EXECUTION_COLUMNS)} FROM executions
+                WHERE start_time >= %s AND start_time < %s
+                ORDER BY start_time, id
+                FOR UPDATE
+            ''', (start_time, end_time))
+            digest = hashlib.sha256()
+            update_rows_digest(digest, (_iso_row(row) for row in cursor))
+            deleted = conn.execute(
+                "DELETE FROM executions WHERE start_time >= %s AND start_time < %s",
+                (start_time, end_time)
+            ).rowcount
+            # El conteo atrapa las filas insertadas después del SELECT
+            if digest.hexdigest() != archive["digest"] or deleted != archive["rows"]:
+                # Entraron o cambiaron filas mientras se exportaba: se revierte y se reintenta luego
+                raise RuntimeError(f"El mes {archive['month']} cambió durante el archivado")
+            conn.execute('''
+                INSERT INTO execution_archives
+                    (path, month, row_count, min_start_time, max_start_time)
+                VALUES (%(path)s, %(month)s, %(rows)s, %(min_start_time)s, %(max_start_time)s)
+            ''', archive)
+        
+        self._notify("executions_archived", archive)
+        return deleted
+    
+    def get_timeseries(self, resolution: str, start_time: datetime, end_time: datetime,
+                       workflow_id: Optional[str] = None) -> List[ChartData]:
+        """Serie temporal de ejecuciones leída de los buckets precalculados"""
+        start_time, end_time = to_local_naive(start_time), to_local_naive(end_time)
+        conditions = ["b.resolution = %s", "b.bucket >= %s", "b.bucket <= %s"]
+        params: List[Any] = [resolution, bucket_key(start_time, resolution),
+                             bucket_key(end_time, resolution)]
+        if workflow_id:
+            conditions.append("b.workflow_id = %s")
+            params.append(workflow_id)
+        
+        # El tiempo ahorrado se reparte según lo que ahorra cada ejecución exitosa del workflow
+        with self.get_connection() as conn:
+            rows = conn.cursor(row_factory=tuple_row).execute(f'''
+                SELECT b.bucket,
+                       SUM(b.executions)::bigint, SUM(b.successes)::bigint, SUM(b.errors)::bigint,
+                       SUM(b.successes * COALESCE(
+                           w.time_saved_hours / NULLIF(w.total_executions, 0), 0))
+                FROM execution_buckets AS b
+                LEFT JOIN workflows AS w ON w.id = b.workflow_id
+                WHERE {' AND '.join(conditions)}
+                GROUP BY b.bucket
+            ''', params).fetchall()
+        return self._timeseries_from_rows(rows, resolution, start_time, end_time)
+    
+    @cached(tags=("stats",), ttl=10)
+    def get_workflow_analytics(self, workflow_id: str) -> Optional[WorkflowAnalytics]:
+        """Analytics de un workflow leídas de los sketches y buckets precalculados"""
+        workflow = self.resolve_workflows([workflow_id]).get(workflow_id)
+        if workflow is None:
+            return None
+        
+        now = datetime.now()
+        cutoffs = analytics_cutoffs(now)
+        sketch_ranges = [r for r in SKETCH_RETENTION if r in cutoffs]
+        with self.get_connection() as conn:
+            cursor = conn.cursor(row_factory=tuple_row)
+            sketch_rows = cursor.execute(f'''
+                SELECT resolution, bucket, sketch FROM workflow_duration_sketches
+                WHERE workflow_id = %s AND ((resolution = 'all' AND bucket = '')
+                    {"".join(" OR (resolution = %s AND bucket >= %s)" for _ in sketch_ranges)})
+            ''', [workflow["id"]] + [v for r in sketch_ranges for v in (r, cutoffs[r])]).fetchall()
+            count_rows = cursor.execute(f'''
+                SELECT resolution, bucket, executions, successes, errors FROM execution_buckets
+                WHERE workflow_id = %s AND ({" OR ".join("(resolution = %s AND bucket >= %s)" for _ in cutoffs)})
+            ''', [workflow["id"]] + [v for item in cutoffs.items() for v in item]).fetchall()
+        return self._analytics_from_rows(workflow["id"], sketch_rows, count_rows, now)
+    
+    @cached(tags=("stats",), ttl=10)
+    def get_dashboard_stats(self) -> DashboardStats:
+        """Calcular estadísticas del dashboard a partir de los agregados"""
+        today = datetime.now().date().isoformat()
+        
+        with self.get_connection() as conn:
+            row = conn.cursor(row_factory=tuple_row).execute('''
+                SELECT w.total, w.active, w.time_saved,
+                       e.total, e.successes,
+                       d.total, d.errors
+                FROM (
+                    SELECT COUNT(*) AS total,
+                           COUNT(*) FILTER (WHERE status = 'active') AS active,
+                           COALESCE(SUM(time_saved_hours), 0) AS time_saved
+                    FROM workflows
+                ) AS w,
+                (
+                    SELECT COALESCE(SUM(executions), 0)::bigint AS total,
+                           COALESCE(SUM(successes), 0)::bigint AS successes
+                    FROM workflow_execution_stats
+                ) AS e,
+                (
+                    SELECT COALESCE(SUM(executions), 0)::bigint AS total,
+                           COALESCE(SUM(errors), 0)::bigint AS errors
+                    FROM execution_buckets
+                    WHERE resolution = 'day' AND bucket = %s
+                ) AS d
+            ''', (today,)).fetchone()
+        return self._dashboard_stats_from_row(row)
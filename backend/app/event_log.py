@@ -0,0 +1,148 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Optional
+from .database import StorageBackend
+from .serialization import dumps, loads
+
+class SharedEventLog:
+    """Bus entre los workers de uvicorn sobre un archivo SQLite local
+    
+    Cada worker anota en event_log las escrituras confirmadas de su base y lee
+    las de los demás cada poll_interval. Al leerlas las repite con
+    replay_event: la cache en memoria se invalida y los listeners (SSE,
+    conciliador) se enteran igual que si la escritura hubiera sido local. La
+    cache de un worker puede quedar desactualizada como mucho poll_interval.
+    """
+    
+    def __init__(self, path: str, poll_interval: float = 0.05, retention: float = 300.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.db: Optional[StorageBackend] = None
+        self._writer: Optional[sqlite3.Connection] = None
+        self._reader: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.Lock()
+        self._replaying = threading.local()
+        self._last_id = 0
+        self._task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.received = 0
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+    
+    def start(self, db: StorageBackend):
+        """Abrir el log, empezar desde el último evento y escuchar las escrituras de db"""
+        if self._task is not None:
+            return
+        self.db = db
+        self._writer = self._connect()
+        self._writer.execute('''
+            CREATE TABLE IF NOT EXISTS event_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                origin TEXT NOT NULL,
+                event TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                created_at REAL NOT NULL
+            )
+        ''')
+        self._reader = self._connect()
+        # Lo anterior al arranque no interesa: la cache de este worker está vacía
+        self._last_id = self._reader.execute("SELECT COALESCE(MAX(id), 0) FROM event_log").fetchone()[0]
+        db.add_listener(self.publish)
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is None:
+            return
+        self.db.remove_listener(self.publish)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._writer.close()
+        self._reader.close()
+    
+    def publish(self, event: str, payload: Any):
+        """Listener de la base: anotar una escritura local para los demás workers"""
+        if getattr(self._replaying, "active", False):
+            return
+        with self._write_lock:
+            self._writer.execute(
+                "INSERT INTO event_log (origin, event, payload, created_at) VALUES (?, ?, ?, ?)",
+                (self.origin, event, dumps(payload), time.time())
+            )
+        self.published += 1
+    
+    async def _run(self):
+        polls = 0
+        while True:
+            try:
+                await asyncio.to_thread(self.poll)
+                polls += 1
+                if polls % 1000 == 0:
+                    await asyncio.to_thread(self.trim)
+            except Exception as e:
+                print(f"Error leyendo el bus de eventos: {e}")
+            await asyncio.sleep(self.poll_interval)
+    
+    def poll(self) -> int:
+        """Repetir en este worker los eventos nuevos de los demás; devuelve cuántos"""
+        rows = self._reader.execute(
+            "SELECT id, origin, event, payload FROM event_log WHERE id > ? ORDER BY id",
+            (self._last_id,)
+        ).fetchall()
+        received = 0
+        self._replaying.active = True
+        try:
+            for event_id, origin, event, payload in rows:
+                self._last_id = event_id
+                if origin == self.origin:
+                    continue
+                self.db.replay_event(event, loads(payload))
+                received += 1
+        finally:
+            self._replaying.active = False
+        self.received += received
+        return received
+    
+    def trim(self):
+        """Borrar eventos más viejos que retention (cualquier worker puede hacerlo)"""
+        with self._write_lock:
+            self._writer.execute("DELETE FROM event_log WHERE created_at < ?",
+                                 (time.time() - self.retention,))
+
+_shared_event_log: Optional[SharedEventLog] = None
+
+def workers_configured() -> int:
+    """Workers de uvicorn declarados en API_WORKERS (run.py lo fija al arrancar)"""
+    return int(os.getenv("API_WORKERS", 1))
+
+def get_shared_event_log() -> SharedEventLog:
+    """Bus entre workers compartido por todo el proceso"""
+    global _shared_event_log
+    if _shared_event_log is None:
+        _shared_event_log = SharedEventLog(
+            os.getenv("EVENT_BUS_PATH", "./event_bus.db"),
+            poll_interval=float(os.getenv("EVENT_BUS_POLL_INTERVAL", 0.05)),
+            retention=float(os.getenv("EVENT_BUS_RETENTION_SECONDS", 300))
+        )
+    return _shared_event_log
+
+async def close_shared_event_log():
+    """Dejar de publicar y de leer al apagar el worker"""
+    global _shared_event_log
+    if _shared_event_log is not None:
+        await _shared_event_log.stop()
+        _shared_event_log = None
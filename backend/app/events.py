@@ -0,0 +1,119 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+from .database import StorageBackend, get_database
+
+def format_sse(event: str, data: Any) -> bytes:
+    """Codificar un evento en formato text/event-stream"""
+    payload = json.dumps(data, default=str, separators=(",", ":"))
+    return f"event: {event}\ndata: {payload}\n\n".encode()
+
+class EventBus:
+    """Pub/sub en proceso: cada evento se codifica una vez y se reparte a colas acotadas"""
+    
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+        self.dropped = 0
+    
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Event loop al que se llevan las publicaciones hechas desde otros hilos"""
+        self._loop = loop
+    
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+    
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._subscribers.add(queue)
+        return queue
+    
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+    
+    def publish(self, event: str, data: Any):
+        """Repartir un evento a todos los suscriptores (debe llamarse desde el loop)"""
+        message = format_sse(event, data)
+        self.published += 1
+        for queue in self._subscribers:
+            if queue.full():
+                # Cliente lento: se descarta lo más viejo, el siguiente evento lo resincroniza
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(message)
+    
+    def publish_threadsafe(self, event: str, data: Any):
+        """Publicar desde cualquier hilo (p.ej. tras una escritura en la base de datos)"""
+        if self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self.publish, event, data)
+
+class DatabaseEventPublisher:
+    """Traduce las escrituras de Database en eventos para el dashboard"""
+    
+    def __init__(self, db: StorageBackend, bus: EventBus):
+        self.db = db
+        self.bus = bus
+    
+    def __call__(self, event: str, payload: Any):
+        if event == "executions_inserted":
+            self._on_executions(payload)
+        elif event == "executions_updated":
+            self._on_execution_updates(payload)
+        elif event == "workflows_changed":
+            self.bus.publish_threadsafe("workflows", payload)
+            self._publish_stats()
+    
+    def _on_executions(self, records: List[Dict[str, Any]]):
+        today = datetime.now().date().isoformat()
+        delta = {
+            "executions": len(records),
+            "successes": sum(r["status"] == "success" for r in records),
+            "errors": sum(r["status"] == "error" for r in records),
+            "executions_today": sum(str(r["start_time"]).startswith(today) for r in records),
+            "errors_today": sum(
+                r["status"] == "error" and str(r["start_time"]).startswith(today) for r in records
+            ),
+        }
+        self.bus.publish_threadsafe("executions", records)
+        self._publish_stats(delta)
+    
+    def _on_execution_updates(self, updates: List[Dict[str, Any]]):
+        # Ejecuciones que terminaron: no hay nuevas, sólo éxitos y errores que antes eran running
+        today = datetime.now().date().isoformat()
+        delta = {
+            "executions": 0,
+            "successes": sum(u["status"] == "success" for u in updates),
+            "errors": sum(u["status"] == "error" for u in updates),
+            "executions_today": 0,
+            "errors_today": sum(
+                u["status"] == "error" and str(u["start_time"]).startswith(today) for u in updates
+            ),
+        }
+        self.bus.publish_threadsafe("executions", updates)
+        self._publish_stats(delta)
+    
+    def _publish_stats(self, delta: Optional[Dict[str, int]] = None):
+        # Las estadísticas salen de los agregados: leerlas cuesta lo mismo siempre
+        stats = self.db.get_dashboard_stats()
+        self.bus.publish_threadsafe("stats", {"stats": stats.model_dump(), "delta": delta})
+
+_event_bus: Optional[EventBus] = None
+
+def get_event_bus() -> EventBus:
+    """Bus de eventos compartido por todo el proceso"""
+    global _event_bus
+    if _event_bus is None:
+        _event_bus = EventBus()
+    return _event_bus
+
+def start_event_bus():
+    """Enlazar el bus al loop actual y suscribirlo a las escrituras de la base de datos"""
+    bus = get_event_bus()
+    bus.bind(asyncio.get_running_loop())
+    db = get_database()
+    db.add_listener(DatabaseEventPublisher(db, bus))
@@ -0,0 +1,121 @@
+import asyncio
+import os
+from typing import Any, Dict, List, Optional
+from .database import StorageBackend, get_database
+
+# Marca de fin de cola para el drenado en el apagado
+_STOP = object()
+
+class ExecutionWriter:
+    """Cola write-behind que agrupa inserciones en executions en transacciones por lotes"""
+    
+    def __init__(self, db: StorageBackend, max_batch_size: int = 500,
+                 flush_interval: float = 0.5, max_queue_size: int = 10000):
+        self.db = db
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.failed = 0
+    
+    def start(self):
+        """Arrancar el consumidor en el event loop actual"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def submit(self, record: Dict[str, Any]):
+        """Encolar una ejecución; espera si la cola está llena (backpressure)"""
+        if self._task is None:
+            raise RuntimeError("ExecutionWriter no está en marcha")
+        await self._queue.put(record)
+    
+    def try_submit_many(self, records: List[Dict[str, Any]]) -> bool:
+        """Encolar todo o nada sin esperar; False si la cola no tiene lugar para todos"""
+        if self._task is None:
+            raise RuntimeError("ExecutionWriter no está en marcha")
+        if self._queue.maxsize - self._queue.qsize() < len(records):
+            return False
+        for record in records:
+            self._queue.put_nowait(record)
+        return True
+    
+    async def stop(self):
+        """Escribir todo lo pendiente y detener el consumidor"""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+    
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            
+            # Juntar hasta max_batch_size o hasta que venza el intervalo
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            await self._flush(batch)
+    
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        try:
+            self.written += await asyncio.to_thread(self._write, batch)
+        except Exception as e:
+            self.failed += len(batch)
+            self._on_failed(batch)
+            print(f"Error guardando {len(batch)} ejecuciones: {e}")
+    
+    def _write(self, batch: List[Dict[str, Any]]) -> int:
+        """Escribir un lote (en un hilo aparte); devuelve cuántas filas cambiaron"""
+        return self.db.insert_executions(batch)
+    
+    def _on_failed(self, batch: List[Dict[str, Any]]):
+        """Gancho para las subclases cuando un lote no se pudo guardar"""
+
+_execution_writer: Optional[ExecutionWriter] = None
+
+def get_execution_writer() -> ExecutionWriter:
+    """Writer compartido por todo el proceso"""
+    global _execution_writer
+    if _execution_writer is None:
+        _execution_writer = ExecutionWriter(
+            get_database(),
+            max_batch_size=int(os.getenv("EXECUTION_WRITER_BATCH_SIZE", 500)),
+            flush_interval=float(os.getenv("EXECUTION_WRITER_FLUSH_INTERVAL", 0.5)),
+            max_queue_size=int(os.getenv("EXECUTION_WRITER_QUEUE_SIZE", 10000))
+        )
+    return _execution_writer
+
+async def close_execution_writer():
+    """Drenar la cola al apagar la app"""
+    global _execution_writer
+    if _execution_writer is not None:
+        await _execution_writer.stop()
+        _execution_writer = None
@@ -0,0 +1,102 @@
+import csv
+import io
+import os
+import threading
+import zlib
+from datetime import datetime
+from typing import Any, Iterator, List, Optional, Sequence
+from .database import StorageBackend
+from .serialization import EXECUTION_FIELDS, dumps_lines, execution_items
+
+# Formato -> (media type, extensión del archivo)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+
+def _csv_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def encode_csv(rows: List[Sequence[Any]], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(EXECUTION_FIELDS)
+    if rows and any(isinstance(value, datetime) for value in rows[0]):
+        # PostgreSQL entrega datetime: str() los separaría con espacio en vez de "T"
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+    else:
+        writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+def export_executions(db: StorageBackend, export_format: str = "ndjson", compress: bool = False,
+                      batch_size: int = 5000, **filters) -> Iterator[bytes]:
+    """Trozos del export (un lote de filas cada uno), opcionalmente en gzip
+    
+    Cada lote comprimido se vacía con Z_SYNC_FLUSH para que el cliente reciba
+    bytes desde el primer lote y no cuando se llene el buffer de zlib.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+    
+    def emit(chunk: bytes) -> bytes:
+        if compressor is None:
+            return chunk
+        return compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    
+    header = export_format == "csv"
+    for rows in db.iter_executions(batch_size=batch_size, **filters):
+        if export_format == "csv":
+            chunk = encode_csv(rows, header=header)
+            header = False
+        else:
+            chunk = dumps_lines(execution_items(rows))
+        yield emit(chunk)
+    
+    if header:
+        # Sin filas: el CSV igual lleva su cabecera
+        yield emit(encode_csv([], header=True))
+    if compressor is not None:
+        yield compressor.flush()
+
+class ExportSlot:
+    """Cupo de una exportación en curso; release() se puede llamar más de una vez"""
+    
+    def __init__(self, semaphore: threading.BoundedSemaphore):
+        self._semaphore = semaphore
+        self._released = False
+        self._lock = threading.Lock()
+    
+    def release(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._semaphore.release()
+
+class ExportLimiter:
+    """Exportaciones simultáneas: en PostgreSQL cada una retiene una conexión del pool"""
+    
+    def __init__(self, max_concurrent: int = 2):
+        self.max_concurrent = max_concurrent
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+    
+    def try_acquire(self) -> Optional[ExportSlot]:
+        if not self._semaphore.acquire(blocking=False):
+            return None
+        return ExportSlot(self._semaphore)
+    
+    def stream(self, slot: ExportSlot, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """Recorrer chunks y liberar el cupo al terminar, fallar o cortarse la descarga"""
+        try:
+            yield from chunks
+        finally:
+            slot.release()
+
+_export_limiter: Optional[ExportLimiter] = None
+
+def get_export_limiter() -> ExportLimiter:
+    """Límite de exportaciones compartido por todo el proceso"""
+    global _export_limiter
+    if _export_limiter is None:
+        _export_limiter = ExportLimiter(int(os.getenv("EXPORT_MAX_CONCURRENT", 2)))
+    return _export_limiter
@@ -1,10 +1,54 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import workflows, executions
+from fastapi.responses import PlainTextResponse
+from .routers import workflows, executions, events, webhooks
+from .database import get_database, close_database
+from .n8n_client import get_n8n_client, close_n8n_client
+from .execution_writer import get_execution_writer, close_execution_writer
+from .scheduler import get_sync_scheduler, close_sync_scheduler
+from .archive import get_execution_archiver, close_execution_archiver
+from .reconciler import get_execution_reconciler, close_execution_reconciler
+from .webhooks import get_webhook_writer, close_webhook_writer
+from .event_log import get_shared_event_log, close_shared_event_log, workers_configured
+from .events import start_event_bus
+from .config import load_config, env_flag
+from .metrics import registry, MetricsMiddleware, CONTENT_TYPE
+from .profiler import get_profiler, close_profiler
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+# Punto de entrada: la configuración se lee una vez, antes de armar CORS
+load_config()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Crear la base de datos y el cliente N8N compartidos una sola vez por proceso
+    # (el cliente abre su pool HTTP recién con la primera petición a N8N)
+    get_database()
+    get_n8n_client()
+    start_event_bus()
+    if workers_configured() > 1:
+        # Varios workers: la cache y los eventos SSE se coordinan por el bus compartido
+        get_shared_event_log().start(get_database())
+    get_execution_writer().start()
+    get_webhook_writer().start()
+    get_sync_scheduler().start()
+    get_execution_reconciler().start()
+    get_execution_archiver().start()
+    if env_flag("PROFILER_ENABLED"):
+        get_profiler().start()
+    yield
+    close_profiler()
+    # Los lotes que siguen en curso terminan y se registran antes de cerrar N8N y la base
+    await workflows.wait_for_batches()
+    await close_execution_archiver()
+    await close_execution_reconciler()
+    await close_sync_scheduler()
+    await close_webhook_writer()
+    await close_execution_writer()
+    await close_shared_event_log()
+    await close_n8n_client()
+    close_database()
 
 # Crear aplicación FastAPI
 app = FastAPI(
@@ -12,7 +56,8 @@ app = FastAPI(
     description="API para gestionar workflows de automatización empresarial",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configurar CORS
@@ -26,11 +71,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Latencia por ruta para /metrics (va por fuera de CORS: mide la petición completa)
+app.add_middleware(MetricsMiddleware)
+
 # Incluir routers
 app.include_router(workflows.router)
 app.include_router(executions.router)
+app.include_router(events.router)
+app.include_router(webhooks.router)
 
 @app.get("/")
 async def root():
@@ -48,6 +99,81 @@ async def health_check():
         "service": "business-automation-api"
     }
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Contadores de la cache de lecturas (aciertos, fallos, desalojos)"""
+    cache = get_database().cache
+    return cache.stats() if cache else {"enabled": False}
+
+def _pool_connections():
+    db = get_database()
+    stats = db.pool_stats()
+    return {(type(db).__name__, state): stats[state] for state in ("max", "open", "idle", "in_use")}
+
+def _pool_counter(key: str):
+    def collect():
+        db = get_database()
+        return {(type(db).__name__,): db.pool_stats()[key]}
+    return collect
+
+def _cache_operations():
+    cache = get_database().cache
+    if cache is None:
+        return {}
+    stats = cache.stats()
+    return {(result,): stats[result] for result in
+            ("hits", "misses", "coalesced", "evictions", "expirations", "invalidations")}
+
+def _cache_entries():
+    cache = get_database().cache
+    return {(): cache.stats()["entries"]} if cache else {}
+
+# Valores leídos en cada scrape, sin costo en el camino de las peticiones
+registry.callback("db_pool_connections", "Conexiones del pool por estado", "gauge",
+                  ("backend", "state"), _pool_connections)
+registry.callback("db_pool_waits_total", "Préstamos que tuvieron que esperar una conexión libre",
+                  "counter", ("backend",), _pool_counter("waits"))
+registry.callback("db_pool_wait_seconds_total", "Tiempo total esperando una conexión libre",
+                  "counter", ("backend",), _pool_counter("wait_seconds"))
+registry.callback("cache_operations_total", "Operaciones de la cache de lecturas por resultado",
+                  "counter", ("result",), _cache_operations)
+registry.callback("cache_entries", "Entradas en la cache de lecturas", "gauge", (), _cache_entries)
+registry.callback("n8n_circuit_open", "1 si el circuito hacia N8N está abierto o en prueba",
+                  "gauge", (), lambda: {(): float(get_n8n_client().breaker.state != "closed")})
+registry.callback("executions_in_flight", "Ejecuciones running/waiting que sigue el conciliador",
+                  "gauge", (), lambda: {(): get_execution_reconciler().tracked_count})
+registry.callback("webhook_events_total", "Eventos del webhook de N8N por resultado", "counter",
+                  ("result",), lambda: {(k,): v for k, v in get_webhook_writer().totals.items()})
+registry.callback("webhook_queue_pending", "Eventos del webhook esperando a guardarse", "gauge",
+                  (), lambda: {(): get_webhook_writer().pending})
+registry.callback("event_bus_events_total", "Eventos del bus entre workers de este proceso", "counter",
+                  ("direction",), lambda: {("published",): get_shared_event_log().published,
+                                           ("received",): get_shared_event_log().received})
+
+@app.get("/metrics")
+async def metrics():
+    """Métricas en formato de texto de Prometheus"""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+# Pilas del proceso y control del profiler: sólo con DEBUG_ENDPOINTS=true, nunca expuestos por defecto
+if env_flag("DEBUG_ENDPOINTS"):
+    @app.get("/debug/profiler", response_class=PlainTextResponse)
+    async def profiler_stacks():
+        """Pilas muestreadas en formato collapsed (flamegraph.pl / speedscope)"""
+        return get_profiler().collapsed()
+    
+    @app.post("/debug/profiler")
+    async def toggle_profiler(enabled: bool, reset: bool = False):
+        """Encender o apagar el profiler de muestreo"""
+        profiler = get_profiler()
+        if reset:
+            profiler.reset()
+        if enabled:
+            profiler.start()
+        else:
+            profiler.stop()
+        return profiler.status()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
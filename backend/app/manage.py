@@ -0,0 +1,43 @@
+"""
+Tareas de arranque que se ejecutan una vez, fuera de los workers.
+
+Uso (desde backend/):
+    python -m app.manage migrate   # aplicar migraciones pendientes
+    python -m app.manage seed      # migrar y cargar datos de ejemplo si la base está vacía
+    python -m app.manage status    # versión del esquema aplicada / disponible
+"""
+import argparse
+import os
+
+from .config import load_config
+from .database import create_database
+
+
+def main(args):
+    load_config()
+    db = create_database(args.database_url or os.getenv("DATABASE_URL", "sqlite:///./business_automation.db"),
+                         pool_size=1, migrate=False)
+    try:
+        if args.command == "status":
+            print(f"Esquema en la versión {db.get_schema_version()} de {len(db.MIGRATIONS)}")
+            return
+
+        applied = db.migrate()
+        if applied:
+            print(f"Migraciones aplicadas: {', '.join(str(v) for v in applied)}")
+        else:
+            print(f"Esquema al día (versión {len(db.MIGRATIONS)})")
+
+        if args.command == "seed":
+            db.seed_sample_data()
+            print("Datos de ejemplo cargados (si la base estaba vacía)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["migrate", "seed", "status"])
+    parser.add_argument("--database-url", help="Por defecto DATABASE_URL")
+    main(parser.parse_args())
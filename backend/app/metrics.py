@@ -0,0 +1,238 @@
+import bisect
+import functools
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Límites en segundos (los mismos que usa prometheus_client por defecto)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str],
+                   extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Counter:
+    """Contador monótono con etiquetas (se pasan en orden, sin dict, para el hot path)"""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+    
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in values]
+
+class Histogram:
+    """Histograma acumulativo; observe() es un bisect y una suma bajo un lock"""
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Por serie: [conteo por bucket (+Inf al final), suma]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+    
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            snapshot = [(labels, list(counts), total)
+                        for labels, (counts, total) in self._series.items()]
+        lines = []
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = _format_labels(self.labelnames, labels, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            suffix = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{suffix} {_format_value(total)}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+class CallbackMetric:
+    """Gauge o contador cuyo valor se lee al momento del scrape (pools, cache)"""
+    
+    def __init__(self, name: str, documentation: str, kind: str,
+                 labelnames: Sequence[str],
+                 callback: Callable[[], Dict[Tuple[str, ...], float]]):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+    
+    def samples(self) -> List[str]:
+        try:
+            values = self.callback()
+        except Exception as e:
+            print(f"Error leyendo la métrica {self.name}: {e}")
+            return []
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in values.items()]
+
+class MetricsRegistry:
+    """Conjunto de métricas que se exponen juntas en /metrics"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+    
+    def _register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+    
+    def callback(self, name: str, documentation: str, kind: str, labelnames: Sequence[str],
+                 callback: Callable[[], Dict[Tuple[str, ...], float]]) -> CallbackMetric:
+        return self._register(CallbackMetric(name, documentation, kind, labelnames, callback))
+    
+    def render(self) -> str:
+        """Todas las métricas en el formato de texto de Prometheus"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "Tiempo hasta el inicio de la respuesta por ruta",
+    ("method", "route", "status")
+)
+DB_QUERY_DURATION = registry.histogram(
+    "db_query_duration_seconds",
+    "Duración de cada método del almacenamiento (sin aciertos de cache)",
+    ("backend", "method")
+)
+DB_QUERY_ERRORS = registry.counter(
+    "db_query_errors_total",
+    "Métodos del almacenamiento que terminaron con excepción",
+    ("backend", "method")
+)
+N8N_REQUEST_DURATION = registry.histogram(
+    "n8n_request_duration_seconds",
+    "Duración de cada intento de petición a N8N",
+    ("method", "endpoint", "outcome")
+)
+N8N_REQUEST_ERRORS = registry.counter(
+    "n8n_request_errors_total",
+    "Intentos fallidos contra N8N por motivo (código HTTP o tipo de error)",
+    ("method", "endpoint", "reason")
+)
+N8N_FALLBACKS = registry.counter(
+    "n8n_fallbacks_total",
+    "Peticiones a N8N sin respuesta servidas con la última respuesta buena (stale) o mock",
+    ("method", "endpoint", "kind")
+)
+N8N_CIRCUIT_REJECTIONS = registry.counter(
+    "n8n_circuit_rejections_total",
+    "Peticiones a N8N rechazadas al instante con el circuito abierto",
+    ("method", "endpoint")
+)
+
+def timed(histogram: Histogram, errors: Counter, *labels: str):
+    """Decorador que mide la duración de cada llamada y cuenta las excepciones"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                errors.inc(*labels)
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - start, *labels)
+        return wrapper
+    return decorator
+
+class MetricsMiddleware:
+    """Middleware ASGI que registra la latencia de cada petición por plantilla de ruta
+    
+    Se mide hasta que sale la cabecera de la respuesta: así los streams (SSE,
+    exportaciones) no cuentan su duración completa como latencia.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter()
+        recorded = False
+        
+        def record(status: int):
+            nonlocal recorded
+            recorded = True
+            route = scope.get("route")
+            # Rutas sin match se agrupan para no crear una serie por URL
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start, scope["method"], path, str(status)
+            )
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and not recorded:
+                record(message["status"])
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not recorded:
+                record(500)
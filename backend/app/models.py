@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -54,6 +54,32 @@ class Execution(ExecutionBase):
     class Config:
         from_attributes = True
 
+class BatchExecutionItem(BaseModel):
+    workflow_id: str
+    payload: Optional[Dict[str, Any]] = None
+
+class BatchExecutionRequest(BaseModel):
+    items: List[BatchExecutionItem]
+    parallelism: Optional[int] = None
+
+class ExecutionEvent(BaseModel):
+    """Inicio o fin de una ejecución que un workflow de N8N envía al webhook"""
+    execution_id: str
+    workflow_id: str
+    status: ExecutionStatus = ExecutionStatus.RUNNING
+    started_at: Optional[datetime] = None
+    stopped_at: Optional[datetime] = None
+    triggered_by: str = "webhook"
+    data_processed: int = 0
+    error_message: Optional[str] = None
+    idempotency_key: Optional[str] = None
+    
+    @field_validator("execution_id", "workflow_id", mode="before")
+    @classmethod
+    def _as_text(cls, value: Any) -> Any:
+        # {{$execution.id}} puede llegar como número según cómo se arme el body en N8N
+        return str(value) if isinstance(value, int) else value
+
 class DashboardStats(BaseModel):
     total_workflows: int
     active_workflows: int
@@ -71,6 +97,31 @@ class ChartData(BaseModel):
     errors: int
     time_saved: float
 
+class DurationSummary(BaseModel):
+    """Duraciones en ms de ejecuciones terminadas, estimadas con un DDSketch"""
+    count: int = 0
+    mean: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    p50: Optional[float] = None
+    p95: Optional[float] = None
+    p99: Optional[float] = None
+
+class AnalyticsWindow(BaseModel):
+    window: str
+    executions: int
+    successes: int
+    errors: int
+    error_rate: float
+    throughput_per_hour: float
+    duration: DurationSummary
+
+class WorkflowAnalytics(BaseModel):
+    workflow_id: str
+    relative_accuracy: float
+    duration: DurationSummary
+    windows: List[AnalyticsWindow]
+
 class N8NWorkflow(BaseModel):
     id: str
     name: str
@@ -79,4 +130,35 @@ class N8NWorkflow(BaseModel):
     updatedAt: str
     nodes: List[Dict[str, Any]]
     connections: Dict[str, Any]
-    settings: Dict[str, Any]
\ No newline at end of file
+    settings: Dict[str, Any]
+
+class N8NNodeSummary(BaseModel):
+    """Nodo de N8N sin parámetros, posición ni credenciales"""
+    name: Optional[str] = None
+    type: str = ""
+
+class N8NWorkflowSummary(BaseModel):
+    """Workflow de N8N para listados y sincronización
+    
+    Se valida directo desde los bytes de la respuesta: los campos que no están
+    aquí (connections, settings, parámetros de cada nodo) se saltan sin crear
+    objetos de Python.
+    """
+    id: Optional[str] = None
+    name: Optional[str] = None
+    active: bool = False
+    createdAt: Optional[str] = None
+    updatedAt: Optional[str] = None
+    nodes: List[N8NNodeSummary] = []
+    
+    class Config:
+        coerce_numbers_to_str = True
+
+class N8NWorkflowPage(BaseModel):
+    """Página de GET /workflows"""
+    data: List[N8NWorkflowSummary] = []
+    nextCursor: Optional[str] = None
+
+class N8NWorkflowDocument(BaseModel):
+    """Respuesta de GET /workflows/{id} (sólo lo necesario para identificar la versión)"""
+    data: N8NWorkflowSummary
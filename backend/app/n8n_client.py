@@ -1,32 +1,345 @@
-import requests
-from typing import List, Optional, Dict, Any
-from .models import N8NWorkflow
+import asyncio
+import json
+import random
+import uuid
+import httpx
+from pydantic import ValidationError
+from collections import OrderedDict
+from datetime import datetime
+from typing import AsyncIterator, Callable, List, Optional, Dict, Any, Tuple
+from .models import N8NWorkflow, N8NWorkflowSummary, N8NWorkflowPage, N8NWorkflowDocument
+from .config import load_config, env_flag
+from .serialization import loads
+from .database import get_database
+from .workflow_definitions import WorkflowDefinitionCache
+from .circuit_breaker import CircuitBreaker
+from .metrics import (
+    N8N_REQUEST_DURATION, N8N_REQUEST_ERRORS, N8N_FALLBACKS, N8N_CIRCUIT_REJECTIONS
+)
 import os
-from dotenv import load_dotenv
+import time
 
-load_dotenv()
+# Respuestas que vale la pena reintentar
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+# Métodos que se pueden repetir sin efectos secundarios
+IDEMPOTENT_METHODS = {"GET", "PATCH", "PUT", "DELETE"}
+# Retry-After sugerido (s) cuando N8N falla pero el circuito sigue cerrado
+UNAVAILABLE_RETRY_AFTER = 5.0
+# Marcas de las respuestas de respaldo que se devuelven junto con los datos
+DEGRADED_LABELS = ("stale", "fetched_at", "mock")
+# Estados de ejecución de N8N traducidos a ExecutionStatus
+N8N_EXECUTION_STATUS = {
+    "success": "success",
+    "error": "error",
+    "crashed": "error",
+    "failed": "error",
+    "canceled": "error",
+    "running": "running",
+    "new": "running",
+    "waiting": "waiting",
+}
+
+def parse_n8n_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Convertir un timestamp ISO de N8N a hora local sin zona (como el resto de la DB)"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+def execution_status_from_n8n(data: Dict[str, Any]) -> str:
+    """Estado de una ejecución de N8N traducido a ExecutionStatus"""
+    if data.get("status") is None and data.get("finished") is not None:
+        return "success" if data["finished"] else "running"
+    return N8N_EXECUTION_STATUS.get(data.get("status"), "running")
+
+def execution_record_from_n8n(data: Dict[str, Any], workflow: Dict[str, Any],
+                              triggered_by: str = "manual") -> Dict[str, Any]:
+    """Construir una fila de la tabla executions a partir de una ejecución de N8N"""
+    status = execution_status_from_n8n(data)
+    
+    start_time = parse_n8n_timestamp(data.get("startedAt")) or datetime.now()
+    end_time = parse_n8n_timestamp(data.get("stoppedAt"))
+    duration = (end_time - start_time).total_seconds() * 1000 if end_time else None
+    
+    return {
+        "id": f"exec-{uuid.uuid4().hex[:12]}",
+        "workflow_id": workflow["id"],
+        "workflow_name": workflow["name"],
+        "n8n_execution_id": str(data["id"]) if data.get("id") is not None else None,
+        "status": status,
+        "start_time": start_time.isoformat(),
+        "end_time": end_time.isoformat() if end_time else None,
+        "duration": duration,
+        "triggered_by": triggered_by,
+        "data_processed": 0,
+        "error_message": data.get("error") if status == "error" else None,
+    }
+
+def execution_update_from_n8n(data: Dict[str, Any], execution: Dict[str, Any]) -> Dict[str, Any]:
+    """Cambio de estado para una ejecución registrada (id, status, start_time) según N8N"""
+    status = execution_status_from_n8n(data)
+    start_time = parse_n8n_timestamp(data.get("startedAt")) or execution["start_time"]
+    end_time = parse_n8n_timestamp(data.get("stoppedAt"))
+    if end_time is None and status in ("success", "error"):
+        end_time = datetime.now()
+    
+    return {
+        "id": execution["id"],
+        "status": status,
+        "end_time": end_time,
+        "duration": (end_time - start_time).total_seconds() * 1000 if end_time else None,
+        "error_message": data.get("error") if status == "error" else None,
+    }
+
+def endpoint_label(endpoint: str) -> str:
+    """Plantilla del endpoint para métricas: /workflows/42/execute -> /workflows/{id}/execute"""
+    parts = endpoint.strip("/").split("/")
+    if len(parts) > 1:
+        parts[1] = "{id}"
+    return "/" + "/".join(parts)
+
+def _error_reason(error: Exception) -> str:
+    if isinstance(error, httpx.HTTPStatusError):
+        return str(error.response.status_code)
+    return type(error).__name__
+
+def _is_outage(error: Exception) -> bool:
+    """Fallos que indican que N8N no está disponible (no un 4xx de una petición inválida)"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return True
+
+def _parse_json(response: httpx.Response) -> Any:
+    return response.json()
+
+def _parse_workflow_page(response: httpx.Response) -> Dict[str, Any]:
+    """Página de workflows validada directo de los bytes, sin materializar el grafo
+    
+    Si algún workflow no valida se revisan uno por uno: los inválidos se
+    registran y se saltan, y el resto de la página se usa igual.
+    """
+    try:
+        page = N8NWorkflowPage.model_validate_json(response.content)
+        return {"data": page.data, "nextCursor": page.nextCursor}
+    except ValidationError:
+        # JSON que no se puede leer: ValueError para quien llama
+        raw = loads(response.content)
+    
+    if not isinstance(raw, dict) or not isinstance(raw.get("data") or [], list):
+        raise ValueError("Página de workflows de N8N con formato inesperado")
+    workflows = []
+    for item in raw.get("data") or []:
+        try:
+            workflows.append(N8NWorkflowSummary.model_validate(item))
+        except ValidationError as e:
+            workflow_id = item.get("id") if isinstance(item, dict) else None
+            print(f"Error parsing workflow {workflow_id}: {e}")
+    cursor = raw.get("nextCursor")
+    return {"data": workflows, "nextCursor": str(cursor) if cursor is not None else None}
+
+def _parse_workflow_document(response: httpx.Response) -> Dict[str, Any]:
+    """Definición completa sin validar: JSON tal cual más versión y ETag"""
+    if response.status_code == 304:
+        return {"not_modified": True}
+    document = N8NWorkflowDocument.model_validate_json(response.content)
+    return {
+        "updated_at": document.data.updatedAt,
+        "etag": response.headers.get("etag"),
+        "definition": response.text,
+    }
+
+def _summaries(items: List[Any]) -> List[N8NWorkflowSummary]:
+    # Las páginas de N8N ya vienen validadas; los datos mock y de respaldo pueden ser dicts
+    return [N8NWorkflowSummary.model_validate(item) for item in items]
+
+def _degraded_labels(response: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: response[key] for key in DEGRADED_LABELS if key in response}
+
+class N8NUnavailableError(Exception):
+    """N8N no responde o el circuito está abierto; retry_after en segundos"""
+    
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
 
 class N8NClient:
-    def __init__(self):
-        self.base_url = os.getenv("N8N_BASE_URL", "http://localhost:5678/api/v1")
-        self.api_key = os.getenv("N8N_API_KEY")
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None,
+                 max_connections: Optional[int] = None, max_in_flight: Optional[int] = None,
+                 timeout: Optional[float] = None, max_retries: Optional[int] = None,
+                 backoff_base: float = 0.2, backoff_max: float = 5.0,
+                 breaker: Optional[CircuitBreaker] = None, mock_data: Optional[bool] = None,
+                 stale_max_entries: int = 256,
+                 definitions: Optional[WorkflowDefinitionCache] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.base_url = base_url or os.getenv("N8N_BASE_URL", "http://localhost:5678/api/v1")
+        self.api_key = api_key if api_key is not None else os.getenv("N8N_API_KEY")
         self.headers = {
             "X-N8N-API-KEY": self.api_key,
             "Content-Type": "application/json"
         } if self.api_key else {"Content-Type": "application/json"}
+        
+        self.timeout = timeout or float(os.getenv("N8N_TIMEOUT", 10))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("N8N_MAX_RETRIES", 3))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        
+        self.max_connections = max_connections or int(os.getenv("N8N_MAX_CONNECTIONS", 20))
+        max_in_flight = max_in_flight or int(os.getenv("N8N_MAX_IN_FLIGHT", 10))
+        
+        self._client: Optional[httpx.AsyncClient] = None
+        # Transporte alternativo (p.ej. httpx.MockTransport en tests); None = pool HTTP normal
+        self._transport = transport
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        
+        self.breaker = breaker or CircuitBreaker(
+            "n8n",
+            failure_threshold=int(os.getenv("N8N_BREAKER_FAILURE_THRESHOLD", 5)),
+            reset_timeout=float(os.getenv("N8N_BREAKER_RESET_SECONDS", 30))
+        )
+        # Datos de ejemplo sólo en modo desarrollo; en producción una caída se ve como caída
+        self.mock_data = mock_data if mock_data is not None else env_flag("N8N_MOCK_DATA")
+        # Última respuesta buena de las lecturas que aceptan datos viejos
+        self.stale_max_entries = stale_max_entries
+        self._last_good: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # Definiciones completas por (id, updatedAt), persistidas en la base
+        self.definitions = definitions
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pool keep-alive único, creado en la primera petición
+        
+        Armar el transporte (httpcore y el contexto SSL) cuesta más que el resto
+        del arranque, así que no se paga al levantar un worker.
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                transport=self._transport
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Cerrar el pool de conexiones"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """Backoff exponencial con jitter completo"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+    
+    def _should_retry(self, method: str, error: Exception) -> bool:
+        if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+            # La petición no llegó a enviarse: siempre se puede repetir
+            return True
+        if method.upper() not in IDEMPOTENT_METHODS:
+            return False
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRYABLE_STATUS_CODES
+        return isinstance(error, httpx.TransportError)
     
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
-        """Hacer petición HTTP a N8N"""
+    async def _make_request(self, method: str, endpoint: str,
+                            timeout: Optional[float] = None, allow_stale: bool = False,
+                            parse: Callable[[httpx.Response], Any] = _parse_json,
+                            **kwargs) -> Dict[str, Any]:
+        """Hacer petición HTTP a N8N
+        
+        Si N8N no está disponible (o el circuito está abierto) lanza
+        N8NUnavailableError; con allow_stale devuelve antes la última respuesta
+        buena marcada con "stale": true. parse convierte la respuesta (por
+        defecto response.json()); si el cuerpo no es válido su ValueError llega
+        a quien llama sin contar como caída de N8N.
+        """
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        label = endpoint_label(endpoint)
+        stale_key = (endpoint, json.dumps(kwargs.get("params"), sort_keys=True)) if allow_stale else None
+        
+        if not self.breaker.allow_request():
+            N8N_CIRCUIT_REJECTIONS.inc(method, label)
+            return self._fallback(method, endpoint, stale_key, "circuito abierto")
         
+        attempt = 0
+        while True:
+            try:
+                async with self._in_flight:
+                    # Latencia de N8N, sin la espera por el límite de peticiones en vuelo
+                    start = time.perf_counter()
+                    response = await self.client.request(
+                        method, url, timeout=timeout or self.timeout, **kwargs
+                    )
+                # 304 sólo llega a peticiones condicionales, que lo resuelve parse
+                if response.status_code != 304:
+                    response.raise_for_status()
+                break
+            except httpx.HTTPError as e:
+                N8N_REQUEST_DURATION.observe(time.perf_counter() - start, method, label, "error")
+                N8N_REQUEST_ERRORS.inc(method, label, _error_reason(e))
+                # Si otra petición ya abrió el circuito no tiene sentido seguir reintentando
+                if (attempt < self.max_retries and self._should_retry(method, e)
+                        and not self.breaker.is_open):
+                    await asyncio.sleep(self._backoff_delay(attempt))
+                    attempt += 1
+                    continue
+                if not _is_outage(e):
+                    # N8N respondió: está disponible y el error es de la petición
+                    self.breaker.record_success()
+                    raise
+                print(f"Error connecting to N8N: {e}")
+                self.breaker.record_failure(_error_reason(e))
+                return self._fallback(method, endpoint, stale_key, str(e))
+        
+        # N8N respondió: un cuerpo inválido no es una caída ni se arregla reintentando
+        self.breaker.record_success()
         try:
-            response = requests.request(method, url, headers=self.headers, **kwargs)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error connecting to N8N: {e}")
-            # Retornar datos mock si N8N no está disponible
-            return self._get_mock_data(endpoint)
+            data = parse(response)
+        except ValueError:
+            N8N_REQUEST_DURATION.observe(time.perf_counter() - start, method, label, "error")
+            N8N_REQUEST_ERRORS.inc(method, label, "invalid_response")
+            raise
+        N8N_REQUEST_DURATION.observe(time.perf_counter() - start, method, label, "success")
+        if stale_key is not None:
+            self._remember(stale_key, data)
+        return data
+    
+    def _remember(self, key: Tuple[str, str], data: Dict[str, Any]):
+        self._last_good[key] = (time.time(), data)
+        self._last_good.move_to_end(key)
+        while len(self._last_good) > self.stale_max_entries:
+            self._last_good.popitem(last=False)
+    
+    def _fallback(self, method: str, endpoint: str, stale_key: Optional[Tuple[str, str]],
+                  reason: str) -> Dict[str, Any]:
+        """Respuesta cuando N8N no está disponible: última buena, mock (dev) o error"""
+        label = endpoint_label(endpoint)
+        if stale_key is not None and stale_key in self._last_good:
+            fetched_at, data = self._last_good[stale_key]
+            N8N_FALLBACKS.inc(method, label, "stale")
+            return {**data, "stale": True,
+                    "fetched_at": datetime.fromtimestamp(fetched_at).isoformat()}
+        # Nunca se simulan escrituras (ejecutar, activar): el llamador debe ver el fallo
+        if self.mock_data and method == "GET":
+            N8N_FALLBACKS.inc(method, label, "mock")
+            return {**self._get_mock_data(endpoint), "mock": True}
+        # Con el circuito abierto se sabe cuándo habrá una prueba; si no, un reintento corto
+        retry_after = self.breaker.retry_after() if self.breaker.is_open else UNAVAILABLE_RETRY_AFTER
+        raise N8NUnavailableError(f"N8N no está disponible ({reason})", retry_after=retry_after)
+    
+    def status(self) -> Dict[str, Any]:
+        """Estado del circuito y de los datos de respaldo"""
+        return {
+            "base_url": self.base_url,
+            "circuit": self.breaker.status(),
+            "stale_entries": len(self._last_good),
+            "mock_data": self.mock_data,
+            "definitions": self.definitions.stats() if self.definitions is not None else None,
+        }
     
     def _get_mock_data(self, endpoint: str) -> Dict[str, Any]:
         """Datos mock cuando N8N no está disponible"""
@@ -63,51 +376,158 @@ class N8NClient:
             }
         return {"data": []}
     
-    def get_workflows(self) -> List[N8NWorkflow]:
-        """Obtener todos los workflows de N8N"""
-        response = self._make_request("GET", "/workflows")
-        workflows = []
+    async def get_workflows(self) -> Dict[str, Any]:
+        """Obtener todos los workflows de N8N (resumen, sin el grafo de nodos)
         
-        for workflow_data in response.get("data", []):
-            try:
-                workflows.append(N8NWorkflow(**workflow_data))
-            except Exception as e:
-                print(f"Error parsing workflow {workflow_data.get('id')}: {e}")
-                continue
+        {"data": [...]} más stale/fetched_at o mock si la respuesta no viene de N8N.
+        """
+        response = await self._make_request("GET", "/workflows", allow_stale=True,
+                                            parse=_parse_workflow_page)
+        return {"data": _summaries(response.get("data", [])), **_degraded_labels(response)}
+    
+    async def iter_workflow_pages(self, page_size: int = 100) -> AsyncIterator[List[N8NWorkflowSummary]]:
+        """Recorrer los workflows de N8N página a página siguiendo nextCursor"""
+        cursor = None
+        while True:
+            params = {"limit": page_size}
+            if cursor:
+                params["cursor"] = cursor
+            response = await self._make_request("GET", "/workflows", params=params,
+                                                parse=_parse_workflow_page)
+            
+            page = _summaries(response.get("data", []))
+            if page:
+                yield page
+            
+            cursor = response.get("nextCursor")
+            if not cursor or not page:
+                break
+    
+    async def iter_execution_pages(self, page_size: int = 100,
+                                   workflow_id: Optional[str] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Recorrer las ejecuciones de N8N (más recientes primero) siguiendo nextCursor"""
+        cursor = None
+        while True:
+            params = {"limit": page_size}
+            if workflow_id:
+                params["workflowId"] = workflow_id
+            if cursor:
+                params["cursor"] = cursor
+            response = await self._make_request("GET", "/executions", params=params)
+            
+            page = response.get("data", [])
+            if page:
+                yield page
+            
+            cursor = response.get("nextCursor")
+            if not cursor or not page:
+                break
+    
+    async def get_workflow_definition(self, workflow_id: str,
+                                      updated_at: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Definición completa de un workflow como JSON sin validar
         
-        return workflows
+        Con cache de definiciones y el updatedAt vigente (el de la última
+        sincronización) no se consulta N8N. Si no coincide se pide de nuevo,
+        condicionada al ETag guardado cuando N8N lo envía. Devuelve n8n_id,
+        updated_at, etag, definition y source (cache, not_modified, n8n o stale).
+        """
+        cached = None
+        if self.definitions is not None:
+            cached = await asyncio.to_thread(self.definitions.get, workflow_id)
+            if cached is not None and updated_at and cached["updated_at"] == updated_at:
+                return {**cached, "source": "cache"}
+        
+        headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else None
+        try:
+            response = await self._make_request(
+                "GET", f"/workflows/{workflow_id}", headers=headers,
+                allow_stale=self.definitions is None, parse=_parse_workflow_document
+            )
+        except N8NUnavailableError:
+            # Una versión anterior sigue siendo mejor que nada para mostrar el grafo
+            if cached is None:
+                raise
+            N8N_FALLBACKS.inc("GET", "/workflows/{id}", "stale")
+            return {**cached, "source": "stale"}
+        
+        if response.get("not_modified") and cached is not None:
+            return {**cached, "source": "not_modified"}
+        if "definition" not in response:
+            # Datos mock: no hay definición real que devolver
+            return None
+        if self.definitions is None:
+            return {"n8n_id": workflow_id, **response,
+                    "source": "stale" if response.get("stale") else "n8n"}
+        
+        entry = await asyncio.to_thread(
+            self.definitions.put, workflow_id, response["updated_at"],
+            response["definition"], response["etag"]
+        )
+        return {**entry, "source": "n8n"}
     
-    def get_workflow(self, workflow_id: str) -> Optional[N8NWorkflow]:
-        """Obtener un workflow específico"""
-        response = self._make_request("GET", f"/workflows/{workflow_id}")
+    async def get_workflow(self, workflow_id: str,
+                           updated_at: Optional[str] = None) -> Optional[N8NWorkflow]:
+        """Obtener un workflow específico (con nodos y conexiones)"""
+        definition = await self.get_workflow_definition(workflow_id, updated_at)
+        if definition is None:
+            return None
         
-        if response.get("data"):
-            try:
-                return N8NWorkflow(**response["data"])
-            except Exception as e:
-                print(f"Error parsing workflow {workflow_id}: {e}")
+        try:
+            return N8NWorkflow(**json.loads(definition["definition"])["data"])
+        except Exception as e:
+            print(f"Error parsing workflow {workflow_id}: {e}")
         
         return None
     
-    def execute_workflow(self, workflow_id: str) -> Dict[str, Any]:
+    async def execute_workflow(self, workflow_id: str,
+                               payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Ejecutar un workflow"""
-        return self._make_request("POST", f"/workflows/{workflow_id}/execute")
+        kwargs = {"json": payload} if payload is not None else {}
+        return await self._make_request("POST", f"/workflows/{workflow_id}/execute", **kwargs)
+    
+    async def get_execution(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """Obtener una ejecución por id (None si N8N ya no la tiene)"""
+        try:
+            return await self._make_request("GET", f"/executions/{execution_id}")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None
+            raise
     
-    def get_executions(self, workflow_id: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Obtener ejecuciones"""
-        endpoint = "/executions"
-        if workflow_id:
-            endpoint += f"?workflowId={workflow_id}"
+    async def get_executions(self, workflow_id: Optional[str] = None) -> Dict[str, Any]:
+        """Obtener ejecuciones: {"data": [...]} con las mismas marcas que get_workflows"""
+        params = {"workflowId": workflow_id} if workflow_id else None
         
-        response = self._make_request("GET", endpoint)
-        return response.get("data", [])
+        response = await self._make_request("GET", "/executions", params=params, allow_stale=True)
+        return {"data": response.get("data", []), **_degraded_labels(response)}
     
-    def activate_workflow(self, workflow_id: str) -> Dict[str, Any]:
+    async def activate_workflow(self, workflow_id: str) -> Dict[str, Any]:
         """Activar un workflow"""
-        return self._make_request("PATCH", f"/workflows/{workflow_id}", 
-                                json={"active": True})
+        return await self._make_request("PATCH", f"/workflows/{workflow_id}", 
+                                        json={"active": True})
     
-    def deactivate_workflow(self, workflow_id: str) -> Dict[str, Any]:
+    async def deactivate_workflow(self, workflow_id: str) -> Dict[str, Any]:
         """Desactivar un workflow"""
-        return self._make_request("PATCH", f"/workflows/{workflow_id}", 
-                                json={"active": False})
\ No newline at end of file
+        return await self._make_request("PATCH", f"/workflows/{workflow_id}", 
+                                        json={"active": False})
+
+_n8n_client: Optional[N8NClient] = None
+
+def get_n8n_client() -> N8NClient:
+    """Cliente N8N compartido por todo el proceso"""
+    global _n8n_client
+    if _n8n_client is None:
+        load_config()
+        definitions = WorkflowDefinitionCache(
+            get_database(), max_entries=int(os.getenv("N8N_DEFINITION_CACHE_SIZE", 64))
+        )
+        _n8n_client = N8NClient(definitions=definitions)
+    return _n8n_client
+
+async def close_n8n_client():
+    """Cerrar el cliente compartido (al apagar la app)"""
+    global _n8n_client
+    if _n8n_client is not None:
+        await _n8n_client.aclose()
+        _n8n_client = None
@@ -0,0 +1,97 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+class SamplingProfiler:
+    """Profiler de muestreo: cada `interval` s anota la pila de cada hilo
+    
+    El resultado sale en formato "collapsed" (una pila por línea con su
+    conteo), el que leen flamegraph.pl y speedscope. Apagado no cuesta nada;
+    encendido, un hilo que despierta `1 / interval` veces por segundo.
+    """
+    
+    def __init__(self, interval: float = 0.01, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._started_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+    
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+    
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self._samples = 0
+            self._started_at = time.time() if self.running else None
+    
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            stacks = []
+            for thread_id, frame in frames.items():
+                if thread_id == own_id:
+                    continue
+                names = []
+                while frame is not None and len(names) < self.max_depth:
+                    code = frame.f_code
+                    names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stacks.append(";".join(reversed(names)))
+            with self._lock:
+                self._stacks.update(stacks)
+                self._samples += 1
+    
+    def collapsed(self) -> str:
+        """Pilas acumuladas en formato collapsed, de la más frecuente a la menos"""
+        with self._lock:
+            stacks = self._stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+    
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "samples": self._samples,
+            "distinct_stacks": len(self._stacks),
+            "started_at": self._started_at,
+        }
+
+_profiler: Optional[SamplingProfiler] = None
+
+def get_profiler() -> SamplingProfiler:
+    """Profiler compartido; PROFILER_ENABLED=true lo enciende al arrancar"""
+    global _profiler
+    if _profiler is None:
+        _profiler = SamplingProfiler(interval=float(os.getenv("PROFILER_INTERVAL_MS", 10)) / 1000)
+    return _profiler
+
+def close_profiler():
+    global _profiler
+    if _profiler is not None:
+        _profiler.stop()
+        _profiler = None
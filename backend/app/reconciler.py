@@ -0,0 +1,295 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from .database import StorageBackend, get_database
+from .n8n_client import (
+    N8NClient, N8NUnavailableError, get_n8n_client, execution_update_from_n8n, parse_n8n_timestamp
+)
+
+# Estados que todavía pueden cambiar en N8N
+IN_FLIGHT_STATUSES = ("running", "waiting")
+
+def _timestamp(value: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(value).isoformat() if value else None
+
+class InFlightExecution:
+    """Ejecución en curso con su propio intervalo de consulta"""
+    
+    __slots__ = ("id", "n8n_execution_id", "status", "start_time", "interval", "next_check")
+    
+    def __init__(self, row: Dict[str, Any], interval: float, next_check: float):
+        self.id = row["id"]
+        self.n8n_execution_id = row["n8n_execution_id"]
+        self.status = row["status"]
+        self.start_time = row["start_time"]
+        self.interval = interval
+        self.next_check = next_check
+
+class ExecutionReconciler:
+    """Lleva a su estado final las ejecuciones running/waiting consultando N8N por lotes
+    
+    En cada ciclo se recorren las páginas de GET /executions (más recientes
+    primero) hasta cubrir las ejecuciones que tocan, en vez de una petición por
+    ejecución. Las que quedan fuera de esa ventana se consultan una a una, con
+    un tope por ciclo. Cada ejecución que sigue en curso espera un 50% más
+    para la próxima consulta (hasta max_interval), y los cambios se aplican en
+    la base en una sola transacción. Un lease asegura un solo worker activo.
+    """
+    
+    LEASE_NAME = "n8n-reconcile"
+    
+    def __init__(self, db: StorageBackend, n8n_client: N8NClient, interval: float = 2.0,
+                 max_interval: float = 60.0, backoff: float = 1.5, page_size: int = 250,
+                 max_pages: int = 40, max_lookups: int = 50, max_tracked: int = 10000,
+                 lease_ttl: Optional[float] = None):
+        self.db = db
+        self.n8n_client = n8n_client
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.max_lookups = max_lookups
+        self.max_tracked = max_tracked
+        self.lease_ttl = lease_ttl or max(30.0, max_interval * 2)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tracked: Dict[str, InFlightExecution] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        self.is_leader = False
+        self.last_run_finished_at: Optional[float] = None
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+        self.totals = {"n8n_requests": 0, "reconciled": 0, "cycles": 0}
+    
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+    
+    @property
+    def tracked_count(self) -> int:
+        return len(self._tracked)
+    
+    def start(self):
+        if self.enabled and self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self.db.add_listener(self._on_database_event)
+            self._task = asyncio.create_task(self._loop_forever())
+    
+    async def stop(self):
+        if self._task is None:
+            return
+        self.db.remove_listener(self._on_database_event)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self.is_leader:
+            await asyncio.to_thread(self.db.release_lease, self.LEASE_NAME, self.owner)
+            self.is_leader = False
+    
+    def _on_database_event(self, event: str, payload: Any):
+        # Llega desde el hilo que escribió: despertar el ciclo si entró algo en curso
+        if event != "executions_inserted" or self._loop is None or self._loop.is_closed():
+            return
+        if any(record["status"] in IN_FLIGHT_STATUSES for record in payload):
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+    
+    async def _loop_forever(self):
+        while True:
+            delay = self.max_interval
+            try:
+                await self.run_once()
+                delay = self._next_delay()
+            except N8NUnavailableError as e:
+                self.last_error = str(e)
+                delay = min(self.max_interval, max(self.interval, e.retry_after))
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Error conciliando ejecuciones: {e}")
+            
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                # Una ejecución nueva se consulta recién pasado el intervalo mínimo
+                await asyncio.sleep(self.interval)
+            except asyncio.TimeoutError:
+                pass
+    
+    def _next_delay(self) -> float:
+        if not self._tracked:
+            return self.max_interval
+        earliest = min(execution.next_check for execution in self._tracked.values())
+        return min(self.max_interval, max(self.interval, earliest - time.monotonic()))
+    
+    def _track(self, rows: List[Dict[str, Any]]):
+        """Sincronizar el seguimiento con lo que la base tiene en curso"""
+        now = time.monotonic()
+        current = {}
+        for row in rows:
+            execution = self._tracked.get(row["n8n_execution_id"])
+            if execution is None:
+                execution = InFlightExecution(row, self.interval, now)
+            else:
+                execution.status = row["status"]
+            current[execution.n8n_execution_id] = execution
+        self._tracked = current
+    
+    async def run_once(self) -> Optional[Dict[str, Any]]:
+        """Consultar las ejecuciones que tocan y aplicar sus cambios; None sin el lease"""
+        self.is_leader = await asyncio.to_thread(
+            self.db.try_acquire_lease, self.LEASE_NAME, self.owner, self.lease_ttl
+        )
+        if not self.is_leader:
+            self._tracked = {}
+            return None
+        
+        rows = await asyncio.to_thread(self.db.get_inflight_executions, self.max_tracked)
+        self._track(rows)
+        now = time.monotonic()
+        due = {key: e for key, e in self._tracked.items() if e.next_check <= now}
+        result = {"tracked": len(self._tracked), "due": len(due), "pages": 0, "lookups": 0,
+                  "lookup_errors": 0, "updated": 0}
+        
+        if due:
+            found = await self._scan_pages(due, result)
+            found.update(await self._lookup_missing(due, found, result))
+            result["updated"] = await self._apply(due, found)
+        
+        self.totals["n8n_requests"] += result["pages"] + result["lookups"]
+        self.totals["reconciled"] += result["updated"]
+        self.totals["cycles"] += 1
+        self.last_result = result
+        self.last_error = None
+        self.last_run_finished_at = time.time()
+        return result
+    
+    async def _scan_pages(self, due: Dict[str, InFlightExecution],
+                          result: Dict[str, Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Recorrer GET /executions hasta cubrir las pendientes o pasar la más antigua"""
+        found: Dict[str, Optional[Dict[str, Any]]] = {}
+        # Margen por diferencias de reloj entre N8N y la hora guardada
+        oldest = min(e.start_time for e in due.values()) - timedelta(minutes=1)
+        
+        pages = self.n8n_client.iter_execution_pages(self.page_size)
+        try:
+            async for page in pages:
+                result["pages"] += 1
+                for data in page:
+                    key = str(data.get("id"))
+                    if key in due:
+                        found[key] = data
+                started = parse_n8n_timestamp(page[-1].get("startedAt"))
+                if (len(found) == len(due) or result["pages"] >= self.max_pages
+                        or (started is not None and started < oldest)):
+                    break
+        finally:
+            await pages.aclose()
+        return found
+    
+    async def _lookup_missing(self, due: Dict[str, InFlightExecution],
+                              found: Dict[str, Optional[Dict[str, Any]]],
+                              result: Dict[str, Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Consultar una a una (con tope) las que quedaron fuera de las páginas recorridas"""
+        missing = sorted((e for key, e in due.items() if key not in found),
+                         key=lambda e: e.next_check)[:self.max_lookups]
+        if not missing:
+            return {}
+        
+        # Una consulta que falla no descarta las demás ni lo ya leído de las páginas
+        responses = await asyncio.gather(*[
+            self.n8n_client.get_execution(e.n8n_execution_id) for e in missing
+        ], return_exceptions=True)
+        result["lookups"] += len(missing)
+        
+        found_now = {}
+        errors = []
+        for execution, response in zip(missing, responses):
+            if isinstance(response, Exception):
+                errors.append(response)
+            elif isinstance(response, BaseException):
+                raise response
+            else:
+                found_now[execution.n8n_execution_id] = response
+        if errors:
+            # Las que fallaron siguen pendientes y se consultan en el próximo ciclo
+            result["lookup_errors"] += len(errors)
+            print(f"Error consultando {len(errors)} ejecuciones en N8N: {errors[0]}")
+        return found_now
+    
+    async def _apply(self, due: Dict[str, InFlightExecution],
+                     found: Dict[str, Optional[Dict[str, Any]]]) -> int:
+        """Guardar los cambios de estado en bloque y reprogramar las que siguen en curso"""
+        now = time.monotonic()
+        updates = []
+        for key, execution in due.items():
+            if key not in found:
+                # No se alcanzó a consultar en este ciclo: vuelve a tocar en el siguiente
+                continue
+            data = found[key]
+            if data is None:
+                # N8N ya no la tiene (borrada o podada): no va a terminar nunca
+                updates.append({
+                    "id": execution.id, "status": "error", "end_time": datetime.now(),
+                    "duration": None, "error_message": "La ejecución ya no existe en N8N",
+                })
+                continue
+            
+            update = execution_update_from_n8n(data, {"id": execution.id,
+                                                      "start_time": execution.start_time})
+            if update["status"] != execution.status:
+                updates.append(update)
+                execution.status = update["status"]
+            if update["status"] in IN_FLIGHT_STATUSES:
+                execution.interval = min(self.max_interval, execution.interval * self.backoff)
+                execution.next_check = now + execution.interval
+        
+        if not updates:
+            return 0
+        return await asyncio.to_thread(self.db.update_execution_statuses, updates)
+    
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "interval_seconds": self.interval,
+            "max_interval_seconds": self.max_interval,
+            "owner": self.owner,
+            "is_leader": self.is_leader,
+            "tracked": len(self._tracked),
+            "last_run_finished_at": _timestamp(self.last_run_finished_at),
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+            "totals": dict(self.totals),
+        }
+
+_execution_reconciler: Optional[ExecutionReconciler] = None
+
+def get_execution_reconciler() -> ExecutionReconciler:
+    """Conciliador compartido por todo el proceso"""
+    global _execution_reconciler
+    if _execution_reconciler is None:
+        _execution_reconciler = ExecutionReconciler(
+            get_database(),
+            get_n8n_client(),
+            interval=float(os.getenv("RECONCILE_INTERVAL_SECONDS", 2)),
+            max_interval=float(os.getenv("RECONCILE_MAX_INTERVAL_SECONDS", 60)),
+            max_pages=int(os.getenv("RECONCILE_MAX_PAGES", 40)),
+            max_lookups=int(os.getenv("RECONCILE_MAX_LOOKUPS", 50)),
+            max_tracked=int(os.getenv("RECONCILE_MAX_TRACKED", 10000))
+        )
+    return _execution_reconciler
+
+async def close_execution_reconciler():
+    global _execution_reconciler
+    if _execution_reconciler is not None:
+        await _execution_reconciler.stop()
+        _execution_reconciler = None
@@ -0,0 +1,31 @@
+import asyncio
+import os
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from ..events import EventBus, get_event_bus
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+@router.get("/")
+async def stream_events(bus: EventBus = Depends(get_event_bus)):
+    """Flujo SSE con ejecuciones nuevas, cambios de workflows y estadísticas"""
+    heartbeat = float(os.getenv("SSE_HEARTBEAT_SECONDS", 15))
+    queue = bus.subscribe()
+    
+    async def event_stream():
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    # Comentario SSE para mantener viva la conexión en proxies
+                    yield b": keepalive\n\n"
+        finally:
+            bus.unsubscribe(queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,26 +1,145 @@
-from fastapi import APIRouter, Depends
-from typing import List, Optional
-from ..models import Execution
-from ..database import Database
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Literal, Optional
+from ..models import Execution, ExecutionStatus, ChartData
+from ..database import StorageBackend, get_database, BUCKET_STEPS, to_local_naive
+from ..archive import ExecutionArchiver, get_execution_archiver
+from ..reconciler import ExecutionReconciler, get_execution_reconciler
+from ..serialization import FastJSONResponse
+from ..export import EXPORT_FORMATS, ExportLimiter, export_executions, get_export_limiter
 
 router = APIRouter(prefix="/api/executions", tags=["executions"])
 
-def get_database():
-    return Database()
-
 @router.get("/", response_model=List[Execution])
 async def get_executions(
     workflow_id: Optional[str] = None,
-    limit: int = 50,
-    db: Database = Depends(get_database)
+    status: Optional[ExecutionStatus] = None,
+    triggered_by: Optional[str] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    include_error: bool = True,
+    include_archived: bool = False,
+    limit: int = Query(50, ge=1, le=5000),
+    db: StorageBackend = Depends(get_database)
 ):
-    """Obtener ejecuciones con filtros opcionales"""
-    return db.get_executions(workflow_id=workflow_id, limit=limit)
+    """Obtener ejecuciones con filtros opcionales; la siguiente página va en X-Next-Cursor
+    
+    Con include_archived también se leen los meses ya archivados en disco. Las
+    filas se codifican directo a JSON (mismo esquema que Execution).
+    """
+    try:
+        body, next_cursor = db.get_executions_json(
+            workflow_id=workflow_id,
+            limit=limit,
+            status=status.value if status else None,
+            triggered_by=triggered_by,
+            start_time=start_time,
+            end_time=end_time,
+            cursor=cursor,
+            include_error=include_error,
+            include_archived=include_archived
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return FastJSONResponse(body, headers=headers)
+
+@router.get("/export")
+async def export_execution_history(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    compress: bool = False,
+    workflow_id: Optional[str] = None,
+    status: Optional[ExecutionStatus] = None,
+    triggered_by: Optional[str] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    include_error: bool = True,
+    include_archived: bool = False,
+    db: StorageBackend = Depends(get_database),
+    limiter: ExportLimiter = Depends(get_export_limiter)
+):
+    """Exportar ejecuciones como NDJSON o CSV en streaming, las más antiguas primero
+    
+    Acepta los mismos filtros que el listado. Las filas se leen por lotes, así
+    que la memoria no depende del tamaño del rango. Con compress la respuesta
+    va en gzip (Content-Encoding).
+    """
+    slot = limiter.try_acquire()
+    if slot is None:
+        raise HTTPException(
+            status_code=429,
+            detail="Hay demasiadas exportaciones en curso",
+            headers={"Retry-After": "30"}
+        )
+    
+    media_type, extension = EXPORT_FORMATS[export_format]
+    headers = {"Content-Disposition": f'attachment; filename="executions.{extension}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    chunks = export_executions(
+        db, export_format, compress,
+        workflow_id=workflow_id,
+        status=status.value if status else None,
+        triggered_by=triggered_by,
+        start_time=start_time,
+        end_time=end_time,
+        include_error=include_error,
+        include_archived=include_archived
+    )
+    # El cupo se libera al terminar el generador o, si nunca arrancó, al cerrar la respuesta
+    return StreamingResponse(limiter.stream(slot, chunks), media_type=media_type,
+                             headers=headers, background=BackgroundTask(slot.release))
+
+@router.get("/timeseries", response_model=List[ChartData])
+async def get_execution_timeseries(
+    resolution: Literal["minute", "hour", "day"] = "day",
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    workflow_id: Optional[str] = None,
+    db: StorageBackend = Depends(get_database)
+):
+    """Ejecuciones, éxitos, errores y tiempo ahorrado por minuto, hora o día"""
+    max_points = int(os.getenv("TIMESERIES_MAX_POINTS", 5000))
+    end_time = to_local_naive(end_time) if end_time else datetime.now()
+    start_time = to_local_naive(start_time) if start_time else end_time - timedelta(days=30)
+    
+    if start_time > end_time:
+        raise HTTPException(status_code=400, detail="start_time debe ser anterior a end_time")
+    if (end_time - start_time) / BUCKET_STEPS[resolution] > max_points:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El rango supera {max_points} puntos; use una resolución mayor"
+        )
+    
+    return db.get_timeseries(resolution, start_time, end_time, workflow_id=workflow_id)
+
+@router.get("/archives")
+async def get_execution_archives(
+    db: StorageBackend = Depends(get_database),
+    archiver: ExecutionArchiver = Depends(get_execution_archiver)
+) -> Dict[str, Any]:
+    """Meses archivados en disco y estado del archivado periódico"""
+    return {
+        "archiver": archiver.status(),
+        "archives": db.get_execution_archives()
+    }
+
+@router.get("/reconciler")
+async def get_reconciler_status(
+    reconciler: ExecutionReconciler = Depends(get_execution_reconciler)
+) -> Dict[str, Any]:
+    """Ejecuciones en curso que se siguen contra N8N y resultado del último ciclo"""
+    return reconciler.status()
 
 @router.get("/recent", response_model=List[Execution])
 async def get_recent_executions(
     limit: int = 10,
-    db: Database = Depends(get_database)
+    db: StorageBackend = Depends(get_database)
 ):
     """Obtener las ejecuciones más recientes"""
-    return db.get_executions(limit=limit)
\ No newline at end of file
+    return FastJSONResponse(db.get_executions_json(limit=limit)[0])
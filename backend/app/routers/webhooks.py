@@ -0,0 +1,46 @@
+from typing import List, Union
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+from ..models import ExecutionEvent
+from ..serialization import FastJSONResponse
+from ..webhooks import get_webhook_writer, verify_webhook_secret
+
+router = APIRouter(prefix="/api/webhooks", tags=["webhooks"])
+
+# El cuerpo se valida a mano: sin parámetros Body/Header/Depends FastAPI no arma
+# el resolver de dependencias ni pasa por el threadpool en cada evento
+_EVENTS = TypeAdapter(Union[List[ExecutionEvent], ExecutionEvent])
+
+@router.post("/n8n/executions", status_code=202)
+async def receive_execution_events(request: Request):
+    """Recibir eventos de inicio y fin de ejecuciones desde N8N (un ExecutionEvent o una lista)
+    
+    Responde 202 en cuanto los eventos quedan en cola; se guardan en
+    micro-lotes. Los repetidos (misma clave de idempotencia, del evento o del
+    header Idempotency-Key) se cuentan pero no se encolan. Con la cola llena
+    responde 503 para que N8N reintente. Exige X-Webhook-Secret igual a
+    N8N_WEBHOOK_SECRET: sin secreto configurado responde 401 a todo.
+    """
+    if not verify_webhook_secret(request.headers.get("x-webhook-secret")):
+        raise HTTPException(status_code=401, detail="Secreto del webhook inválido")
+    
+    try:
+        events = _EVENTS.validate_json(await request.body())
+    except ValidationError as e:
+        # Mismo formato de 422 que un parámetro Body de FastAPI
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])}
+                                      for error in e.errors(include_url=False)])
+    if isinstance(events, ExecutionEvent):
+        events = [events]
+    
+    result = get_webhook_writer().accept(events, request.headers.get("idempotency-key"))
+    if result is None:
+        raise HTTPException(
+            status_code=503,
+            detail="La cola de eventos está llena",
+            headers={"Retry-After": "1"}
+        )
+    
+    accepted, duplicates = result
+    return FastJSONResponse({"accepted": accepted, "duplicates": duplicates}, status_code=202)
@@ -1,111 +1,305 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Optional
-from ..models import Workflow, DashboardStats
-from ..database import Database
-from ..n8n_client import N8NClient
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+import httpx
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Set
+from ..models import Workflow, DashboardStats, BatchExecutionRequest, WorkflowAnalytics
+from ..database import StorageBackend, get_database
+from ..n8n_client import N8NClient, N8NUnavailableError, get_n8n_client, execution_record_from_n8n
+from ..execution_writer import ExecutionWriter, get_execution_writer
+from ..sync import WorkflowSyncEngine
+from ..scheduler import SyncScheduler, get_sync_scheduler
+from ..serialization import FastJSONResponse
 
 router = APIRouter(prefix="/api/workflows", tags=["workflows"])
 
-def get_database():
-    return Database()
+# Cada etiqueta de If-None-Match sin el prefijo W/ (las comillas son parte de la etiqueta)
+ETAG_PATTERN = re.compile(r'(?:W/)?("[^"]*")')
 
-def get_n8n_client():
-    return N8NClient()
+# Lotes en curso: el event loop sólo guarda referencias débiles a las tareas
+_running_batches: Set[asyncio.Task] = set()
+
+async def wait_for_batches():
+    """Esperar los lotes en curso (al apagar la app, antes de cerrar la base)"""
+    if _running_batches:
+        await asyncio.gather(*_running_batches, return_exceptions=True)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparación débil de If-None-Match (lista separada por comas, * o etiquetas W/)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return any(tag == opaque for tag in ETAG_PATTERN.findall(if_none_match))
+
+def n8n_unavailable(error: N8NUnavailableError) -> HTTPException:
+    """503 con Retry-After cuando N8N está caído o su circuito abierto"""
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(max(1, math.ceil(error.retry_after)))}
+    )
 
 @router.get("/", response_model=List[Workflow])
 async def get_workflows(
+    request: Request,
     category: Optional[str] = None,
     status: Optional[str] = None,
-    db: Database = Depends(get_database)
+    db: StorageBackend = Depends(get_database)
 ):
     """Obtener todos los workflows con filtros opcionales"""
-    workflows = db.get_workflows()
+    category = category if category and category != "all" else None
+    status = status if status and status != "all" else None
     
-    # Aplicar filtros
-    if category and category != "all":
-        workflows = [w for w in workflows if w.category.lower() == category.lower()]
+    # ETag fuerte: versión de la tabla + filtros; si coincide no se consulta nada más
+    filters = hashlib.sha1(f"{(category or '').lower()}|{status or ''}".encode()).hexdigest()[:12]
+    version = db.get_table_version("workflows")
+    etag = f'"workflows-{version}-{filters}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
     
-    if status and status != "all":
-        workflows = [w for w in workflows if w.status == status]
-    
-    return workflows
+    # El ETag sale de la versión leída junto con las filas, no de la consultada arriba
+    version, body = db.get_workflows_json(category=category, status=status, version=version)
+    etag = f'"workflows-{version}-{filters}"'
+    return FastJSONResponse(body, headers={"ETag": etag, "Cache-Control": "no-cache"})
 
 @router.get("/stats", response_model=DashboardStats)
-async def get_dashboard_stats(db: Database = Depends(get_database)):
+async def get_dashboard_stats(db: StorageBackend = Depends(get_database)):
     """Obtener estadísticas del dashboard"""
     return db.get_dashboard_stats()
 
+@router.get("/{workflow_id}/analytics", response_model=WorkflowAnalytics)
+async def get_workflow_analytics(workflow_id: str, db: StorageBackend = Depends(get_database)):
+    """Percentiles de duración (p50/p95/p99), tasa de error y throughput del workflow
+    
+    Acumulado y por ventana (1h, 24h, 7d, 30d). Se leen de sketches y
+    contadores que se actualizan con cada ejecución, sin recorrer executions.
+    """
+    analytics = db.get_workflow_analytics(workflow_id)
+    if analytics is None:
+        raise HTTPException(status_code=404, detail=f"Workflow {workflow_id} no encontrado")
+    return analytics
+
+@router.post("/execute/batch")
+async def execute_workflows_batch(
+    request: BatchExecutionRequest,
+    n8n_client: N8NClient = Depends(get_n8n_client),
+    db: StorageBackend = Depends(get_database)
+):
+    """Ejecutar varios workflows en paralelo, devolviendo cada resultado (NDJSON) al terminar"""
+    max_items = int(os.getenv("BATCH_EXECUTE_MAX_ITEMS", 1000))
+    max_parallelism = int(os.getenv("BATCH_EXECUTE_MAX_PARALLELISM", 10))
+    
+    if not request.items:
+        raise HTTPException(status_code=400, detail="El lote no contiene workflows")
+    if len(request.items) > max_items:
+        raise HTTPException(status_code=400, detail=f"El lote supera el máximo de {max_items} workflows")
+    
+    parallelism = max(1, min(request.parallelism or max_parallelism, max_parallelism))
+    workflows = db.resolve_workflows(item.workflow_id for item in request.items)
+    semaphore = asyncio.Semaphore(parallelism)
+    
+    async def run_item(index, item):
+        workflow = workflows.get(item.workflow_id)
+        if workflow is None:
+            return index, {"workflow_id": item.workflow_id, "success": False,
+                           "error": "Workflow no encontrado"}, None
+        
+        async with semaphore:
+            try:
+                result = await n8n_client.execute_workflow(
+                    workflow["n8n_id"] or workflow["id"], item.payload
+                )
+            except Exception as e:
+                return index, {"workflow_id": item.workflow_id, "success": False,
+                               "error": str(e)}, None
+        
+        data = result.get("data")
+        if not isinstance(data, dict) or data.get("id") is None:
+            return index, {"workflow_id": item.workflow_id, "success": False,
+                           "error": "Respuesta inválida de N8N"}, None
+        
+        record = execution_record_from_n8n(data, workflow, triggered_by="Batch")
+        return index, {"workflow_id": item.workflow_id, "success": record["status"] != "error",
+                       "execution_id": record["id"], "n8n_execution_id": record["n8n_execution_id"],
+                       "status": record["status"]}, record
+    
+    async def run_batch(lines: asyncio.Queue):
+        tasks = [asyncio.create_task(run_item(i, item)) for i, item in enumerate(request.items)]
+        records = []
+        succeeded = 0
+        recorded = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, line, record = await next_done
+                if record is not None:
+                    records.append(record)
+                succeeded += line["success"]
+                lines.put_nowait(json.dumps({"index": index, **line}) + "\n")
+            # Todas las ejecuciones del lote se registran con un único INSERT
+            recorded = await asyncio.to_thread(db.insert_executions, records)
+        except Exception as e:
+            print(f"Error guardando {len(records)} ejecuciones del lote: {e}")
+        finally:
+            lines.put_nowait(json.dumps({"summary": {
+                "total": len(request.items),
+                "succeeded": succeeded,
+                "failed": len(request.items) - succeeded,
+                "recorded": recorded
+            }}) + "\n")
+            lines.put_nowait(None)
+    
+    async def stream_results(lines: asyncio.Queue):
+        while True:
+            line = await lines.get()
+            if line is None:
+                break
+            yield line
+    
+    # El lote corre aparte de la respuesta: si el cliente se desconecta las
+    # ejecuciones ya pedidas a N8N terminan igual y quedan registradas
+    lines: asyncio.Queue = asyncio.Queue()
+    batch = asyncio.create_task(run_batch(lines))
+    _running_batches.add(batch)
+    batch.add_done_callback(_running_batches.discard)
+    
+    return StreamingResponse(stream_results(lines), media_type="application/x-ndjson")
+
 @router.post("/{workflow_id}/execute")
 async def execute_workflow(
     workflow_id: str,
     n8n_client: N8NClient = Depends(get_n8n_client),
-    db: Database = Depends(get_database)
+    db: StorageBackend = Depends(get_database),
+    writer: ExecutionWriter = Depends(get_execution_writer)
 ):
     """Ejecutar un workflow específico"""
     try:
+        workflow = db.resolve_workflows([workflow_id]).get(workflow_id)
+        
         # Ejecutar en N8N
-        result = n8n_client.execute_workflow(workflow_id)
+        n8n_workflow_id = (workflow["n8n_id"] or workflow["id"]) if workflow else workflow_id
+        result = await n8n_client.execute_workflow(n8n_workflow_id)
         
-        # Registrar la ejecución en la base de datos
-        # (Aquí podrías agregar lógica para guardar la ejecución)
+        # Registrar la ejecución en la base de datos (write-behind, por lotes)
+        data = result.get("data")
+        execution_id = data.get("id") if isinstance(data, dict) else None
+        if workflow and execution_id is not None:
+            await writer.submit(execution_record_from_n8n(data, workflow))
         
         return {
             "success": True,
             "message": f"Workflow {workflow_id} ejecutado correctamente",
-            "execution_id": result.get("data", {}).get("id"),
+            "execution_id": execution_id,
             "n8n_result": result
         }
+    except N8NUnavailableError as e:
+        raise n8n_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error ejecutando workflow: {str(e)}")
 
+@router.get("/{workflow_id}/definition")
+async def get_workflow_definition(
+    workflow_id: str,
+    n8n_client: N8NClient = Depends(get_n8n_client),
+    db: StorageBackend = Depends(get_database)
+):
+    """Definición completa del workflow en N8N (nodos y conexiones)
+    
+    Si el updatedAt de la última sincronización coincide con la copia guardada
+    se responde sin consultar N8N. El JSON sale tal como se guardó.
+    """
+    workflow = db.resolve_workflows([workflow_id]).get(workflow_id)
+    n8n_workflow_id = (workflow["n8n_id"] or workflow["id"]) if workflow else workflow_id
+    updated_at = workflow["n8n_updated_at"] if workflow else None
+    
+    try:
+        definition = await n8n_client.get_workflow_definition(n8n_workflow_id, updated_at)
+    except N8NUnavailableError as e:
+        raise n8n_unavailable(e)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            raise HTTPException(status_code=404, detail=f"Workflow {workflow_id} no existe en N8N")
+        raise HTTPException(status_code=502, detail=f"Error consultando N8N: {str(e)}")
+    
+    if definition is None:
+        raise HTTPException(status_code=404, detail=f"Workflow {workflow_id} no existe en N8N")
+    return Response(
+        content=definition["definition"],
+        media_type="application/json",
+        headers={"X-Definition-Source": definition["source"]}
+    )
+
 @router.patch("/{workflow_id}/activate")
 async def activate_workflow(
     workflow_id: str,
-    n8n_client: N8NClient = Depends(get_n8n_client)
+    n8n_client: N8NClient = Depends(get_n8n_client),
+    db: StorageBackend = Depends(get_database)
 ):
     """Activar un workflow"""
     try:
-        result = n8n_client.activate_workflow(workflow_id)
+        result = await n8n_client.activate_workflow(workflow_id)
+        db.set_workflow_status(workflow_id, "active")
         return {
             "success": True,
             "message": f"Workflow {workflow_id} activado",
             "result": result
         }
+    except N8NUnavailableError as e:
+        raise n8n_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error activando workflow: {str(e)}")
 
 @router.patch("/{workflow_id}/deactivate")
 async def deactivate_workflow(
     workflow_id: str,
-    n8n_client: N8NClient = Depends(get_n8n_client)
+    n8n_client: N8NClient = Depends(get_n8n_client),
+    db: StorageBackend = Depends(get_database)
 ):
     """Desactivar un workflow"""
     try:
-        result = n8n_client.deactivate_workflow(workflow_id)
+        result = await n8n_client.deactivate_workflow(workflow_id)
+        db.set_workflow_status(workflow_id, "inactive")
         return {
             "success": True,
             "message": f"Workflow {workflow_id} desactivado",
             "result": result
         }
+    except N8NUnavailableError as e:
+        raise n8n_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error desactivando workflow: {str(e)}")
 
+@router.get("/n8n/status")
+async def get_n8n_status(n8n_client: N8NClient = Depends(get_n8n_client)):
+    """Estado del circuito hacia N8N y de los datos de respaldo"""
+    return n8n_client.status()
+
+@router.get("/sync/status")
+async def get_sync_status(scheduler: SyncScheduler = Depends(get_sync_scheduler)):
+    """Estado de la sincronización periódica (última ejecución y próxima)"""
+    return scheduler.status()
+
 @router.get("/sync")
 async def sync_with_n8n(
     n8n_client: N8NClient = Depends(get_n8n_client),
-    db: Database = Depends(get_database)
+    db: StorageBackend = Depends(get_database)
 ):
-    """Sincronizar workflows con N8N"""
+    """Sincronizar workflows con N8N (sólo se guardan los que cambiaron)"""
     try:
-        n8n_workflows = n8n_client.get_workflows()
-        
-        # Aquí podrías agregar lógica para sincronizar con la base de datos
-        # Por ejemplo, actualizar estados, crear nuevos workflows, etc.
+        summary = await WorkflowSyncEngine(db, n8n_client).run()
         
         return {
             "success": True,
-            "message": f"Sincronizados {len(n8n_workflows)} workflows",
-            "workflows": [w.dict() for w in n8n_workflows]
+            "message": f"Sincronizados {summary['created'] + summary['updated']} de {summary['fetched']} workflows",
+            "summary": summary
         }
+    except N8NUnavailableError as e:
+        raise n8n_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error sincronizando: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,119 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+from .database import StorageBackend, get_database
+from .n8n_client import N8NClient, get_n8n_client
+from .sync import WorkflowSyncEngine, ExecutionSyncEngine
+
+def _timestamp(value: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(value).isoformat() if value else None
+
+class SyncScheduler:
+    """Sincronización periódica con N8N; un lease en SQLite asegura un solo worker activo"""
+    
+    LEASE_NAME = "n8n-sync"
+    
+    def __init__(self, db: StorageBackend, n8n_client: N8NClient, interval: float = 300,
+                 lease_ttl: Optional[float] = None):
+        self.db = db
+        self.n8n_client = n8n_client
+        self.interval = interval
+        # El lease sobrevive a una ejecución lenta, pero caduca si el worker muere
+        self.lease_ttl = lease_ttl or interval * 2
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._task: Optional[asyncio.Task] = None
+        
+        self.is_leader = False
+        self.last_run_started_at: Optional[float] = None
+        self.last_run_finished_at: Optional[float] = None
+        self.last_run_duration: Optional[float] = None
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+        self.next_run_at: Optional[float] = None
+    
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+    
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+    
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self.is_leader:
+            await asyncio.to_thread(self.db.release_lease, self.LEASE_NAME, self.owner)
+            self.is_leader = False
+    
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Error en la sincronización periódica: {e}")
+            self.next_run_at = time.time() + self.interval
+            await asyncio.sleep(self.interval)
+    
+    async def run_once(self) -> bool:
+        """Sincronizar si este proceso tiene el lease; devuelve si se ejecutó"""
+        self.is_leader = await asyncio.to_thread(
+            self.db.try_acquire_lease, self.LEASE_NAME, self.owner, self.lease_ttl
+        )
+        if not self.is_leader:
+            return False
+        
+        self.last_run_started_at = time.time()
+        try:
+            workflows = await WorkflowSyncEngine(self.db, self.n8n_client).run()
+            executions = await ExecutionSyncEngine(self.db, self.n8n_client).run()
+            self.last_result = {"workflows": workflows, "executions": executions}
+            self.last_error = None
+        finally:
+            self.last_run_finished_at = time.time()
+            self.last_run_duration = self.last_run_finished_at - self.last_run_started_at
+        return True
+    
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "interval_seconds": self.interval,
+            "owner": self.owner,
+            "is_leader": self.is_leader,
+            "last_run_started_at": _timestamp(self.last_run_started_at),
+            "last_run_finished_at": _timestamp(self.last_run_finished_at),
+            "last_run_duration_seconds": self.last_run_duration,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+            "next_run_at": _timestamp(self.next_run_at),
+        }
+
+_sync_scheduler: Optional[SyncScheduler] = None
+
+def get_sync_scheduler() -> SyncScheduler:
+    """Scheduler compartido por todo el proceso"""
+    global _sync_scheduler
+    if _sync_scheduler is None:
+        _sync_scheduler = SyncScheduler(
+            get_database(),
+            get_n8n_client(),
+            interval=float(os.getenv("SYNC_INTERVAL_SECONDS", 300))
+        )
+    return _sync_scheduler
+
+async def close_sync_scheduler():
+    global _sync_scheduler
+    if _sync_scheduler is not None:
+        await _sync_scheduler.stop()
+        _sync_scheduler = None
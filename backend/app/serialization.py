@@ -0,0 +1,98 @@
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Sequence
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from .models import Workflow, Execution
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa json de la biblioteca estándar
+    orjson = None
+
+# Campos en el orden en que pydantic los serializa (el mismo esquema que response_model)
+EXECUTION_FIELDS = tuple(Execution.model_fields)
+WORKFLOW_FIELDS = tuple(Workflow.model_fields)
+
+_EXECUTION_LIST = TypeAdapter(List[Execution])
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} no es serializable a JSON")
+
+def dumps(value: Any) -> bytes:
+    """JSON compacto en UTF-8, como JSONResponse pero con orjson si está instalado"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"),
+                      default=_default).encode("utf-8")
+
+def loads(data: bytes) -> Any:
+    """Inverso de dumps"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps_lines(items: Iterable[Any]) -> bytes:
+    """Un documento JSON por línea (NDJSON), cada línea terminada en \\n"""
+    if orjson is not None:
+        return b"".join(orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE) for item in items)
+    return b"".join(dumps(item) + b"\n" for item in items)
+
+def _datetime(value: Any) -> Any:
+    """Fecha tal como la escribe pydantic; en SQLite casi siempre ya viene en ese formato"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        if len(value) in (19, 26) and value[10] == "T":
+            return value
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None and value.utcoffset() == timedelta(0):
+        # pydantic escribe UTC como Z (p.ej. los createdAt de N8N); orjson e isoformat, +00:00
+        return value.isoformat().replace("+00:00", "Z")
+    return value
+
+def execution_items(rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Filas de executions (tuplas en el orden de EXECUTION_FIELDS) como dicts listos para JSON"""
+    items = []
+    for row in rows:
+        item = dict(zip(EXECUTION_FIELDS, row))
+        item["start_time"] = _datetime(item["start_time"])
+        item["end_time"] = _datetime(item["end_time"])
+        items.append(item)
+    return items
+
+def encode_executions(rows: Iterable[Sequence[Any]]) -> bytes:
+    """Filas de executions (tuplas en el orden de EXECUTION_FIELDS) directo a JSON, sin modelos
+    
+    Los REAL de SQLite y los double de PostgreSQL ya llegan como float: sólo
+    las fechas guardadas como texto pueden necesitar conversión.
+    """
+    return dumps(execution_items(rows))
+
+def encode_execution_models(executions: List[Execution]) -> bytes:
+    """Camino normal (modelos ya construidos, p.ej. con archivados)"""
+    return _EXECUTION_LIST.dump_json(executions)
+
+def encode_workflows(rows: Iterable[Sequence[Any]]) -> bytes:
+    """Filas de workflows (tuplas en el orden de WORKFLOW_FIELDS) directo a JSON"""
+    items = []
+    for row in rows:
+        item = dict(zip(WORKFLOW_FIELDS, row))
+        for field in ("created_at", "updated_at", "last_execution"):
+            item[field] = _datetime(item[field])
+        item["triggers"] = json.loads(item["triggers"])
+        item["actions"] = json.loads(item["actions"])
+        items.append(item)
+    return dumps(items)
+
+class FastJSONResponse(Response):
+    """Respuesta JSON que acepta bytes ya codificados (sin volver a validar con response_model)"""
+    
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
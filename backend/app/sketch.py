@@ -0,0 +1,166 @@
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from .serialization import dumps, loads
+
+# Valores por debajo de este umbral (duraciones de 0 ms) van a un contador aparte
+MIN_INDEXABLE_VALUE = 1e-9
+
+class DDSketch:
+    """Cuantiles con error relativo acotado (DDSketch)
+    
+    Cada valor cae en el bin k = ceil(log_gamma(valor)) con
+    gamma = (1 + a) / (1 - a); el cuantil estimado queda a menos de a
+    (relative_accuracy) del valor real. Dos sketches con la misma precisión
+    se combinan sumando sus bins, así que los de cada hora o día se pueden
+    juntar para cualquier ventana. Con más de max_bins se unen los bins más
+    bajos: pierden precisión los percentiles chicos, no p95/p99.
+    """
+    
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy debe estar entre 0 y 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+    
+    def key(self, value: float) -> int:
+        """Bin de un valor positivo"""
+        return math.ceil(math.log(value) / self._log_gamma)
+    
+    def add(self, value: float, count: int = 1):
+        if value > MIN_INDEXABLE_VALUE:
+            key = self.key(value)
+            self.bins[key] = self.bins.get(key, 0) + count
+        else:
+            self.zero_count += count
+        self.count += count
+        self.sum += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self._collapse()
+    
+    def add_bin(self, key: Optional[int], count: int, total: float, low: float, high: float):
+        """Sumar un bin ya agregado (p.ej. un GROUP BY en SQL); key None = ceros"""
+        if key is None:
+            self.zero_count += count
+        else:
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.count += count
+        self.sum += total
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+        self._collapse()
+    
+    def merge(self, other: "DDSketch"):
+        if other.gamma != self.gamma:
+            raise ValueError("No se pueden combinar sketches con distinta precisión")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._collapse()
+    
+    def _collapse(self):
+        if len(self.bins) <= self.max_bins:
+            return
+        keys = sorted(self.bins)
+        excess = len(keys) - self.max_bins
+        target = keys[excess]
+        for key in keys[:excess]:
+            self.bins[target] += self.bins.pop(key)
+    
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Valor estimado del cuantil q (0..1); None si el sketch está vacío"""
+        return self.quantiles([q])[0]
+    
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """Varios cuantiles recorriendo los bins una sola vez"""
+        if not self.count:
+            return [None] * len(qs)
+        
+        results: Dict[float, float] = {}
+        pending = sorted(q for q in set(qs) if 0 < q < 1)
+        for q in qs:
+            if q <= 0:
+                results[q] = self.min
+            elif q >= 1:
+                results[q] = self.max
+        
+        # rank < count: el recorrido siempre termina dentro de los bins
+        seen = self.zero_count
+        key = None
+        bins = iter(sorted(self.bins.items()))
+        for q in pending:
+            rank = q * (self.count - 1)
+            while seen <= rank:
+                key, count = next(bins)
+                seen += count
+            if key is None:
+                results[q] = max(0.0, self.min)
+            else:
+                # Punto medio del bin en escala relativa: error <= relative_accuracy
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                results[q] = min(max(value, self.min), self.max)
+        return [results[q] for q in qs]
+    
+    def to_bytes(self) -> bytes:
+        keys = sorted(self.bins)
+        return dumps({
+            "a": self.relative_accuracy,
+            "n": self.count,
+            "z": self.zero_count,
+            "s": self.sum,
+            "lo": self.min if self.count else None,
+            "hi": self.max if self.count else None,
+            "k": keys,
+            "c": [self.bins[key] for key in keys],
+        })
+    
+    @classmethod
+    def from_bytes(cls, data: bytes, max_bins: int = 2048) -> "DDSketch":
+        raw = loads(data)
+        sketch = cls(raw["a"], max_bins=max_bins)
+        sketch.bins = dict(zip(raw["k"], raw["c"]))
+        sketch.zero_count = raw["z"]
+        sketch.count = raw["n"]
+        sketch.sum = raw["s"]
+        if sketch.count:
+            sketch.min, sketch.max = raw["lo"], raw["hi"]
+        return sketch
+
+def merge_sketches(blobs: Iterable[bytes], relative_accuracy: float = 0.01) -> DDSketch:
+    """Un sketch con todos los serializados dados (vacío si no hay ninguno)"""
+    merged = DDSketch(relative_accuracy)
+    for blob in blobs:
+        merged.merge(DDSketch.from_bytes(blob))
+    return merged
+
+def summarize_sketch(sketch: DDSketch, quantiles: Tuple[float, ...] = (0.5, 0.95, 0.99)
+                     ) -> Dict[str, Optional[float]]:
+    """count, mean, min, max y los percentiles pedidos (p50, p95, ...) redondeados a 0.1"""
+    def rounded(value: Optional[float]) -> Optional[float]:
+        return round(value, 1) if value is not None else None
+    
+    summary = {
+        "count": sketch.count,
+        "mean": rounded(sketch.mean),
+        "min": rounded(sketch.min) if sketch.count else None,
+        "max": rounded(sketch.max) if sketch.count else None,
+    }
+    for q, value in zip(quantiles, sketch.quantiles(quantiles)):
+        summary[f"p{round(q * 100):d}"] = rounded(value)
+    return summary
@@ -0,0 +1,110 @@
+import asyncio
+import json
+from typing import Any, Dict, List
+from .database import StorageBackend
+from .models import N8NWorkflowSummary
+from .n8n_client import N8NClient, execution_record_from_n8n
+
+# Tipos de nodo que inician un workflow en N8N
+TRIGGER_NODE_HINTS = ("trigger", "webhook", "cron", "schedule")
+
+def workflow_row_from_n8n(workflow: N8NWorkflowSummary) -> Dict[str, Any]:
+    """Fila de la tabla workflows a partir del resumen de un workflow de N8N"""
+    n8n_id = workflow.id
+    triggers: List[str] = []
+    actions: List[str] = []
+    for node in workflow.nodes:
+        node_type = node.type.lower()
+        name = node.name or node_type
+        if any(hint in node_type for hint in TRIGGER_NODE_HINTS):
+            triggers.append(name)
+        else:
+            actions.append(name)
+    
+    return {
+        "id": f"n8n-{n8n_id}",
+        "n8n_id": n8n_id,
+        "name": workflow.name or f"Workflow {n8n_id}",
+        "status": "active" if workflow.active else "inactive",
+        "created_at": workflow.createdAt,
+        "triggers": json.dumps(triggers),
+        "actions": json.dumps(actions),
+        "n8n_updated_at": workflow.updatedAt,
+    }
+
+class WorkflowSyncEngine:
+    """Sincronización incremental N8N -> SQLite basada en marcas updatedAt"""
+    
+    def __init__(self, db: StorageBackend, n8n_client: N8NClient, page_size: int = 100):
+        self.db = db
+        self.n8n_client = n8n_client
+        self.page_size = page_size
+    
+    async def run(self) -> Dict[str, int]:
+        """Traer los workflows página a página y guardar sólo los que cambiaron"""
+        watermarks = await asyncio.to_thread(self.db.get_workflow_watermarks)
+        summary = {"fetched": 0, "created": 0, "updated": 0, "unchanged": 0}
+        
+        async for page in self.n8n_client.iter_workflow_pages(self.page_size):
+            changed = []
+            for workflow in page:
+                if workflow.id is None:
+                    continue
+                summary["fetched"] += 1
+                
+                if workflow.id not in watermarks:
+                    summary["created"] += 1
+                elif watermarks[workflow.id] != workflow.updatedAt:
+                    summary["updated"] += 1
+                else:
+                    summary["unchanged"] += 1
+                    continue
+                
+                changed.append(workflow_row_from_n8n(workflow))
+                watermarks[workflow.id] = workflow.updatedAt
+            
+            # Una transacción por página; el resto de la página se descarta
+            if changed:
+                await asyncio.to_thread(self.db.upsert_workflows, changed)
+        
+        return summary
+
+class ExecutionSyncEngine:
+    """Importar ejecuciones nuevas de N8N; se detiene en la primera página ya conocida"""
+    
+    def __init__(self, db: StorageBackend, n8n_client: N8NClient, page_size: int = 100):
+        self.db = db
+        self.n8n_client = n8n_client
+        self.page_size = page_size
+    
+    async def run(self) -> Dict[str, int]:
+        summary = {"fetched": 0, "imported": 0}
+        
+        async for page in self.n8n_client.iter_execution_pages(self.page_size):
+            page = [data for data in page if data.get("id") is not None]
+            summary["fetched"] += len(page)
+            
+            known = await asyncio.to_thread(
+                self.db.get_known_n8n_execution_ids, [str(data["id"]) for data in page]
+            )
+            new = [data for data in page if str(data["id"]) not in known]
+            if not new:
+                break
+            
+            workflows = await asyncio.to_thread(
+                self.db.resolve_workflows, {str(data.get("workflowId")) for data in new}
+            )
+            records = [
+                execution_record_from_n8n(
+                    data, workflows[str(data.get("workflowId"))],
+                    triggered_by=(data.get("mode") or "n8n").capitalize()
+                )
+                for data in new if str(data.get("workflowId")) in workflows
+            ]
+            summary["imported"] += await asyncio.to_thread(self.db.insert_executions, records)
+            
+            # Vienen de más reciente a más antigua: si ya hubo conocidas, lo demás también lo es
+            if len(new) < len(page):
+                break
+        
+        return summary
@@ -0,0 +1,277 @@
+import asyncio
+import contextlib
+import hmac
+import os
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from .database import StorageBackend, get_database, to_local_naive
+from .execution_writer import ExecutionWriter
+from .models import ExecutionEvent
+from .serialization import dumps_lines, loads
+
+class IdempotencyKeys:
+    """Claves de eventos ya aceptados, vigentes durante ttl segundos y con tope de entradas"""
+    
+    def __init__(self, ttl: float = 86400.0, max_keys: int = 200000):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        # Con ttl fijo el orden de inserción es también el de vencimiento
+        self._keys: "OrderedDict[str, float]" = OrderedDict()
+    
+    def __contains__(self, key: str) -> bool:
+        expires_at = self._keys.get(key)
+        return expires_at is not None and expires_at > time.monotonic()
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def add(self, key: str):
+        now = time.monotonic()
+        while self._keys:
+            oldest, expires_at = next(iter(self._keys.items()))
+            if expires_at > now and len(self._keys) < self.max_keys:
+                break
+            del self._keys[oldest]
+        self._keys[key] = now + self.ttl
+        self._keys.move_to_end(key)
+    
+    def discard(self, key: str):
+        self._keys.pop(key, None)
+
+def event_key(event: ExecutionEvent, request_key: Optional[str] = None,
+              index: Optional[int] = None) -> str:
+    """Clave de idempotencia: la del evento, la del header (por posición) o ejecución + estado"""
+    if event.idempotency_key:
+        return event.idempotency_key
+    if request_key:
+        return request_key if index is None else f"{request_key}:{index}"
+    return f"{event.execution_id}:{event.status.value}"
+
+def event_record(event: ExecutionEvent, received_at: datetime) -> Dict[str, Any]:
+    """Fila de executions para un evento; workflow_id queda como vino hasta resolverlo"""
+    status = event.status.value
+    finished = status in ("success", "error")
+    started_at = to_local_naive(event.started_at) if event.started_at else None
+    end_time = to_local_naive(event.stopped_at) if event.stopped_at else None
+    if end_time is None and finished:
+        end_time = received_at
+    # Un fin sin inicio conocido se registra con inicio = fin y sin duración
+    start_time = started_at or end_time or received_at
+    
+    return {
+        "id": f"exec-{uuid.uuid4().hex[:12]}",
+        "workflow_id": event.workflow_id,
+        "workflow_name": None,
+        "n8n_execution_id": event.execution_id,
+        "status": status,
+        "start_time": start_time.isoformat(),
+        "end_time": end_time.isoformat() if end_time else None,
+        "duration": (end_time - started_at).total_seconds() * 1000 if started_at and end_time else None,
+        "triggered_by": event.triggered_by,
+        "data_processed": event.data_processed,
+        "error_message": event.error_message if status == "error" else None,
+    }
+
+def coalesce_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Una fila por ejecución dentro del lote: inicio y fin que llegan juntos se insertan ya terminados"""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        key = record["n8n_execution_id"]
+        current = merged.get(key)
+        if current is None:
+            merged[key] = record
+            continue
+        if current["status"] in ("success", "error") or record["status"] == current["status"]:
+            continue
+        
+        record = {**record, "data_processed": record["data_processed"] or current["data_processed"]}
+        if record["duration"] is None:
+            # El evento no trajo started_at: vale el inicio que ya estaba en el lote
+            record["start_time"] = current["start_time"]
+            if record["end_time"]:
+                start_time = datetime.fromisoformat(current["start_time"])
+                end_time = datetime.fromisoformat(record["end_time"])
+                record["duration"] = (end_time - start_time).total_seconds() * 1000
+        merged[key] = record
+    return list(merged.values())
+
+def read_spool(path: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """Lotes guardados por spool_batch; una línea cortada por un apagado brusco se ignora"""
+    items = []
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                key, record = loads(line)
+            except ValueError:
+                continue
+            items.append((key, record))
+    return items
+
+def spool_batch(path: str, batch: List[Tuple[str, Dict[str, Any]]]):
+    """Agregar un lote al spool en disco (una línea [clave, fila] por evento)"""
+    with open(path, "ab") as f:
+        f.write(dumps_lines([key, record] for key, record in batch))
+        f.flush()
+        os.fsync(f.fileno())
+
+class ExecutionEventWriter(ExecutionWriter):
+    """Ingesta del webhook de N8N: descarta repetidos, encola y guarda en micro-lotes
+    
+    La respuesta sale apenas el evento entra en la cola; el consumidor resuelve
+    los workflows y llama a record_execution_events una vez por lote. Las
+    claves de idempotencia viven en memoria: si un evento repetido llega
+    después de ttl o tras un reinicio, la base igual lo ignora.
+    
+    N8N ya recibió el 202, así que no va a reintentar: un lote que no se pudo
+    guardar se reintenta write_attempts veces con espera creciente y, si la
+    base sigue fallando, queda en spool_path hasta el próximo arranque.
+    """
+    
+    def __init__(self, db: StorageBackend, idempotency_ttl: float = 86400.0,
+                 idempotency_max_keys: int = 200000, write_attempts: int = 5,
+                 retry_delay: float = 0.5, spool_path: Optional[str] = None, **kwargs):
+        super().__init__(db, **kwargs)
+        self.keys = IdempotencyKeys(idempotency_ttl, idempotency_max_keys)
+        self.write_attempts = max(1, write_attempts)
+        self.retry_delay = retry_delay
+        self.spool_path = spool_path
+        self._replay_task: Optional[asyncio.Task] = None
+        self.totals = {"accepted": 0, "duplicate": 0, "rejected": 0, "unknown_workflow": 0,
+                       "spooled": 0}
+    
+    def start(self):
+        """Arrancar el consumidor y reintentar lo que quedó en el spool"""
+        super().start()
+        if self.spool_path and self._replay_task is None:
+            self._replay_task = asyncio.create_task(self._replay_spool())
+    
+    async def stop(self):
+        """Terminar de reponer el spool, escribir lo pendiente y detener el consumidor"""
+        if self._replay_task is not None:
+            await self._replay_task
+            self._replay_task = None
+        await super().stop()
+    
+    def accept(self, events: List[ExecutionEvent],
+               request_key: Optional[str] = None) -> Optional[Tuple[int, int]]:
+        """Encolar los eventos nuevos; (aceptados, repetidos) o None si la cola está llena"""
+        received_at = datetime.now()
+        single = len(events) == 1
+        items = []
+        keys = set()
+        for index, event in enumerate(events):
+            key = event_key(event, request_key, None if single else index)
+            if key in keys or key in self.keys:
+                continue
+            keys.add(key)
+            items.append((key, event_record(event, received_at)))
+        
+        duplicates = len(events) - len(items)
+        if not self.try_submit_many(items):
+            self.totals["rejected"] += len(items)
+            return None
+        for key in keys:
+            self.keys.add(key)
+        self.totals["accepted"] += len(items)
+        self.totals["duplicate"] += duplicates
+        return len(items), duplicates
+    
+    async def _flush(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        delay = self.retry_delay
+        for attempt in range(1, self.write_attempts + 1):
+            try:
+                self.written += await asyncio.to_thread(self._write, batch)
+                return
+            except Exception as e:
+                print(f"Error guardando {len(batch)} eventos del webhook "
+                      f"(intento {attempt} de {self.write_attempts}): {e}")
+            if attempt < self.write_attempts:
+                await asyncio.sleep(delay)
+                delay *= 2
+        
+        self.failed += len(batch)
+        self._on_failed(batch)
+    
+    def _write(self, batch: List[Tuple[str, Dict[str, Any]]]) -> int:
+        workflows = self.db.resolve_workflows({record["workflow_id"] for _, record in batch})
+        records = []
+        unknown = 0
+        for _, record in batch:
+            workflow = workflows.get(record["workflow_id"])
+            if workflow is None:
+                unknown += 1
+                continue
+            records.append({**record, "workflow_id": workflow["id"], "workflow_name": workflow["name"]})
+        
+        inserted, updated = self.db.record_execution_events(coalesce_records(records))
+        # Se cuenta recién con el lote guardado: un reintento no los suma dos veces
+        self.totals["unknown_workflow"] += unknown
+        return inserted + updated
+    
+    def _on_failed(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        if self.spool_path:
+            try:
+                spool_batch(self.spool_path, batch)
+                self.totals["spooled"] += len(batch)
+                return
+            except OSError as e:
+                print(f"Error guardando {len(batch)} eventos en {self.spool_path}: {e}")
+        # Sin spool el lote se pierde: al menos que un reenvío no se descarte como repetido
+        for key, _ in batch:
+            self.keys.discard(key)
+    
+    async def _replay_spool(self):
+        # Se renombra antes de leer: lo que vuelva a fallar se agrega a un spool nuevo
+        replaying = f"{self.spool_path}.replay"
+        try:
+            if not os.path.exists(replaying):
+                os.replace(self.spool_path, replaying)
+            items = await asyncio.to_thread(read_spool, replaying)
+        except FileNotFoundError:
+            return
+        
+        if items:
+            print(f"Reintentando {len(items)} eventos del webhook guardados en {self.spool_path}")
+        # record_execution_events ignora lo que ya estaba: repetir un lote no duplica filas
+        for start in range(0, len(items), self.max_batch_size):
+            await self._flush(items[start:start + self.max_batch_size])
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(replaying)
+
+def verify_webhook_secret(provided: Optional[str]) -> bool:
+    """Comparar el header contra N8N_WEBHOOK_SECRET; sin secreto configurado no se acepta nada"""
+    secret = os.getenv("N8N_WEBHOOK_SECRET", "")
+    if not secret or provided is None:
+        return False
+    return hmac.compare_digest(provided.encode(), secret.encode())
+
+_webhook_writer: Optional[ExecutionEventWriter] = None
+
+def get_webhook_writer() -> ExecutionEventWriter:
+    """Ingesta del webhook compartida por todo el proceso"""
+    global _webhook_writer
+    if _webhook_writer is None:
+        _webhook_writer = ExecutionEventWriter(
+            get_database(),
+            idempotency_ttl=float(os.getenv("WEBHOOK_IDEMPOTENCY_TTL_SECONDS", 86400)),
+            idempotency_max_keys=int(os.getenv("WEBHOOK_IDEMPOTENCY_MAX_KEYS", 200000)),
+            max_batch_size=int(os.getenv("WEBHOOK_BATCH_SIZE", 1000)),
+            flush_interval=float(os.getenv("WEBHOOK_FLUSH_INTERVAL", 0.2)),
+            max_queue_size=int(os.getenv("WEBHOOK_QUEUE_SIZE", 50000)),
+            write_attempts=int(os.getenv("WEBHOOK_WRITE_ATTEMPTS", 5)),
+            retry_delay=float(os.getenv("WEBHOOK_RETRY_DELAY", 0.5)),
+            spool_path=os.getenv("WEBHOOK_SPOOL_PATH", "./webhook_spool.ndjson") or None
+        )
+        if not os.getenv("N8N_WEBHOOK_SECRET"):
+            print("N8N_WEBHOOK_SECRET no está configurado: el webhook de ejecuciones responde 401")
+    return _webhook_writer
+
+async def close_webhook_writer():
+    """Guardar los eventos pendientes al apagar la app"""
+    global _webhook_writer
+    if _webhook_writer is not None:
+        await _webhook_writer.stop()
+        _webhook_writer = None
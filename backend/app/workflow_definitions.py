@@ -0,0 +1,66 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from .database import StorageBackend
+
+class WorkflowDefinitionCache:
+    """Definiciones completas de workflows de N8N, identificadas por (id, updatedAt)
+    
+    Un LRU en memoria delante de la tabla n8n_workflow_definitions: tras un
+    reinicio en frío se leen de la base en vez de volver a descargarlas. El
+    JSON se guarda tal como llegó y sólo se valida cuando alguien lo pide.
+    """
+    
+    def __init__(self, db: StorageBackend, max_entries: int = 64):
+        self.db = db
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, n8n_id: str) -> Optional[Dict[str, Any]]:
+        """Última definición conocida (memoria y, si no está, la base)"""
+        with self._lock:
+            entry = self._entries.get(n8n_id)
+            if entry is not None:
+                self._entries.move_to_end(n8n_id)
+                self.hits += 1
+                return entry
+        
+        entry = self.db.get_workflow_definition(n8n_id)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(entry)
+        return entry
+    
+    def put(self, n8n_id: str, updated_at: Optional[str], definition: str,
+            etag: Optional[str] = None) -> Dict[str, Any]:
+        """Guardar una definición recién descargada"""
+        entry = {"n8n_id": n8n_id, "updated_at": updated_at, "etag": etag, "definition": definition}
+        self.db.save_workflow_definition(entry)
+        with self._lock:
+            self._remember(entry)
+        return entry
+    
+    def _remember(self, entry: Dict[str, Any]):
+        self._entries[entry["n8n_id"]] = entry
+        self._entries.move_to_end(entry["n8n_id"])
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Vaciar la memoria (lo persistido se conserva)"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
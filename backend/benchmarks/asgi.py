@@ -0,0 +1,76 @@
+"""Cliente ASGI mínimo para medir la app en proceso, sin red ni dependencias extra"""
+import asyncio
+import json
+from typing import Callable, Dict, Optional, Tuple
+
+
+async def request(app, method: str, path: str, query: str = "",
+                  headers: Optional[Dict[str, str]] = None, body: bytes = b"",
+                  on_chunk: Optional[Callable[[bytes], None]] = None
+                  ) -> Tuple[int, Dict[str, str], bytes]:
+    """Enviar una petición HTTP directamente a la app ASGI
+
+    Con on_chunk cada trozo del cuerpo se entrega a medida que llega en vez de
+    acumularse (el cuerpo devuelto queda vacío).
+    """
+    raw_headers = [(b"host", b"testserver")]
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode(), value.encode()))
+    if body:
+        raw_headers.append((b"content-length", str(len(body)).encode()))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": raw_headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+        "state": {},
+    }
+
+    sent = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # El cliente sólo "se desconecta" cuando la respuesta terminó
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    status = 0
+    response_headers: Dict[str, str] = {}
+    chunks = []
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for name, value in message.get("headers", []):
+                response_headers[name.decode()] = value.decode()
+        elif message["type"] == "http.response.body":
+            if on_chunk is not None:
+                on_chunk(message.get("body", b""))
+            else:
+                chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    return status, response_headers, b"".join(chunks)
+
+
+async def request_json(app, method: str, path: str, query: str = "", payload=None):
+    """Atajo para peticiones con cuerpo JSON"""
+    body = json.dumps(payload).encode() if payload is not None else b""
+    headers = {"content-type": "application/json"} if payload is not None else None
+    return await request(app, method, path, query=query, headers=headers, body=body)
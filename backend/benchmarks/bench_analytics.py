@@ -0,0 +1,132 @@
+"""
+Analytics por workflow: sketches precalculados contra recorrer las ejecuciones.
+
+Carga ejecuciones a través del contrato StorageBackend (insert_executions
+mantiene los sketches en la misma transacción) y mide por backend:
+  - filas/s insertadas con y sin la actualización de sketches
+  - latencia p50/p99 de get_workflow_analytics (sin cache)
+  - latencia de calcular lo mismo leyendo y ordenando las duraciones crudas
+    (iter_executions), como se haría sin sketches
+  - error relativo de p50/p95/p99 del sketch frente al valor exacto
+
+Uso (desde backend/):
+    python -m benchmarks.bench_analytics --executions 200000
+    python -m benchmarks.bench_analytics --database-url postgresql://postgres@localhost/bench
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from app.database import ANALYTICS_WINDOWS, create_database
+from app.serialization import EXECUTION_FIELDS
+from .bench_storage import isolated_url, latency, make_executions, populate
+
+QUANTILES = (0.5, 0.95, 0.99)
+STATUS = EXECUTION_FIELDS.index("status")
+START_TIME = EXECUTION_FIELDS.index("start_time")
+DURATION = EXECUTION_FIELDS.index("duration")
+
+
+def exact_analytics(db, workflow_id: str) -> Dict[str, Dict[str, float]]:
+    """Percentiles exactos (acumulado y por ventana) ordenando las duraciones"""
+    now = datetime.now()
+    durations: Dict[str, List[float]] = {"all": []}
+    durations.update({name: [] for name in ANALYTICS_WINDOWS})
+    for batch in db.iter_executions(workflow_id=workflow_id, include_error=False):
+        for row in batch:
+            if row[DURATION] is None or row[STATUS] not in ("success", "error"):
+                continue
+            durations["all"].append(row[DURATION])
+            start_time = row[START_TIME]
+            if isinstance(start_time, str):
+                start_time = datetime.fromisoformat(start_time)
+            for name, (length, _, _) in ANALYTICS_WINDOWS.items():
+                if start_time >= now - length:
+                    durations[name].append(row[DURATION])
+
+    result = {}
+    for name, values in durations.items():
+        values.sort()
+        result[name] = {f"p{round(q * 100)}": values[int(q * (len(values) - 1))]
+                        for q in QUANTILES} if values else {}
+    return result
+
+
+def relative_errors(db, workflow_ids: List[str]) -> Dict[str, float]:
+    """Mayor error relativo del sketch acumulado por percentil"""
+    worst = {f"p{round(q * 100)}": 0.0 for q in QUANTILES}
+    for workflow_id in workflow_ids:
+        estimated = db.get_workflow_analytics(workflow_id).duration
+        exact = exact_analytics(db, workflow_id)["all"]
+        for name, value in exact.items():
+            if value:
+                worst[name] = max(worst[name], abs(getattr(estimated, name) - value) / value)
+    return {name: round(error, 5) for name, error in worst.items()}
+
+
+def insert_rate(db, pairs, batches: int, batch_size: int, seed: int) -> float:
+    payloads = [make_executions(random.Random(seed + b), pairs, batch_size, days=3)
+                for b in range(batches)]
+    start = time.perf_counter()
+    for batch in payloads:
+        db.insert_executions(batch)
+    return batches * batch_size / (time.perf_counter() - start)
+
+
+def run(url: str, args) -> dict:
+    url, cleanup = isolated_url(url)
+    db = create_database(url)
+    try:
+        pairs = populate(db, args.executions, args.workflows)
+        workflow_ids = [workflow_id for workflow_id, _ in pairs]
+
+        with_sketches = insert_rate(db, pairs, args.batches, args.batch_size, seed=1)
+        # Antes de insertar filas que no pasan por los sketches
+        errors = relative_errors(db, workflow_ids)
+        # Misma carga sin tocar los sketches, para ver cuánto cuestan
+        db._record_durations = lambda conn, executions: None
+        without_sketches = insert_rate(db, pairs, args.batches, args.batch_size, seed=2)
+        del db._record_durations
+
+        rng = random.Random(args.seed)
+        sketch_p50, sketch_p99 = latency(
+            lambda: db.get_workflow_analytics(rng.choice(workflow_ids)), args.repeat)
+        raw_p50, raw_p99 = latency(
+            lambda: exact_analytics(db, rng.choice(workflow_ids)), max(1, args.repeat // 20))
+
+        return {
+            "backend": type(db).__name__,
+            "executions": args.executions,
+            "workflows": args.workflows,
+            "insert_rows_per_s": {"with_sketches": round(with_sketches),
+                                  "without_sketches": round(without_sketches)},
+            "analytics_ms": {"sketch": {"p50": round(sketch_p50, 3), "p99": round(sketch_p99, 3)},
+                             "raw_sort": {"p50": round(raw_p50, 3), "p99": round(raw_p99, 3)}},
+            "speedup_p50": round(raw_p50 / sketch_p50, 1) if sketch_p50 else None,
+            "max_relative_error": errors,
+        }
+    finally:
+        db.close()
+        cleanup()
+
+
+def main(args):
+    results = [run(url, args) for url in (args.database_url or ["sqlite"])]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", action="append",
+                        help="Backend a medir (se puede repetir)")
+    parser.add_argument("--executions", type=int, default=100000)
+    parser.add_argument("--workflows", type=int, default=50)
+    parser.add_argument("--batches", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    main(parser.parse_args())
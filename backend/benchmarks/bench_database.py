@@ -0,0 +1,63 @@
+"""
+Benchmark del patrón de polling del dashboard contra la capa de base de datos.
+
+Compara una Database nueva por petición (comportamiento anterior: DDL, seed y
+conexiones nuevas en cada llamada) con la instancia compartida y su pool.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_database --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+# Mismos endpoints que consulta hooks/useWorkflows.ts
+POLLED_ENDPOINTS = [
+    ("/api/executions/", "limit=50"),
+    ("/api/workflows/stats", ""),
+    ("/api/workflows/", ""),
+    ("/api/executions/recent", "limit=10"),
+]
+
+
+async def run_mode(app, total_requests: int) -> float:
+    from .asgi import request
+
+    start = time.perf_counter()
+    for i in range(total_requests):
+        path, query = POLLED_ENDPOINTS[i % len(POLLED_ENDPOINTS)]
+        status, _, _ = await request(app, "GET", path, query=query)
+        assert status == 200, f"{path} devolvió {status}"
+    return total_requests / (time.perf_counter() - start)
+
+
+async def main(total_requests: int):
+    tmpdir = tempfile.mkdtemp(prefix="bench-db-")
+    db_path = os.path.join(tmpdir, "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["SEED_SAMPLE_DATA"] = "true"
+
+    from app.main import app
+    from app.database import Database, get_database
+
+    async with app.router.lifespan_context(app):
+        # Antes: una Database (y sus conexiones) por petición
+        app.dependency_overrides[get_database] = lambda: Database(db_path, pool_size=1)
+        before = await run_mode(app, total_requests)
+        app.dependency_overrides.clear()
+
+        # Después: instancia única con pool de conexiones
+        after = await run_mode(app, total_requests)
+
+    print(f"Database por petición : {before:10.1f} req/s")
+    print(f"Database compartida   : {after:10.1f} req/s")
+    print(f"Mejora                : {after / before:10.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,62 @@
+"""
+Benchmark del reparto de eventos SSE con muchos suscriptores inactivos.
+
+Crea N suscriptores (una tarea esperando en su cola, como cada conexión SSE),
+publica eventos y mide cuánto tarda cada evento en llegar a todos.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_events --subscribers 5000 --events 100
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+
+from app.events import EventBus
+
+
+async def main(subscribers: int, events: int):
+    bus = EventBus()
+    tracemalloc.start()
+    received = 0
+    all_received = asyncio.Event()
+
+    async def subscriber():
+        nonlocal received
+        queue = bus.subscribe()
+        while True:
+            await queue.get()
+            received += 1
+            if received == subscribers:
+                all_received.set()
+
+    tasks = [asyncio.create_task(subscriber()) for _ in range(subscribers)]
+    await asyncio.sleep(0)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    payload = {"stats": {"total_executions": 123456, "success_rate": 97.5}, "delta": {"executions": 1}}
+    latencies = []
+    for _ in range(events):
+        received = 0
+        all_received.clear()
+        start = time.perf_counter()
+        bus.publish("stats", payload)
+        await all_received.wait()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    for task in tasks:
+        task.cancel()
+
+    print(f"{subscribers} suscriptores, {memory / subscribers / 1024:.1f} KB por suscriptor")
+    print(f"reparto de un evento: p50 {statistics.median(latencies):.2f} ms, "
+          f"máx {max(latencies):.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.subscribers, args.events))
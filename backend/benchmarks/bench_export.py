@@ -0,0 +1,87 @@
+"""
+Benchmark de GET /api/executions/export (NDJSON, CSV y CSV en gzip).
+
+Descarga el historial completo por ASGI en proceso, contando los bytes a
+medida que llegan sin guardarlos, y reporta el tiempo hasta el primer byte,
+filas/s y MB enviados. En una pasada aparte mide el pico de memoria de Python
+(tracemalloc): con el export por lotes no debe crecer con la cantidad de filas.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_export --executions 1000000
+    python -m benchmarks.datagen --db /tmp/10m.db --scale 10m
+    python -m benchmarks.bench_export --db /tmp/10m.db --skip-memory
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+from app.database import Database, get_database
+from app.main import app
+from .asgi import request
+from .datagen import populate
+
+CASES = (
+    ("ndjson", "format=ndjson"),
+    ("csv", "format=csv"),
+    ("csv + gzip", "format=csv&compress=true"),
+)
+
+
+async def export(query: str):
+    received = {"bytes": 0, "first": None}
+    start = time.perf_counter()
+
+    def on_chunk(chunk: bytes):
+        if chunk and received["first"] is None:
+            received["first"] = time.perf_counter() - start
+        received["bytes"] += len(chunk)
+
+    status, _, _ = await request(app, "GET", "/api/executions/export", query=query,
+                                 on_chunk=on_chunk)
+    assert status == 200, status
+    return time.perf_counter() - start, received["first"], received["bytes"]
+
+
+def main(db_path: str, executions: int, skip_memory: bool):
+    db = Database(db_path)
+    with db.get_connection() as conn:
+        total = conn.execute("SELECT COUNT(*) FROM executions").fetchone()[0]
+    if total < executions:
+        print(f"Generando {executions - total} ejecuciones...")
+        populate(db, executions - total)
+        total = executions
+    app.dependency_overrides[get_database] = lambda: db
+
+    print(f"{total} ejecuciones")
+    print(f"{'formato':<12} {'1er byte ms':>12} {'total s':>8} {'filas/s':>10} {'MB':>8} "
+          f"{'pico MB':>8}")
+    for label, query in CASES:
+        elapsed, first, size = asyncio.run(export(query))
+        peak = None
+        if not skip_memory:
+            # Pasada aparte: tracemalloc distorsiona los tiempos
+            tracemalloc.start()
+            asyncio.run(export(query))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        peak_text = f"{peak / 1e6:8.1f}" if peak is not None else f"{'-':>8}"
+        print(f"{label:<12} {first * 1000:12.1f} {elapsed:8.1f} {total / elapsed:10.0f} "
+              f"{size / 1e6:8.1f} {peak_text}")
+
+    app.dependency_overrides.clear()
+    db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=None)
+    parser.add_argument("--executions", type=int, default=1_000_000)
+    parser.add_argument("--skip-memory", action="store_true",
+                        help="No medir el pico de memoria (la pasada con tracemalloc es lenta)")
+    args = parser.parse_args()
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="bench-export-"), "bench.db")
+    main(path, args.executions, args.skip_memory)
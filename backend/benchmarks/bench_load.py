@@ -0,0 +1,298 @@
+"""
+Prueba de carga del backend completo con tráfico mixto del dashboard.
+
+Por cada escala (10k, 1m, 10m ejecuciones) genera la base sintética una sola
+vez (se reutiliza desde --data-dir) y lanza un proceso aparte que:
+  - levanta app.main en proceso (lifespan completo) contra el stub de n8n
+  - sincroniza los workflows del stub para tener a qué llamar execute
+  - simula --clients dashboards en lazo cerrado con la mezcla de polling de
+    hooks/useWorkflows.ts (recientes cada 2 s, ejecuciones cada 3 s,
+    estadísticas cada 5 s, workflows cada 10 s) más execute y sync
+Reporta p50/p90/p99 y throughput por endpoint en JSON. Con --baseline compara
+contra un resultado anterior y termina con código 1 si algo empeoró más que
+--tolerance.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_load --scales 10k,1m --duration 30 --output load.json
+    python -m benchmarks.bench_load --scales 10k --baseline load.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from .datagen import SCALES
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (nombre, método, ruta, query, peso); los pesos de polling son las frecuencias
+# de hooks/useWorkflows.ts sin SSE, en peticiones cada 30 s
+POLLING_MIX = [
+    ("GET /api/executions/recent", "GET", "/api/executions/recent", "limit=10", 15.0),
+    ("GET /api/executions/", "GET", "/api/executions/", "limit=50", 10.0),
+    ("GET /api/workflows/stats", "GET", "/api/workflows/stats", "", 6.0),
+    ("GET /api/workflows/", "GET", "/api/workflows/", "", 3.0),
+]
+EXECUTE = "POST /api/workflows/{id}/execute"
+SYNC = "GET /api/workflows/sync"
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not ordered:
+        return 0.0
+    rank = math.ceil(q / 100 * len(ordered))
+    return ordered[min(len(ordered), max(1, rank)) - 1]
+
+
+def summarize(latencies: Dict[str, List[float]], errors: Dict[str, int], elapsed: float) -> Dict:
+    endpoints = {}
+    for name, values in sorted(latencies.items()):
+        ordered = sorted(values)
+        endpoints[name] = {
+            "requests": len(ordered),
+            "errors": errors.get(name, 0),
+            "throughput_rps": round(len(ordered) / elapsed, 1),
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+            "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+            "p90_ms": round(percentile(ordered, 90) * 1000, 3),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        }
+    everything = sorted(v for values in latencies.values() for v in values)
+    return {
+        "elapsed_seconds": round(elapsed, 2),
+        "total": {
+            "requests": len(everything),
+            "errors": sum(errors.values()),
+            "throughput_rps": round(len(everything) / elapsed, 1),
+            "p50_ms": round(percentile(everything, 50) * 1000, 3),
+            "p99_ms": round(percentile(everything, 99) * 1000, 3),
+        },
+        "endpoints": endpoints,
+    }
+
+
+# Proceso hijo: la app se importa recién aquí, con el entorno ya armado
+
+
+async def drive(app, args, workflow_ids: List[str]) -> Dict:
+    from .asgi import request
+
+    mix = list(POLLING_MIX)
+    polling_weight = sum(weight for *_, weight in mix)
+    # execute y sync se expresan como fracción del total de peticiones
+    other = args.execute_ratio + args.sync_ratio
+    scale = polling_weight / max(1e-9, 1 - other)
+    mix.append((EXECUTE, "POST", None, "", args.execute_ratio * scale))
+    mix.append((SYNC, "GET", "/api/workflows/sync", "", args.sync_ratio * scale))
+    weights = [entry[-1] for entry in mix]
+
+    latencies: Dict[str, List[float]] = {entry[0]: [] for entry in mix if entry[-1] > 0}
+    errors: Dict[str, int] = {}
+    measuring = False
+    deadline = time.perf_counter() + args.warmup + args.duration
+
+    async def client(seed: int):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            name, method, path, query, _ = rng.choices(mix, weights)[0]
+            if path is None:
+                path = f"/api/workflows/{rng.choice(workflow_ids)}/execute"
+            start = time.perf_counter()
+            status, _, _ = await request(app, method, path, query=query)
+            elapsed = time.perf_counter() - start
+            if measuring:
+                latencies[name].append(elapsed)
+                if status >= 400:
+                    errors[name] = errors.get(name, 0) + 1
+
+    tasks = [asyncio.create_task(client(args.seed + i)) for i in range(args.clients)]
+    await asyncio.sleep(args.warmup)
+    measuring = True
+    started = time.perf_counter()
+    await asyncio.gather(*tasks)
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run_child(args) -> Dict:
+    from .asgi import request
+    from .stub_n8n import StubN8N
+
+    with StubN8N(latency=args.n8n_latency, workflows=args.n8n_workflows) as stub:
+        os.environ.update({
+            "DATABASE_URL": f"sqlite:///{args.db}",
+            "N8N_BASE_URL": stub.base_url,
+            "N8N_API_KEY": "",
+            "SYNC_INTERVAL_SECONDS": "0",
+            "EXECUTION_RETENTION_MONTHS": "0",
+            "SEED_SAMPLE_DATA": "false",
+            "PROFILER_ENABLED": "false",
+        })
+        from app.main import app
+
+        async with app.router.lifespan_context(app):
+            status, _, _ = await request(app, "GET", "/api/workflows/sync")
+            assert status == 200, f"la sincronización inicial devolvió {status}"
+            workflow_ids = [f"n8n-{w['id']}" for w in stub.workflows]
+            return await drive(app, args, workflow_ids)
+
+
+# Proceso padre: datos, un hijo por escala y comparación
+
+
+def ensure_dataset(data_dir: str, scale: str) -> str:
+    """Base sintética de la escala pedida; se genera una sola vez"""
+    from app.database import Database
+    from .datagen import populate
+
+    path = os.path.join(data_dir, f"load-{scale}.db")
+    if not os.path.exists(path):
+        partial = path + ".partial"
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(partial + suffix):
+                os.remove(partial + suffix)
+        db = Database(partial)
+        elapsed = populate(db, SCALES[scale])
+        db.close()
+        os.replace(partial, path)
+        print(f"{scale}: {SCALES[scale]} ejecuciones generadas en {elapsed:.1f}s", file=sys.stderr)
+    return path
+
+
+def run_scale(args, scale: str, dataset: str) -> Dict:
+    # Cada corrida trabaja sobre una copia: execute y sync escriben en la base
+    workdir = tempfile.mkdtemp(prefix="bench-load-")
+    db_path = os.path.join(workdir, "load.db")
+    shutil.copyfile(dataset, db_path)
+    command = [
+        sys.executable, "-m", "benchmarks.bench_load", "--child", db_path,
+        "--duration", str(args.duration), "--warmup", str(args.warmup),
+        "--clients", str(args.clients), "--execute-ratio", str(args.execute_ratio),
+        "--sync-ratio", str(args.sync_ratio), "--n8n-latency", str(args.n8n_latency),
+        "--n8n-workflows", str(args.n8n_workflows), "--seed", str(args.seed),
+    ]
+    try:
+        output = subprocess.run(command, cwd=BACKEND_DIR, capture_output=True, text=True,
+                                check=True, env={**os.environ, "PYTHONPATH": BACKEND_DIR}).stdout
+    except subprocess.CalledProcessError as e:
+        print(e.stderr, file=sys.stderr)
+        raise
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regresiones de p99 o throughput mayores que la tolerancia (fracción)"""
+    regressions = []
+    for scale, result in current["scales"].items():
+        previous = baseline.get("scales", {}).get(scale)
+        if previous is None:
+            continue
+        for name, stats in result["endpoints"].items():
+            before = previous["endpoints"].get(name)
+            if not before or not before["requests"]:
+                continue
+            if stats["p99_ms"] > before["p99_ms"] * (1 + tolerance):
+                regressions.append(f"{scale} {name}: p99 {before['p99_ms']:.1f} -> {stats['p99_ms']:.1f} ms")
+            if stats["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+                regressions.append(f"{scale} {name}: throughput {before['throughput_rps']:.1f} -> "
+                                   f"{stats['throughput_rps']:.1f} req/s")
+    return regressions
+
+
+def print_table(scale: str, result: Dict):
+    print(f"\n{scale} ({result['total']['requests']} peticiones, "
+          f"{result['total']['throughput_rps']} req/s)", file=sys.stderr)
+    print(f"{'endpoint':<36} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'errores':>8}",
+          file=sys.stderr)
+    for name, stats in result["endpoints"].items():
+        print(f"{name:<36} {stats['throughput_rps']:8.1f} {stats['p50_ms']:8.2f} "
+              f"{stats['p90_ms']:8.2f} {stats['p99_ms']:8.2f} {stats['errors']:8d}", file=sys.stderr)
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(args) -> int:
+    os.makedirs(args.data_dir, exist_ok=True)
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {
+            "clients": args.clients,
+            "duration_seconds": args.duration,
+            "warmup_seconds": args.warmup,
+            "execute_ratio": args.execute_ratio,
+            "sync_ratio": args.sync_ratio,
+            "n8n_latency_seconds": args.n8n_latency,
+            "n8n_workflows": args.n8n_workflows,
+            "seed": args.seed,
+        },
+        "scales": {},
+    }
+    for scale in args.scales.split(","):
+        dataset = ensure_dataset(args.data_dir, scale)
+        result = run_scale(args, scale, dataset)
+        result["executions"] = SCALES[scale]
+        report["scales"][scale] = result
+        print_table(scale, result)
+
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(encoded + "\n")
+    print(encoded)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESIÓN {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="10k",
+                        help=f"escalas separadas por coma ({', '.join(SCALES)})")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "bench-load-data"))
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--execute-ratio", type=float, default=0.05)
+    parser.add_argument("--sync-ratio", type=float, default=0.005)
+    parser.add_argument("--n8n-latency", type=float, default=0.02)
+    parser.add_argument("--n8n-workflows", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--child", metavar="DB", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        args.db = args.child
+        print(json.dumps(asyncio.run(run_child(args))))
+    else:
+        invalid = [s for s in args.scales.split(",") if s not in SCALES]
+        if invalid:
+            parser.error(f"escala desconocida: {', '.join(invalid)}")
+        sys.exit(main(args))
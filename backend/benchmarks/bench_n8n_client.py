@@ -0,0 +1,74 @@
+"""
+Benchmark del cliente N8N contra el servidor stub local.
+
+Compara el comportamiento anterior (requests síncrono, una conexión TCP por
+llamada, bloqueando el event loop) con el N8NClient asíncrono y su pool.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_n8n_client --calls 200 --latency 0.02
+    python -m benchmarks.bench_n8n_client --op get --fail-rate 0.1
+"""
+import argparse
+import asyncio
+import time
+
+import requests
+
+from app.n8n_client import N8NClient
+from .stub_n8n import StubN8N
+
+
+async def run_sync(stub: StubN8N, calls: int, op: str) -> float:
+    # Así se comportaba _make_request: cada llamada bloquea el loop
+    start = time.perf_counter()
+    for i in range(calls):
+        workflow_id = stub.workflows[i % len(stub.workflows)]["id"]
+        if op == "execute":
+            response = requests.request("POST", f"{stub.base_url}/workflows/{workflow_id}/execute")
+        else:
+            response = requests.request("GET", f"{stub.base_url}/workflows/{workflow_id}")
+        response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def run_async(stub: StubN8N, calls: int, op: str, in_flight: int, fail_rate: float) -> float:
+    client = N8NClient(base_url=stub.base_url, api_key="", max_in_flight=in_flight,
+                       max_connections=in_flight)
+    call = client.execute_workflow if op == "execute" else client.get_workflow
+    stub.fail_rate = fail_rate
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            call(stub.workflows[i % len(stub.workflows)]["id"]) for i in range(calls)
+        ])
+        return time.perf_counter() - start
+    finally:
+        stub.fail_rate = 0.0
+        await client.aclose()
+
+
+async def main(calls: int, op: str, latency: float, in_flight: int, fail_rate: float):
+    with StubN8N(latency=latency) as stub:
+        before_connections = stub.connections
+        sync_elapsed = await run_sync(stub, calls, op)
+        sync_connections = stub.connections - before_connections
+
+        before_connections = stub.connections
+        async_elapsed = await run_async(stub, calls, op, in_flight, fail_rate)
+        async_connections = stub.connections - before_connections
+
+    print(f"requests síncrono : {calls / sync_elapsed:8.1f} llamadas/s, {sync_connections} conexiones")
+    print(f"N8NClient async   : {calls / async_elapsed:8.1f} llamadas/s, {async_connections} conexiones"
+          f" (máx. {in_flight} en vuelo, fallos simulados {fail_rate:.0%})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--op", choices=["execute", "get"], default="execute",
+                        help="'get' es idempotente y se reintenta ante 503 simulados")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--in-flight", type=int, default=10)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.op, args.latency, args.in_flight, args.fail_rate))
@@ -0,0 +1,75 @@
+"""
+Benchmark de la paginación por cursor (keyset) de executions frente a OFFSET.
+
+Mide el costo de pedir una página a distintas profundidades de la tabla. Con
+keyset el costo debe ser el mismo en la primera página y en las más profundas.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_pagination --executions 5000000
+    python -m benchmarks.bench_pagination --db /tmp/bench.db   # reutilizar datos
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from app.database import Database, encode_cursor
+from app.models import Execution
+from .datagen import populate
+
+
+def median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(db_path: str, executions: int, page_size: int, repeat: int):
+    db = Database(db_path)
+    with db.get_connection() as conn:
+        total = conn.execute("SELECT COUNT(*) FROM executions").fetchone()[0]
+    if total < executions:
+        print(f"Generando {executions - total} ejecuciones...")
+        populate(db, executions - total)
+        with db.get_connection() as conn:
+            total = conn.execute("SELECT COUNT(*) FROM executions").fetchone()[0]
+
+    print(f"{total} ejecuciones, páginas de {page_size}")
+    print(f"{'profundidad':>12} {'keyset ms':>10} {'offset ms':>10}")
+    depth = 0
+    while depth < total:
+        with db.get_connection() as conn:
+            row = conn.execute('''
+                SELECT start_time, id FROM executions
+                ORDER BY start_time DESC, id DESC LIMIT 1 OFFSET ?
+            ''', (max(depth - 1, 0),)).fetchone()
+        cursor = encode_cursor(row["start_time"], row["id"]) if depth else None
+
+        keyset = median_ms(lambda: db.get_executions_page(limit=page_size, cursor=cursor), repeat)
+
+        def offset_page():
+            with db.get_connection() as conn:
+                rows = conn.execute('''
+                    SELECT * FROM executions ORDER BY start_time DESC, id DESC LIMIT ? OFFSET ?
+                ''', (page_size, depth)).fetchall()
+            return [Execution(**dict(row)) for row in rows]
+        offset = median_ms(offset_page, repeat)
+
+        print(f"{depth:>12} {keyset:>10.2f} {offset:>10.2f}")
+        depth = depth * 10 if depth else 1000
+    db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default=None)
+    parser.add_argument("--executions", type=int, default=5_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="bench-pages-"), "bench.db")
+    main(path, args.executions, args.page_size, args.repeat)
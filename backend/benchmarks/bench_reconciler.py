@@ -0,0 +1,126 @@
+"""
+Benchmark de la conciliación de ejecuciones en curso.
+
+Registra N ejecuciones "running" en el stub y en la base, cada una con una
+duración al azar, y mide hasta que la base no tiene ninguna en curso:
+  - conciliador: páginas de /executions con intervalo adaptativo por ejecución
+  - ingenuo: GET /executions/{id} por cada ejecución en cada ronda
+
+Reporta peticiones a n8n, ciclos, tiempo total y el retraso entre el fin de
+la última ejecución y su registro en la base.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_reconciler --executions 10000 --max-seconds 20
+    python -m benchmarks.bench_reconciler --database-url postgresql://postgres@localhost/bench
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from app.database import StorageBackend, create_database
+from app.n8n_client import N8NClient, execution_record_from_n8n, execution_update_from_n8n
+from app.reconciler import ExecutionReconciler
+from app.sync import WorkflowSyncEngine
+from .bench_storage import isolated_url
+from .stub_n8n import StubN8N
+
+
+async def populate(db: StorageBackend, stub: StubN8N, client: N8NClient, executions: int,
+                   min_seconds: float, max_seconds: float) -> float:
+    """Ejecuciones en curso en el stub y en la base; devuelve cuándo termina la última"""
+    await WorkflowSyncEngine(db, client).run()
+    workflows = list(db.resolve_workflows([w["id"] for w in stub.workflows]).values())
+    records = []
+    for i in range(executions):
+        workflow = workflows[i % len(workflows)]
+        data = stub.add_execution(workflow["n8n_id"], random.uniform(min_seconds, max_seconds))
+        records.append(execution_record_from_n8n(data, workflow))
+    for start in range(0, len(records), 1000):
+        db.insert_executions(records[start:start + 1000])
+    return time.time() + max_seconds
+
+
+async def run_reconciler(db: StorageBackend, client: N8NClient, interval: float,
+                         max_interval: float):
+    reconciler = ExecutionReconciler(db, client, interval=interval, max_interval=max_interval,
+                                     max_tracked=len(db.get_inflight_executions(1_000_000)))
+    reconciler.start()
+    try:
+        while db.get_inflight_executions(1):
+            await asyncio.sleep(0.1)
+    finally:
+        await reconciler.stop()
+    return reconciler.totals["cycles"]
+
+
+async def run_naive(db: StorageBackend, client: N8NClient, interval: float):
+    """Consultar cada ejecución en curso por separado, a intervalo fijo"""
+    cycles = 0
+    while True:
+        inflight = db.get_inflight_executions(1_000_000)
+        cycles += 1
+        if not inflight:
+            break
+        responses = await asyncio.gather(*[
+            client.get_execution(e["n8n_execution_id"]) for e in inflight
+        ])
+        updates = [execution_update_from_n8n(data, e) for e, data in zip(inflight, responses)]
+        db.update_execution_statuses([u for u, e in zip(updates, inflight)
+                                      if u["status"] != e["status"]])
+        await asyncio.sleep(interval)
+    return cycles
+
+
+async def measure(label: str, url: str, args):
+    url, cleanup = isolated_url(url)
+    db = create_database(url)
+    try:
+        with StubN8N(workflows=args.workflows, latency=args.latency,
+                     execution_error_rate=args.error_rate) as stub:
+            client = N8NClient(base_url=stub.base_url, api_key="", max_in_flight=args.concurrency)
+            try:
+                last_finish = await populate(db, stub, client, args.executions,
+                                             args.min_seconds, args.max_seconds)
+                before = stub.requests
+                start = time.perf_counter()
+                if label == "conciliador":
+                    cycles = await run_reconciler(db, client, args.interval, args.max_interval)
+                else:
+                    cycles = await run_naive(db, client, args.interval)
+                elapsed = time.perf_counter() - start
+                lag = time.time() - last_finish
+            finally:
+                await client.aclose()
+            counts = db.get_dashboard_stats()
+            print(f"{label:<12} {stub.requests - before:10d} {cycles:7d} {elapsed:9.1f} "
+                  f"{lag:10.1f}  {counts.total_executions} ejecuciones, "
+                  f"{counts.success_rate:.1f}% éxito")
+    finally:
+        db.close()
+        cleanup()
+
+
+def main(args):
+    url = args.database_url or "sqlite"
+    print(f"{args.executions} ejecuciones en curso, duración {args.min_seconds:g}-"
+          f"{args.max_seconds:g}s, base {url.split(':')[0]}")
+    print(f"{'estrategia':<12} {'peticiones':>10} {'ciclos':>7} {'total s':>9} {'retraso s':>10}")
+    for label in ("conciliador", "ingenuo"):
+        asyncio.run(measure(label, url, args))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url")
+    parser.add_argument("--executions", type=int, default=10000)
+    parser.add_argument("--workflows", type=int, default=20)
+    parser.add_argument("--min-seconds", type=float, default=1.0)
+    parser.add_argument("--max-seconds", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--interval", type=float, default=2.0)
+    parser.add_argument("--max-interval", type=float, default=60.0)
+    parser.add_argument("--latency", type=float, default=0.0, help="Latencia del stub en segundos")
+    parser.add_argument("--concurrency", type=int, default=20)
+    main(parser.parse_args())
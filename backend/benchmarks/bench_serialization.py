@@ -0,0 +1,140 @@
+"""
+Benchmark de la serialización de los listados (GET /api/executions y /api/workflows).
+
+Compara, con la cache de lecturas apagada:
+  - pydantic: un Execution por fila y FastAPI validando otra vez contra
+    response_model antes de json.dumps (el camino anterior)
+  - rápido: tuplas de la consulta directo a JSON con orjson
+  - rápido sin orjson: el mismo camino con json de la biblioteca estándar
+
+Primero sólo la conversión de filas ya leídas y después la petición completa
+por ASGI en proceso.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_serialization --executions 200000 --limit 5000
+    python -m benchmarks.bench_serialization --db /tmp/bench.db   # reutilizar datos
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_model_field
+
+from app import serialization
+from app.database import Database, execution_json_columns, get_database
+from app.main import app
+from app.models import Execution, Workflow
+from .asgi import request
+from .datagen import populate
+
+
+def median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def median_request_ms(target, path: str, query: str, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        status, _, body = await request(target, "GET", path, query=query)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert status == 200, body[:200]
+    return statistics.median(samples)
+
+
+def legacy_app(db: Database) -> FastAPI:
+    """Las mismas rutas como estaban: modelos por fila y response_model"""
+    legacy = FastAPI()
+
+    @legacy.get("/api/executions/", response_model=List[Execution])
+    async def get_executions(limit: int = 50):
+        return db.get_executions_page(limit=limit)[0]
+
+    @legacy.get("/api/workflows/", response_model=List[Workflow])
+    async def get_workflows():
+        return db.get_workflows()
+
+    return legacy
+
+
+def bench_encoding(db: Database, limit: int, repeat: int):
+    columns = ", ".join(execution_json_columns())
+    with db.get_connection() as conn:
+        rows = conn.execute(f'''
+            SELECT {columns} FROM executions ORDER BY start_time DESC, id DESC LIMIT ?
+        ''', (limit,)).fetchall()
+    field = create_model_field(name="Response", type_=List[Execution], mode="serialization")
+
+    def pydantic_path():
+        executions = [Execution(**dict(zip(serialization.EXECUTION_FIELDS, row))) for row in rows]
+        # Lo que hace serialize_response de FastAPI en una ruta async
+        value, _ = field.validate(executions, {}, loc=("response",))
+        return JSONResponse(field.serialize(value, by_alias=True)).body
+
+    def fast_path():
+        return serialization.encode_executions(rows)
+
+    orjson = serialization.orjson
+    results = [("pydantic + response_model", median_ms(pydantic_path, repeat))]
+    results.append(("rápido (orjson)" if orjson else "rápido (sin orjson)",
+                    median_ms(fast_path, repeat)))
+    if orjson is not None:
+        serialization.orjson = None
+        try:
+            results.append(("rápido (sin orjson)", median_ms(fast_path, repeat)))
+        finally:
+            serialization.orjson = orjson
+
+    print(f"conversión de {len(rows)} filas ya leídas")
+    print(f"{'camino':<28} {'ms':>8} {'x':>6}")
+    for label, ms in results:
+        print(f"{label:<28} {ms:8.2f} {results[0][1] / ms:6.1f}")
+
+
+async def bench_requests(db: Database, limit: int, repeat: int):
+    app.dependency_overrides[get_database] = lambda: db
+    legacy = legacy_app(db)
+    print(f"\n{'petición':<32} {'pydantic ms':>12} {'rápido ms':>10} {'x':>6}")
+    for path, query in (("/api/executions/", f"limit={limit}"), ("/api/executions/", "limit=50"),
+                        ("/api/workflows/", "")):
+        before = await median_request_ms(legacy, path, query, repeat)
+        after = await median_request_ms(app, path, query, repeat)
+        label = f"{path}?{query}" if query else path
+        print(f"{label:<32} {before:12.2f} {after:10.2f} {before / after:6.1f}")
+    app.dependency_overrides.clear()
+
+
+def main(db_path: str, executions: int, limit: int, repeat: int):
+    db = Database(db_path)
+    with db.get_connection() as conn:
+        total = conn.execute("SELECT COUNT(*) FROM executions").fetchone()[0]
+    if total < executions:
+        print(f"Generando {executions - total} ejecuciones...")
+        populate(db, executions - total)
+
+    bench_encoding(db, limit, repeat)
+    asyncio.run(bench_requests(db, limit, repeat))
+    db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=None)
+    parser.add_argument("--executions", type=int, default=200_000)
+    parser.add_argument("--limit", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="bench-serialization-"), "bench.db")
+    main(path, args.executions, args.limit, args.repeat)
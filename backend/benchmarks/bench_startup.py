@@ -0,0 +1,115 @@
+"""
+Benchmark de arranque en frío de app.main (boot de un worker).
+
+Cada muestra es un intérprete nuevo que importa app.main, corre el startup
+del lifespan y atiende GET /health. Se mide:
+  - import de app.main y el total desde que se lanza el proceso
+  - startup con base nueva (aplica migraciones) y con el esquema al día
+  - startup sin comprobar el esquema (DATABASE_AUTO_MIGRATE=false)
+Además lista los módulos que más tardan en importarse (python -X importtime).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_startup --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import asyncio, json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from benchmarks.asgi import request
+
+async def boot():
+    async with app.main.app.router.lifespan_context(app.main.app):
+        ready = time.perf_counter()
+        status, _, _ = await request(app.main.app, "GET", "/health")
+        assert status == 200
+        return ready, time.perf_counter()
+
+ready, served = asyncio.run(boot())
+print(json.dumps({"import_ms": (imported - started) * 1000,
+                  "startup_ms": (ready - imported) * 1000,
+                  "first_request_ms": (served - ready) * 1000}))
+"""
+
+
+def child_env(database_url: str, **overrides) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": database_url,
+        "SYNC_INTERVAL_SECONDS": "0",
+        "EXECUTION_RETENTION_MONTHS": "0",
+        "SEED_SAMPLE_DATA": "false",
+        "PYTHONPATH": BACKEND_DIR,
+    })
+    env.update(overrides)
+    return env
+
+
+def boot_once(env: dict) -> dict:
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", CHILD], env=env, cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def summarize(label: str, samples):
+    keys = ("import_ms", "startup_ms", "first_request_ms", "process_ms")
+    medians = {k: statistics.median(s[k] for s in samples) for k in keys}
+    print(f"{label:<28} " + " ".join(f"{medians[k]:10.1f}" for k in keys))
+
+
+def import_hotspots(top: int):
+    """Módulos con mayor tiempo de import propio (sin contar sus dependencias)"""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"],
+                            env=child_env("sqlite:///:memory:"), cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), module.strip()))
+    print(f"\n{'módulo':<40} {'propio ms':>10} {'acumulado ms':>13}")
+    for self_us, cumulative_us, module in sorted(rows, reverse=True)[:top]:
+        print(f"{module:<40} {self_us / 1000:10.1f} {cumulative_us / 1000:13.1f}")
+
+
+def main(runs: int, top: int):
+    tmpdir = tempfile.mkdtemp(prefix="bench-startup-")
+    print(f"{'caso (mediana, ms)':<28} {'import':>10} {'startup':>10} {'1ª petición':>10} {'proceso':>10}")
+
+    fresh = []
+    for i in range(runs):
+        url = f"sqlite:///{os.path.join(tmpdir, f'fresh-{i}.db')}"
+        fresh.append(boot_once(child_env(url)))
+    summarize("base nueva (migra)", fresh)
+
+    url = f"sqlite:///{os.path.join(tmpdir, 'fresh-0.db')}"
+    summarize("esquema al día", [boot_once(child_env(url)) for _ in range(runs)])
+    summarize("sin comprobar esquema", [
+        boot_once(child_env(url, DATABASE_AUTO_MIGRATE="false")) for _ in range(runs)
+    ])
+
+    import_hotspots(top)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    main(args.runs, args.top)
@@ -0,0 +1,193 @@
+"""
+Benchmark común de los backends de almacenamiento (SQLite y PostgreSQL).
+
+Carga los mismos datos a través del contrato StorageBackend y mide:
+escrituras concurrentes por lotes desde varios hilos (el techo de SQLite es
+su único escritor) y latencia p50/p99 de las lecturas del dashboard.
+
+Sin --database-url se usa un SQLite temporal. Para PostgreSQL cada corrida
+crea un schema propio y lo borra al terminar:
+
+Uso (desde backend/):
+    python -m benchmarks.bench_storage --executions 200000 \\
+        --database-url sqlite:///tmp/bench.db \\
+        --database-url postgresql://postgres@localhost/bench
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from urllib.parse import quote
+
+from app.database import StorageBackend, create_database
+
+STATUSES = ["success"] * 94 + ["error"] * 5 + ["running"]
+
+
+def isolated_url(url: str):
+    """URL aislada para la corrida y función que la limpia al terminar"""
+    if url.startswith(("postgresql://", "postgres://")):
+        import psycopg
+
+        schema = f"bench_{os.getpid()}_{uuid.uuid4().hex[:6]}"
+        with psycopg.connect(url, autocommit=True) as conn:
+            conn.execute(f"CREATE SCHEMA {schema}")
+
+        def cleanup():
+            with psycopg.connect(url, autocommit=True) as conn:
+                conn.execute(f"DROP SCHEMA {schema} CASCADE")
+
+        separator = "&" if "?" in url else "?"
+        return url + separator + "options=" + quote(f"-csearch_path={schema}"), cleanup
+
+    if url.startswith("sqlite:///"):
+        return url, lambda: None
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-storage-"), "bench.db")
+    return f"sqlite:///{path}", lambda: None
+
+
+def make_executions(rng: random.Random, workflows, count: int, days: int = 90):
+    now = datetime.now()
+    rows = []
+    for _ in range(count):
+        workflow_id, workflow_name = rng.choice(workflows)
+        status = rng.choice(STATUSES)
+        start = now - timedelta(seconds=rng.randrange(days * 86400))
+        duration = rng.randint(200, 10000) if status != "running" else None
+        rows.append({
+            "id": f"bench-{uuid.uuid4().hex}",
+            "workflow_id": workflow_id,
+            "workflow_name": workflow_name,
+            "n8n_execution_id": None,
+            "status": status,
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(milliseconds=duration)).isoformat() if duration else None,
+            "duration": duration,
+            "triggered_by": rng.choice(["Webhook", "Schedule", "Manual"]),
+            "data_processed": rng.randint(0, 50),
+            "error_message": "Simulated failure" if status == "error" else None,
+        })
+    return rows
+
+
+def populate(db: StorageBackend, executions: int, workflows: int, batch_size: int = 5000):
+    rng = random.Random(42)
+    db.upsert_workflows([
+        {"id": f"bench-wf-{i:04d}", "n8n_id": f"bench-{i}", "name": f"Bench Workflow {i}",
+         "status": "active", "created_at": None, "triggers": "[]", "actions": "[]",
+         "n8n_updated_at": None}
+        for i in range(workflows)
+    ])
+    resolved = db.resolve_workflows(f"bench-wf-{i:04d}" for i in range(workflows))
+    pairs = [(w["id"], w["name"]) for w in resolved.values()]
+    for offset in range(0, executions, batch_size):
+        db.insert_executions(make_executions(rng, pairs, min(batch_size, executions - offset)))
+    return pairs
+
+
+def concurrent_writes(db: StorageBackend, pairs, writers: int, batches: int, batch_size: int):
+    """Filas/s insertadas por varios hilos escribiendo lotes a la vez y lotes fallidos"""
+    payloads = [
+        [make_executions(random.Random(w * 1000 + b), pairs, batch_size) for b in range(batches)]
+        for w in range(writers)
+    ]
+    failed = []
+
+    def writer(batches_for_thread):
+        for batch in batches_for_thread:
+            try:
+                db.insert_executions(batch)
+            except Exception as e:
+                # Con SQLite: "database is locked" cuando la espera supera busy_timeout
+                failed.append(str(e))
+
+    threads = [threading.Thread(target=writer, args=(p,)) for p in payloads]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return (writers * batches - len(failed)) * batch_size / elapsed, len(failed)
+
+
+def latency(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def deep_cursor(db: StorageBackend, pages: int, page_size: int):
+    cursor = None
+    for _ in range(pages):
+        _, cursor = db.get_executions_page(limit=page_size, cursor=cursor, include_error=False)
+    return cursor
+
+
+def run(url: str, args) -> dict:
+    url, cleanup = isolated_url(url)
+    db = create_database(url, pool_size=args.writers + 2)
+    try:
+        start = time.perf_counter()
+        pairs = populate(db, args.executions, args.workflows)
+        load_seconds = time.perf_counter() - start
+
+        write_rate, failed_batches = concurrent_writes(
+            db, pairs, args.writers, args.batches, args.batch_size
+        )
+
+        now = datetime.now()
+        cursor = deep_cursor(db, 20, 50)
+        reads = {
+            "workflows": lambda: db.get_workflows(),
+            "stats": lambda: db.get_dashboard_stats(),
+            "executions_first_page": lambda: db.get_executions_page(limit=50),
+            "executions_deep_page": lambda: db.get_executions_page(limit=50, cursor=cursor),
+            "executions_by_workflow": lambda: db.get_executions_page(workflow_id=pairs[0][0], limit=50),
+            "timeseries_day_30d": lambda: db.get_timeseries("day", now - timedelta(days=30), now),
+            "timeseries_hour_48h": lambda: db.get_timeseries("hour", now - timedelta(hours=48), now),
+            "workflow_analytics": lambda: db.get_workflow_analytics(pairs[0][0]),
+        }
+        result = {
+            "backend": type(db).__name__,
+            "load_rows_per_s": round(args.executions / load_seconds),
+            "concurrent_write_rows_per_s": round(write_rate),
+            "concurrent_write_failed_batches": failed_batches,
+            "reads_ms": {},
+        }
+        for name, fn in reads.items():
+            p50, p99 = latency(fn, args.repeat)
+            result["reads_ms"][name] = {"p50": round(p50, 3), "p99": round(p99, 3)}
+        return result
+    finally:
+        db.close()
+        cleanup()
+
+
+def main(args):
+    results = [run(url, args) for url in (args.database_url or ["sqlite"])]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", action="append",
+                        help="Backend a medir (se puede repetir)")
+    parser.add_argument("--executions", type=int, default=100000)
+    parser.add_argument("--workflows", type=int, default=50)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--batches", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    main(parser.parse_args())
@@ -0,0 +1,59 @@
+"""
+Benchmark de la sincronización incremental con n8n.
+
+Sincroniza N workflows desde el stub (primera pasada: todos nuevos), repite
+sin cambios y por último con una fracción modificada. Reporta tiempo y pico
+de memoria de cada pasada.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_sync --workflows 5000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+from app.database import Database
+from app.n8n_client import N8NClient
+from app.sync import WorkflowSyncEngine
+from .stub_n8n import StubN8N, _now
+
+
+async def timed_run(engine: WorkflowSyncEngine, label: str):
+    tracemalloc.start()
+    start = time.perf_counter()
+    summary = await engine.run()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<22} {elapsed:7.2f}s  pico {peak / 1e6:6.1f} MB  {summary}")
+
+
+async def main(workflows: int, page_size: int, changed: float):
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bench-sync-"), "bench.db")
+    db = Database(db_path)
+
+    with StubN8N(workflows=workflows, nodes_per_workflow=20) as stub:
+        client = N8NClient(base_url=stub.base_url, api_key="")
+        engine = WorkflowSyncEngine(db, client, page_size=page_size)
+        try:
+            await timed_run(engine, "Primera sincronización")
+            await timed_run(engine, "Sin cambios")
+
+            for workflow in stub.workflows[:int(workflows * changed)]:
+                workflow["updatedAt"] = _now()
+            await timed_run(engine, f"{changed:.0%} modificados")
+        finally:
+            await client.aclose()
+    db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workflows", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=250)
+    parser.add_argument("--changed", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(main(args.workflows, args.page_size, args.changed))
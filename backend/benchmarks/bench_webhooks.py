@@ -0,0 +1,205 @@
+"""
+Prueba de carga del webhook de eventos de ejecución (POST /api/webhooks/n8n/executions).
+
+Levanta app.main en proceso (lifespan completo, un solo worker) y simula a N8N
+enviando, por cada ejecución, un evento de inicio y otro de fin después de
+--lag inicios más (con lotes del writer mayores a 2 * lag, inicio y fin suelen
+caer en el mismo lote y se guardan como una sola fila). Una fracción de las peticiones se reenvía tal cual, como
+haría N8N al reintentar, para ejercitar la idempotencia.
+
+Reporta:
+  - eventos por segundo confirmados (202) y latencia p50/p99 de la respuesta
+  - tiempo hasta que todo quedó guardado y eventos por segundo de punta a punta
+  - verificación en la base: una fila por ejecución, ninguna en curso y
+    contadores de workflows coherentes
+
+Uso (desde backend/):
+    python -m benchmarks.bench_webhooks --executions 50000 --batch 1
+    python -m benchmarks.bench_webhooks --executions 200000 --batch 50 --clients 16
+    python -m benchmarks.bench_webhooks --database-url postgresql://postgres@localhost/bench
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import tempfile
+import time
+from typing import List
+
+from .asgi import request
+from .bench_storage import isolated_url
+
+PATH = "/api/webhooks/n8n/executions"
+WEBHOOK_SECRET = "bench-secret"
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not ordered:
+        return 0.0
+    rank = math.ceil(q / 100 * len(ordered))
+    return ordered[min(len(ordered), max(1, rank)) - 1]
+
+
+def build_requests(workflow_ids: List[str], executions: int, batch: int, lag: int,
+                   retry_rate: float, seed: int) -> List[bytes]:
+    """Cuerpos JSON: inicio de cada ejecución y su fin después de lag inicios más"""
+    rng = random.Random(seed)
+    events = []
+    for i in range(executions + lag):
+        if i < executions:
+            events.append({"execution_id": f"wh-{i}", "workflow_id": workflow_ids[i % len(workflow_ids)],
+                           "status": "running"})
+        if i >= lag:
+            done = i - lag
+            failed = rng.random() < 0.05
+            events.append({"execution_id": f"wh-{done}",
+                           "workflow_id": workflow_ids[done % len(workflow_ids)],
+                           "status": "error" if failed else "success",
+                           "data_processed": rng.randint(1, 100),
+                           "error_message": "Timeout" if failed else None})
+
+    bodies = []
+    for start in range(0, len(events), batch):
+        chunk = events[start:start + batch]
+        body = json.dumps(chunk[0] if batch == 1 else chunk).encode()
+        bodies.append(body)
+        if rng.random() < retry_rate:
+            bodies.append(body)
+    return bodies
+
+
+async def drive(app, bodies: List[bytes], clients: int):
+    latencies = []
+    statuses = {}
+    accepted = duplicates = 0
+    pending = iter(bodies)
+    headers = {"content-type": "application/json", "x-webhook-secret": WEBHOOK_SECRET}
+
+    async def client():
+        nonlocal accepted, duplicates
+        for body in pending:
+            while True:
+                start = time.perf_counter()
+                status, _, response = await request(app, "POST", PATH, headers=headers, body=body)
+                latencies.append(time.perf_counter() - start)
+                statuses[status] = statuses.get(status, 0) + 1
+                if status != 503:
+                    break
+                # Cola llena: reintentar como N8N, después de Retry-After
+                await asyncio.sleep(0.05)
+            if status == 202:
+                result = json.loads(response)
+                accepted += result["accepted"]
+                duplicates += result["duplicates"]
+
+    await asyncio.gather(*[client() for _ in range(clients)])
+    return sorted(latencies), statuses, accepted, duplicates
+
+
+async def wait_until_stored(db, executions: int, timeout: float) -> bool:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        total = await asyncio.to_thread(count_rows, db)
+        if total >= executions and not await asyncio.to_thread(db.get_inflight_executions, 1):
+            return True
+        await asyncio.sleep(0.02)
+    return False
+
+
+def count_rows(db) -> int:
+    return db.get_dashboard_stats().total_executions
+
+
+def verify(db, executions: int) -> List[str]:
+    problems = []
+    stats = db.get_dashboard_stats()
+    if stats.total_executions != executions:
+        problems.append(f"{stats.total_executions} filas para {executions} ejecuciones")
+    if db.get_inflight_executions(1):
+        problems.append("quedaron ejecuciones en curso")
+    counted = sum(w.total_executions for w in db.get_workflows())
+    if counted != executions:
+        problems.append(f"los workflows suman {counted} ejecuciones")
+    return problems
+
+
+async def run(args, url: str):
+    os.environ.update({
+        "DATABASE_URL": url,
+        "SEED_SAMPLE_DATA": "true",
+        "SYNC_INTERVAL_SECONDS": "0",
+        "RECONCILE_INTERVAL_SECONDS": "0",
+        "EXECUTION_RETENTION_MONTHS": "0",
+        "PROFILER_ENABLED": "false",
+        "N8N_BASE_URL": "http://127.0.0.1:9/api/v1",
+        "N8N_WEBHOOK_SECRET": WEBHOOK_SECRET,
+        "WEBHOOK_BATCH_SIZE": str(args.writer_batch),
+        "WEBHOOK_FLUSH_INTERVAL": str(args.flush_interval),
+        "WEBHOOK_QUEUE_SIZE": str(args.queue_size),
+    })
+    from app.database import get_database
+    from app.main import app
+    from app.webhooks import get_webhook_writer
+
+    async with app.router.lifespan_context(app):
+        db = get_database()
+        workflow_ids = [w.id for w in db.get_workflows()]
+        # La siembra trae ejecuciones de ejemplo: se cuentan aparte
+        baseline = count_rows(db)
+        bodies = build_requests(workflow_ids, args.executions, args.batch, args.lag,
+                                args.retry_rate, args.seed)
+        events = args.executions * 2
+
+        start = time.perf_counter()
+        latencies, statuses, accepted, duplicates = await drive(app, bodies, args.clients)
+        acked = time.perf_counter() - start
+        stored = await wait_until_stored(db, baseline + args.executions, args.timeout)
+        total = time.perf_counter() - start
+        writer = get_webhook_writer()
+        problems = verify(db, baseline + args.executions) if stored else ["no terminó de guardar"]
+
+    print(f"{args.executions} ejecuciones ({events} eventos) en {len(bodies)} peticiones de "
+          f"{args.batch}, {args.clients} clientes, base {url.split(':')[0]}")
+    print(f"respuestas        {dict(sorted(statuses.items()))}")
+    print(f"aceptados         {accepted} ({duplicates} repetidos descartados)")
+    print(f"confirmación      {acked:8.2f} s  {events / acked:10.0f} eventos/s  "
+          f"{len(latencies) / acked:8.0f} peticiones/s")
+    print(f"latencia          p50 {percentile(latencies, 50) * 1000:.2f} ms  "
+          f"p99 {percentile(latencies, 99) * 1000:.2f} ms  máx {latencies[-1] * 1000:.2f} ms")
+    print(f"guardado          {total:8.2f} s  {events / total:10.0f} eventos/s  "
+          f"({writer.written} filas escritas, {writer.failed} fallidas)")
+    print("verificación      " + ("ok" if not problems else "; ".join(problems)))
+    return 0 if not problems else 1
+
+
+def main(args) -> int:
+    if args.database_url:
+        url, cleanup = isolated_url(args.database_url)
+    else:
+        path = os.path.join(tempfile.mkdtemp(prefix="bench-webhooks-"), "bench.db")
+        url, cleanup = f"sqlite:///{path}", lambda: None
+    try:
+        return asyncio.run(run(args, url))
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url")
+    parser.add_argument("--executions", type=int, default=50000)
+    parser.add_argument("--batch", type=int, default=1, help="Eventos por petición")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--lag", type=int, default=250,
+                        help="Ejecuciones que empiezan entre el inicio y el fin de cada una")
+    parser.add_argument("--retry-rate", type=float, default=0.02)
+    parser.add_argument("--writer-batch", type=int, default=1000)
+    parser.add_argument("--flush-interval", type=float, default=0.2)
+    parser.add_argument("--queue-size", type=int, default=50000)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=42)
+    raise SystemExit(main(parser.parse_args()))
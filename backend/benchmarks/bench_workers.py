@@ -0,0 +1,318 @@
+"""
+Escalado del modo multi-worker (python run.py --workers N).
+
+Por cada N de --workers levanta run.py como proceso aparte sobre una copia de
+la base sintética (bench_load.ensure_dataset) y con el bus de eventos en un
+directorio temporal. --clients procesos cliente (httpx, --connections
+conexiones cada uno) repiten la mezcla de polling de bench_load más una
+fracción de eventos al webhook, que escriben e invalidan la cache en el
+worker que los recibe.
+
+Reporta por N:
+  - peticiones por segundo, p50/p99 y aceleración respecto del primer N
+  - propagación: --streams flujos SSE abiertos contra el servidor (el kernel
+    los reparte entre workers) y --rounds eventos al webhook; cuántos flujos
+    recibieron cada evento y con qué demora (incluye el micro-lote del
+    webhook, WEBHOOK_FLUSH_INTERVAL; con un worker es la referencia)
+
+Con menos núcleos que workers + clientes los procesos compiten por la CPU y la
+aceleración no es representativa (se avisa al empezar).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_workers --workers 1,2,4 --duration 20
+    python -m benchmarks.bench_workers --workers 1,4 --clients 4 --connections 32 --output workers.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from .bench_load import POLLING_MIX, ensure_dataset, percentile, summarize
+from .datagen import SCALES
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEBHOOK = "POST /api/webhooks/n8n/executions"
+WEBHOOK_PATH = "/api/webhooks/n8n/executions"
+WEBHOOK_SECRET = "bench-secret"
+
+
+# Proceso cliente: carga en lazo cerrado contra el servidor ya levantado
+
+
+async def drive(args) -> Dict:
+    mix = list(POLLING_MIX)
+    polling_weight = sum(weight for *_, weight in mix)
+    mix.append((WEBHOOK, "POST", WEBHOOK_PATH, "",
+                args.webhook_ratio * polling_weight / max(1e-9, 1 - args.webhook_ratio)))
+    weights = [entry[-1] for entry in mix]
+
+    latencies: Dict[str, List[float]] = {entry[0]: [] for entry in mix if entry[-1] > 0}
+    errors: Dict[str, int] = {}
+    measuring = False
+    deadline = time.perf_counter() + args.warmup + args.duration
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+
+    async with httpx.AsyncClient(base_url=args.client, limits=limits, timeout=30,
+                                 headers={"x-webhook-secret": WEBHOOK_SECRET}) as http:
+        workflow_ids = [w["id"] for w in (await http.get("/api/workflows/")).json()]
+
+        async def client(seed: int):
+            rng = random.Random(seed)
+            sent = 0
+            while time.perf_counter() < deadline:
+                name, method, path, query, _ = rng.choices(mix, weights)[0]
+                body = None
+                if name == WEBHOOK:
+                    sent += 1
+                    body = {"execution_id": f"bw-{seed}-{sent}", "workflow_id": rng.choice(workflow_ids),
+                            "status": "success", "data_processed": rng.randint(1, 100)}
+                start = time.perf_counter()
+                try:
+                    response = await http.request(method, path, params=query or None, json=body)
+                    status = response.status_code
+                except httpx.HTTPError:
+                    status = 599
+                elapsed = time.perf_counter() - start
+                if measuring:
+                    latencies[name].append(elapsed)
+                    if status >= 400:
+                        errors[name] = errors.get(name, 0) + 1
+
+        tasks = [asyncio.create_task(client(args.seed * 1000 + i)) for i in range(args.connections)]
+        await asyncio.sleep(args.warmup)
+        measuring = True
+        await asyncio.gather(*tasks)
+    return {"latencies": latencies, "errors": errors}
+
+
+# Proceso padre: servidor por cada N, clientes y propagación entre workers
+
+
+def start_server(args, workers: int, db_path: str, bus_path: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "PYTHONPATH": BACKEND_DIR,
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "EVENT_BUS_PATH": bus_path,
+        "N8N_BASE_URL": "http://127.0.0.1:9/api/v1",
+        "N8N_API_KEY": "",
+        "N8N_WEBHOOK_SECRET": WEBHOOK_SECRET,
+        "SYNC_INTERVAL_SECONDS": "0",
+        "RECONCILE_INTERVAL_SECONDS": "0",
+        "EXECUTION_RETENTION_MONTHS": "0",
+        "SEED_SAMPLE_DATA": "false",
+        "PROFILER_ENABLED": "false",
+    }
+    command = [sys.executable, "run.py", "--workers", str(workers), "--port", str(args.port),
+               "--no-reload"]
+    # Grupo propio: al terminar se corta el supervisor de uvicorn junto con sus workers
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL, start_new_session=True)
+
+
+def stop_server(server: subprocess.Popen):
+    try:
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait(timeout=30)
+    except ProcessLookupError:
+        pass
+    except subprocess.TimeoutExpired:
+        os.killpg(server.pid, signal.SIGKILL)
+        server.wait()
+
+
+def wait_ready(base_url: str, server: subprocess.Popen, settle: float, timeout: float = 60.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"run.py terminó con código {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                # El primer worker ya responde; los demás terminan su lifespan
+                time.sleep(settle)
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("el servidor no respondió a /health")
+
+
+def run_clients(args, base_url: str) -> Dict:
+    command = [
+        sys.executable, "-m", "benchmarks.bench_workers", "--client", base_url,
+        "--connections", str(args.connections), "--duration", str(args.duration),
+        "--warmup", str(args.warmup), "--webhook-ratio", str(args.webhook_ratio),
+    ]
+    clients = [subprocess.Popen(command + ["--seed", str(args.seed + i)], cwd=BACKEND_DIR,
+                                stdout=subprocess.PIPE, text=True,
+                                env={**os.environ, "PYTHONPATH": BACKEND_DIR})
+               for i in range(args.clients)]
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    for client in clients:
+        output, _ = client.communicate()
+        if client.returncode != 0:
+            raise RuntimeError(f"un cliente terminó con código {client.returncode}")
+        result = json.loads(output.strip().splitlines()[-1])
+        for name, values in result["latencies"].items():
+            latencies.setdefault(name, []).extend(values)
+        for name, count in result["errors"].items():
+            errors[name] = errors.get(name, 0) + count
+    return summarize(latencies, errors, args.duration)
+
+
+async def measure_propagation(base_url: str, streams: int, rounds: int, timeout: float) -> Dict:
+    """Demora entre el 202 del webhook y la llegada del evento a cada flujo SSE"""
+    arrivals: List[asyncio.Queue] = [asyncio.Queue() for _ in range(streams)]
+    connected = 0
+
+    async def listen(queue: asyncio.Queue):
+        nonlocal connected
+        async with httpx.AsyncClient(base_url=base_url, timeout=None) as http:
+            async with http.stream("GET", "/api/events/") as response:
+                connected += 1
+                async for line in response.aiter_lines():
+                    if line.startswith("event: executions"):
+                        queue.put_nowait(time.perf_counter())
+
+    listeners = [asyncio.create_task(listen(queue)) for queue in arrivals]
+    delays: List[float] = []
+    reached: List[int] = []
+    try:
+        while connected < streams:
+            await asyncio.sleep(0.05)
+        async with httpx.AsyncClient(base_url=base_url, headers={"x-webhook-secret": WEBHOOK_SECRET}) as http:
+            workflow_id = (await http.get("/api/workflows/")).json()[0]["id"]
+            for i in range(rounds):
+                for queue in arrivals:
+                    while not queue.empty():
+                        queue.get_nowait()
+                response = await http.post(WEBHOOK_PATH, json={
+                    "execution_id": f"bw-propagation-{i}", "workflow_id": workflow_id, "status": "success"})
+                sent = time.perf_counter()
+                response.raise_for_status()
+                count = 0
+                for queue in arrivals:
+                    try:
+                        arrived = await asyncio.wait_for(queue.get(), max(0.0, sent + timeout - time.perf_counter()))
+                    except asyncio.TimeoutError:
+                        continue
+                    delays.append(max(0.0, arrived - sent))
+                    count += 1
+                reached.append(count)
+    finally:
+        for listener in listeners:
+            listener.cancel()
+        await asyncio.gather(*listeners, return_exceptions=True)
+
+    delays.sort()
+    return {
+        "streams": streams,
+        "rounds": rounds,
+        "min_streams_reached": min(reached) if reached else 0,
+        "p50_ms": round(percentile(delays, 50) * 1000, 2),
+        "p99_ms": round(percentile(delays, 99) * 1000, 2),
+        "max_ms": round(delays[-1] * 1000, 2) if delays else 0.0,
+    }
+
+
+def run_workers(args, workers: int, dataset: str) -> Dict:
+    # Cada N trabaja sobre una copia: los webhooks escriben en la base
+    workdir = tempfile.mkdtemp(prefix="bench-workers-")
+    db_path = os.path.join(workdir, "workers.db")
+    shutil.copyfile(dataset, db_path)
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = start_server(args, workers, db_path, os.path.join(workdir, "event_bus.db"))
+    try:
+        wait_ready(base_url, server, args.settle)
+        result = run_clients(args, base_url)
+        result["propagation"] = asyncio.run(
+            measure_propagation(base_url, args.streams, args.rounds, args.propagation_timeout))
+        return result
+    finally:
+        stop_server(server)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(args) -> int:
+    counts = [int(n) for n in args.workers.split(",")]
+    cpus = os.cpu_count() or 1
+    if cpus < max(counts) + args.clients:
+        print(f"AVISO: {cpus} CPU para hasta {max(counts)} workers y {args.clients} clientes; "
+              f"la aceleración medida no refleja el escalado real", file=sys.stderr)
+    os.makedirs(args.data_dir, exist_ok=True)
+    dataset = ensure_dataset(args.data_dir, args.scale)
+
+    report = {
+        "cpus": cpus,
+        "config": {
+            "scale": args.scale,
+            "clients": args.clients,
+            "connections_per_client": args.connections,
+            "duration_seconds": args.duration,
+            "webhook_ratio": args.webhook_ratio,
+        },
+        "workers": {},
+    }
+    print(f"{'workers':>8} {'req/s':>10} {'x':>6} {'p50 ms':>8} {'p99 ms':>8} {'errores':>8} "
+          f"{'SSE':>7} {'prop p99':>9}", file=sys.stderr)
+    baseline = None
+    for workers in counts:
+        result = run_workers(args, workers, dataset)
+        total = result["total"]
+        baseline = baseline or total["throughput_rps"]
+        result["speedup"] = round(total["throughput_rps"] / baseline, 2) if baseline else 0.0
+        report["workers"][str(workers)] = result
+        propagation = result["propagation"]
+        print(f"{workers:>8} {total['throughput_rps']:10.1f} {result['speedup']:6.2f} "
+              f"{total['p50_ms']:8.2f} {total['p99_ms']:8.2f} {total['errors']:8d} "
+              f"{propagation['min_streams_reached']:>3}/{propagation['streams']:<3} "
+              f"{propagation['p99_ms']:9.1f}", file=sys.stderr)
+
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(encoded + "\n")
+    print(encoded)
+    # Un flujo que no recibió algún evento significa que el bus no lo propagó
+    missed = [n for n, r in report["workers"].items()
+              if r["propagation"]["min_streams_reached"] < args.streams]
+    return 1 if missed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="cantidades de workers separadas por coma")
+    parser.add_argument("--scale", default="10k", choices=list(SCALES))
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "bench-load-data"))
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=2, help="Procesos cliente")
+    parser.add_argument("--connections", type=int, default=16, help="Conexiones por cliente")
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--settle", type=float, default=2.0,
+                        help="Espera tras el primer /health para que arranquen los demás workers")
+    parser.add_argument("--webhook-ratio", type=float, default=0.02)
+    parser.add_argument("--streams", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--propagation-timeout", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output")
+    parser.add_argument("--client", metavar="URL", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.client:
+        print(json.dumps(asyncio.run(drive(args))))
+    else:
+        sys.exit(main(args))
@@ -0,0 +1,122 @@
+"""
+Benchmark de las definiciones de workflows de n8n.
+
+Parte 1: validar una página de GET /workflows con el modelo completo
+(json.loads + N8NWorkflow) contra el resumen validado directo de los bytes
+(N8NWorkflowPage), con nodos de parámetros grandes.
+
+Parte 2: pedir el detalle de cada workflow al stub:
+  - sin cache (siempre se descarga)
+  - cache en memoria con el updatedAt vigente (no sale a la red)
+  - updatedAt desconocido: petición condicionada con If-None-Match (304)
+  - arranque en frío: cache nueva sobre la misma base (no se descarga nada)
+
+Uso (desde backend/):
+    python -m benchmarks.bench_workflow_definitions --workflows 50 --parameter-bytes 20000
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from app.database import Database
+from app.models import N8NWorkflow, N8NWorkflowPage
+from app.n8n_client import N8NClient
+from app.workflow_definitions import WorkflowDefinitionCache
+from .stub_n8n import StubN8N
+
+
+def measure(fn, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    # Pico de memoria en una pasada aparte: tracemalloc distorsiona los tiempos
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def bench_parse(stub: StubN8N, repeat: int):
+    body = json.dumps({"data": stub.workflows, "nextCursor": None}).encode()
+
+    def full():
+        return [N8NWorkflow(**w) for w in json.loads(body)["data"]]
+
+    def summary():
+        return N8NWorkflowPage.model_validate_json(body).data
+
+    print(f"página de {len(stub.workflows)} workflows, {len(body) / 1024:.0f} KiB")
+    print(f"{'validación':<28} {'ms/página':>10} {'pico KiB':>10}")
+    for label, fn in (("N8NWorkflow completo", full), ("N8NWorkflowSummary", summary)):
+        elapsed, peak = measure(fn, repeat)
+        print(f"{label:<28} {elapsed * 1000:10.2f} {peak / 1024:10.0f}")
+
+
+async def fetch_all(client: N8NClient, stub: StubN8N, updated_at: bool):
+    before_requests, before_304 = stub.requests, stub.not_modified
+    start = time.perf_counter()
+    sources = await asyncio.gather(*[
+        client.get_workflow_definition(w["id"], w["updatedAt"] if updated_at else None)
+        for w in stub.workflows
+    ])
+    elapsed = time.perf_counter() - start
+    return (elapsed, stub.requests - before_requests, stub.not_modified - before_304,
+            {d["source"] for d in sources})
+
+
+async def bench_detail(stub: StubN8N, db: Database):
+    print(f"\n{'detalle':<28} {'ms total':>10} {'peticiones':>11} {'304':>5}  origen")
+
+    def report(label, result):
+        elapsed, requests, not_modified, sources = result
+        print(f"{label:<28} {elapsed * 1000:10.1f} {requests:11d} {not_modified:5d}  "
+              f"{','.join(sorted(sources))}")
+
+    client = N8NClient(base_url=stub.base_url, api_key="")
+    try:
+        report("sin cache (abre conexiones)", await fetch_all(client, stub, updated_at=True))
+        report("sin cache", await fetch_all(client, stub, updated_at=True))
+    finally:
+        await client.aclose()
+
+    client = N8NClient(base_url=stub.base_url, api_key="", definitions=WorkflowDefinitionCache(db))
+    try:
+        report("primera descarga", await fetch_all(client, stub, updated_at=True))
+        report("cache (mismo updatedAt)", await fetch_all(client, stub, updated_at=True))
+        report("condicional (ETag)", await fetch_all(client, stub, updated_at=False))
+    finally:
+        await client.aclose()
+
+    client = N8NClient(base_url=stub.base_url, api_key="", definitions=WorkflowDefinitionCache(db))
+    try:
+        report("arranque en frío (base)", await fetch_all(client, stub, updated_at=True))
+    finally:
+        await client.aclose()
+
+
+def main(workflows: int, nodes: int, parameter_bytes: int, repeat: int):
+    stub = StubN8N(workflows=workflows, nodes_per_workflow=nodes, parameter_bytes=parameter_bytes)
+    bench_parse(stub, repeat)
+
+    tmpdir = tempfile.mkdtemp(prefix="bench-definitions-")
+    db = Database(os.path.join(tmpdir, "bench.db"))
+    with stub:
+        asyncio.run(bench_detail(stub, db))
+    db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workflows", type=int, default=50)
+    parser.add_argument("--nodes", type=int, default=20)
+    parser.add_argument("--parameter-bytes", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.workflows, args.nodes, args.parameter_bytes, args.repeat)
@@ -0,0 +1,85 @@
+"""
+Generador de datos sintéticos con el esquema de las migraciones de Database.
+
+Uso (desde backend/):
+    python -m benchmarks.datagen --db /tmp/bench.db --executions 1000000
+    python -m benchmarks.datagen --db /tmp/bench.db --scale 10m
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.database import Database
+
+STATUSES = ["success"] * 94 + ["error"] * 5 + ["running"]
+TRIGGERS = ["Webhook", "Schedule", "Manual"]
+# Tamaños de referencia para las pruebas de carga
+SCALES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+
+def populate(db: Database, executions: int, workflows: int = 50, days: int = 365,
+             chunk_size: int = 50000, seed: int = 42) -> float:
+    """Insertar workflows y ejecuciones aleatorias; devuelve los segundos empleados"""
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    now = datetime.now()
+
+    workflow_rows = [
+        (f"bench-wf-{i:04d}", f"bench-{i}", f"Bench Workflow {i}", "Benchmark",
+         rng.choice(["active", "active", "inactive", "error"]),
+         json.dumps(["Webhook"]), json.dumps(["Step"]))
+        for i in range(workflows)
+    ]
+    with db.get_connection() as conn:
+        conn.executemany('''
+            INSERT OR IGNORE INTO workflows (id, n8n_id, name, category, status, triggers, actions)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', workflow_rows)
+
+    span_ms = days * 24 * 3600 * 1000
+    inserted = 0
+    while inserted < executions:
+        batch = []
+        for i in range(inserted, min(inserted + chunk_size, executions)):
+            workflow_id, _, workflow_name = workflow_rows[rng.randrange(workflows)][:3]
+            status = rng.choice(STATUSES)
+            start = now - timedelta(milliseconds=rng.randrange(span_ms))
+            duration = rng.randint(200, 10000) if status != "running" else None
+            batch.append((
+                f"bench-exec-{i:09d}", workflow_id, workflow_name, f"bench-n8n-{i}", status,
+                start.isoformat(),
+                (start + timedelta(milliseconds=duration)).isoformat() if duration else None,
+                duration, rng.choice(TRIGGERS), rng.randint(0, 50),
+                "Simulated failure" if status == "error" else None,
+            ))
+        with db.get_connection() as conn:
+            conn.executemany('''
+                INSERT INTO executions (id, workflow_id, workflow_name, n8n_execution_id,
+                                        status, start_time, end_time, duration, triggered_by,
+                                        data_processed, error_message)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', batch)
+        inserted += len(batch)
+
+    # Sketches de duración armados igual que en la migración que los crea
+    with db.get_connection() as conn:
+        db._create_duration_sketches(conn.cursor())
+
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", required=True)
+    parser.add_argument("--executions", type=int, default=10000)
+    parser.add_argument("--scale", choices=SCALES, help="atajo para --executions")
+    parser.add_argument("--workflows", type=int, default=50)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    executions = SCALES[args.scale] if args.scale else args.executions
+    database = Database(args.db)
+    elapsed = populate(database, executions, args.workflows, args.days)
+    print(f"{executions} ejecuciones generadas en {elapsed:.1f}s -> {args.db}")
@@ -0,0 +1,243 @@
+"""
+Servidor n8n falso para benchmarks: expone la parte de la API pública que
+usa N8NClient, con latencia y tasa de errores configurables.
+
+Uso directo (desde backend/):
+    python -m benchmarks.stub_n8n --port 5678 --latency 0.02
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import random
+import re
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+def _now(timestamp: Optional[float] = None) -> str:
+    moment = datetime.now(timezone.utc) if timestamp is None else \
+        datetime.fromtimestamp(timestamp, timezone.utc)
+    return moment.isoformat().replace("+00:00", "Z")
+
+
+class StubN8N:
+    """Servidor HTTP en un hilo aparte que imita la API v1 de n8n"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 fail_rate: float = 0.0, workflows: int = 3, nodes_per_workflow: int = 5,
+                 parameter_bytes: int = 0, running_seconds: float = 0.0,
+                 execution_error_rate: float = 0.0):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        # Con running_seconds > 0 las ejecuciones quedan "running" ese tiempo antes de terminar
+        self.running_seconds = running_seconds
+        self.execution_error_rate = execution_error_rate
+        self.connections = 0
+        self.requests = 0
+        self.not_modified = 0
+        self.parameter_bytes = parameter_bytes
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.workflows: List[Dict[str, Any]] = [
+            self._make_workflow(str(i + 1), nodes_per_workflow) for i in range(workflows)
+        ]
+        self.executions: List[Dict[str, Any]] = []
+        self._finishes_at: Dict[str, float] = {}
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v1"
+
+    def _make_workflow(self, workflow_id: str, nodes: int) -> Dict[str, Any]:
+        timestamp = _now()
+        return {
+            "id": workflow_id,
+            "name": f"Stub Workflow {workflow_id}",
+            "active": True,
+            "createdAt": timestamp,
+            "updatedAt": timestamp,
+            "nodes": [
+                {"name": "Webhook" if n == 0 else f"Step {n}",
+                 "type": "n8n-nodes-base.webhook" if n == 0 else "n8n-nodes-base.set",
+                 "position": [n * 200, 0],
+                 "parameters": {"jsCode": "x" * self.parameter_bytes} if self.parameter_bytes else {}}
+                for n in range(nodes)
+            ],
+            "connections": {},
+            "settings": {},
+        }
+
+    def start(self) -> "StubN8N":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubN8N":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _paginate(self, items: List[Dict[str, Any]], query: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Paginación por cursor opaco, como la API pública de n8n"""
+        limit = int(query.get("limit", ["100"])[0])
+        offset = int(query.get("cursor", ["0"])[0])
+        next_offset = offset + limit
+        return {
+            "data": items[offset:next_offset],
+            "nextCursor": str(next_offset) if next_offset < len(items) else None,
+        }
+
+    def add_execution(self, workflow_id: str, running_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Registrar una ejecución; termina (success o error) pasados running_seconds"""
+        running_seconds = self.running_seconds if running_seconds is None else running_seconds
+        execution = {
+            "id": str(next(self._ids)),
+            "workflowId": workflow_id,
+            "status": "running" if running_seconds > 0 else "success",
+            "mode": "manual",
+            "startedAt": _now(),
+            "stoppedAt": None if running_seconds > 0 else _now(),
+        }
+        with self._lock:
+            if running_seconds > 0:
+                self._finishes_at[execution["id"]] = time.time() + running_seconds
+            self.executions.append(execution)
+            self._by_id[execution["id"]] = execution
+        return execution
+
+    def _advance(self, execution: Dict[str, Any]) -> Dict[str, Any]:
+        """Terminar la ejecución si ya pasó su tiempo (se llama con el lock tomado)"""
+        finishes_at = self._finishes_at.get(execution["id"])
+        if finishes_at is not None and time.time() >= finishes_at:
+            del self._finishes_at[execution["id"]]
+            failed = random.random() < self.execution_error_rate
+            execution["status"] = "error" if failed else "success"
+            execution["stoppedAt"] = _now(finishes_at)
+        return execution
+
+    def handle(self, method: str, path: str, query: Dict[str, List[str]],
+               body: Optional[Dict[str, Any]]):
+        """Resolver una petición y devolver (status, payload)"""
+        match = re.fullmatch(r"/api/v1/workflows/([^/]+)/execute", path)
+        if method == "POST" and match:
+            return 200, {"data": self.add_execution(match.group(1))}
+
+        match = re.fullmatch(r"/api/v1/workflows/([^/]+)", path)
+        if match:
+            workflow = next((w for w in self.workflows if w["id"] == match.group(1)), None)
+            if workflow is None:
+                return 404, {"message": "Not Found"}
+            if method == "PATCH" and body is not None:
+                workflow.update(body)
+                workflow["updatedAt"] = _now()
+            return 200, {"data": workflow}
+
+        if path == "/api/v1/workflows":
+            return 200, self._paginate(self.workflows, query)
+
+        if path == "/api/v1/executions":
+            # Más recientes primero, paginadas igual que los workflows
+            workflow_id = query.get("workflowId", [None])[0]
+            with self._lock:
+                data = [e for e in reversed(self.executions)
+                        if not workflow_id or e["workflowId"] == workflow_id]
+                page = self._paginate(data, query)
+                page["data"] = [dict(self._advance(e)) for e in page["data"]]
+            return 200, page
+
+        match = re.fullmatch(r"/api/v1/executions/([^/]+)", path)
+        if match:
+            # Como la API pública: la ejecución sin envoltorio "data"
+            with self._lock:
+                execution = self._by_id.get(match.group(1))
+                if execution is None:
+                    return 404, {"message": "Not Found"}
+                return 200, dict(self._advance(execution))
+
+        return 404, {"message": "Not Found"}
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Evitar esperas de Nagle en conexiones keep-alive
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with stub._lock:
+                    stub.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def _dispatch(self):
+                with stub._lock:
+                    stub.requests += 1
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                if stub.fail_rate and random.random() < stub.fail_rate:
+                    status, payload = 503, {"message": "Service Unavailable"}
+                else:
+                    url = urlparse(self.path)
+                    body = json.loads(raw) if raw else None
+                    status, payload = stub.handle(self.command, url.path, parse_qs(url.query), body)
+
+                encoded = json.dumps(payload).encode()
+                # ETag débil y 304 para GET, como hace Express (el servidor de n8n)
+                etag = None
+                if self.command == "GET" and status == 200:
+                    etag = f'W/"{len(encoded):x}-{hashlib.sha1(encoded).hexdigest()[:27]}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        with stub._lock:
+                            stub.not_modified += 1
+                        status, encoded = 304, b""
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(encoded)))
+                    if etag:
+                        self.send_header("ETag", etag)
+                    self.end_headers()
+                    self.wfile.write(encoded)
+                except (BrokenPipeError, ConnectionResetError):
+                    # El cliente se cansó de esperar (timeout): no hay a quién responder
+                    self.close_connection = True
+
+            do_GET = do_POST = do_PATCH = _dispatch
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=5678)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--workflows", type=int, default=3)
+    args = parser.parse_args()
+
+    stub = StubN8N(port=args.port, latency=args.latency, fail_rate=args.fail_rate,
+                   workflows=args.workflows)
+    print(f"Stub n8n escuchando en {stub.base_url}")
+    stub._server.serve_forever()
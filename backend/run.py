@@ -1,10 +1,31 @@
+import argparse
+import os
 import uvicorn
-from app.main import app
+from app.config import load_config
 
 if __name__ == "__main__":
+    load_config()
+    parser = argparse.ArgumentParser(
+        description="Levantar la API: un proceso con recarga (desarrollo) o varios workers (producción)"
+    )
+    parser.add_argument("--host", default="127.0.0.1")  # 👈 Cambiar aquí
+    parser.add_argument("--port", type=int, default=int(os.getenv("API_PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("API_WORKERS", 1)),
+                        help="Procesos de uvicorn; con más de uno se coordinan por EVENT_BUS_PATH")
+    parser.add_argument("--reload", action=argparse.BooleanOptionalAction, default=None,
+                        help="Recargar al cambiar el código (por defecto sólo con un worker)")
+    args = parser.parse_args()
+    
+    reload = args.workers == 1 if args.reload is None else args.reload
+    if reload and args.workers > 1:
+        parser.error("--reload no se puede combinar con varios workers")
+    
+    # Los workers heredan el entorno: así saben que tienen que usar el bus compartido
+    os.environ["API_WORKERS"] = str(args.workers)
     uvicorn.run(
         "app.main:app",
-        host="127.0.0.1",  # 👈 Cambiar aquí
-        port=8000,
-        reload=True
-    )
\ No newline at end of file
+        host=args.host,
+        port=args.port,
+        reload=reload,
+        workers=args.workers
+    )
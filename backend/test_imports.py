@@ -12,9 +12,15 @@ try:
     import requests
     print("✅ requests: OK")
     
+    import httpx
+    print("✅ httpx: OK")
+    
     import pydantic
     print("✅ pydantic: OK")
     
+    import psycopg, psycopg_pool
+    print("✅ psycopg: OK (sólo necesario con PostgreSQL)")
+    
     from dotenv import load_dotenv
     print("✅ python-dotenv: OK")
     
@@ -0,0 +1,39 @@
+"""
+Fixtures compartidas.
+
+storage_url / storage parametrizan un test sobre SQLite (archivo temporal) y
+PostgreSQL. Para PostgreSQL hace falta TEST_POSTGRES_URL, por ejemplo
+postgresql://postgres@localhost/test; cada test usa un schema propio que se
+borra al terminar. Sin la variable, o si el servidor no responde, esos casos
+se saltan.
+"""
+import os
+
+import pytest
+
+from app.database import create_database
+from benchmarks.bench_storage import isolated_url
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def storage_url(request, tmp_path):
+    if request.param == "sqlite":
+        yield f"sqlite:///{tmp_path / 'storage.db'}"
+        return
+
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL no está definida")
+    try:
+        url, cleanup = isolated_url(url)
+    except Exception as e:
+        pytest.skip(f"PostgreSQL no disponible: {e}")
+    yield url
+    cleanup()
+
+
+@pytest.fixture
+def storage(storage_url):
+    db = create_database(storage_url)
+    yield db
+    db.close()
@@ -0,0 +1,77 @@
+"""
+POST /api/workflows/execute/batch: el lote sigue y se registra aunque el
+cliente deje de leer la respuesta.
+
+Uso (desde backend/):
+    python -m pytest tests/test_batch_execute.py
+"""
+import asyncio
+import itertools
+import json
+
+from app.database import create_database
+from app.models import BatchExecutionItem, BatchExecutionRequest
+from app.routers import workflows
+
+
+class SlowN8N:
+    """Imita N8NClient.execute_workflow: cada ejecución tarda delay segundos"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.started = 0
+        self.finished = 0
+        self._ids = itertools.count(1)
+
+    async def execute_workflow(self, workflow_id, payload=None):
+        self.started += 1
+        await asyncio.sleep(self.delay)
+        self.finished += 1
+        return {"data": {"id": str(next(self._ids)), "status": "success"}}
+
+
+def test_batch_is_recorded_when_client_disconnects(tmp_path):
+    db = create_database(f"sqlite:///{tmp_path / 'batch.db'}")
+    db.seed_sample_data()
+    n8n = SlowN8N(delay=0.05)
+    request = BatchExecutionRequest(
+        items=[BatchExecutionItem(workflow_id=f"wf-00{i % 3 + 1}") for i in range(6)],
+        parallelism=2
+    )
+
+    async def scenario():
+        response = await workflows.execute_workflows_batch(request, n8n_client=n8n, db=db)
+        body = response.body_iterator
+        first = json.loads(await body.__anext__())
+        # El cliente se va después de la primera línea
+        await body.aclose()
+        await workflows.wait_for_batches()
+        return first
+
+    try:
+        first = asyncio.run(scenario())
+        assert first["success"]
+        assert n8n.started == n8n.finished == 6
+        recorded = [e for e in db.get_executions(limit=500) if e.triggered_by == "Batch"]
+        assert len(recorded) == 6
+    finally:
+        db.close()
+
+
+def test_batch_streams_every_result_and_summary(tmp_path):
+    db = create_database(f"sqlite:///{tmp_path / 'batch.db'}")
+    db.seed_sample_data()
+    request = BatchExecutionRequest(
+        items=[BatchExecutionItem(workflow_id="wf-001"), BatchExecutionItem(workflow_id="nope")]
+    )
+
+    async def scenario():
+        response = await workflows.execute_workflows_batch(request, n8n_client=SlowN8N(0), db=db)
+        return [json.loads(line) async for line in response.body_iterator]
+
+    try:
+        lines = asyncio.run(scenario())
+        assert sorted(line["index"] for line in lines[:-1]) == [0, 1]
+        assert lines[-1] == {"summary": {"total": 2, "succeeded": 1, "failed": 1, "recorded": 1}}
+    finally:
+        db.close()
@@ -0,0 +1,281 @@
+"""
+N8NClient contra httpx.MockTransport (respuestas controladas) y contra el
+servidor stub de benchmarks/stub_n8n.py (conexiones y timeouts reales).
+
+Uso (desde backend/):
+    python -m pytest tests/test_n8n_client.py
+"""
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from app.circuit_breaker import CircuitBreaker
+from app.n8n_client import UNAVAILABLE_RETRY_AFTER, N8NClient, N8NUnavailableError
+from benchmarks.stub_n8n import StubN8N
+
+BASE_URL = "http://n8n.test/api/v1"
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def make_client(handler=None, **kwargs) -> N8NClient:
+    """Cliente sin espera entre reintentos, sin datos mock y con un breaker propio"""
+    options = {
+        "base_url": BASE_URL,
+        "api_key": "test-key",
+        "max_retries": 3,
+        "backoff_base": 0.0,
+        "mock_data": False,
+        "breaker": CircuitBreaker("n8n-test", failure_threshold=50, reset_timeout=30),
+    }
+    if handler is not None:
+        options["transport"] = httpx.MockTransport(handler)
+    options.update(kwargs)
+    return N8NClient(**options)
+
+
+class Responses:
+    """Handler de MockTransport que devuelve los status en orden y cuenta las llamadas"""
+
+    def __init__(self, *statuses, body=None):
+        self.statuses = list(statuses)
+        self.body = body if body is not None else {"data": []}
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        if isinstance(status, Exception):
+            raise status
+        return httpx.Response(status, json=self.body if status < 400 else {"message": "error"})
+
+
+def test_retries_idempotent_request_until_success():
+    handler = Responses(503, 502, 200, body={"data": [{"id": "1"}]})
+
+    async def scenario():
+        client = make_client(handler)
+        try:
+            return await client._make_request("GET", "/executions")
+        finally:
+            await client.aclose()
+
+    assert run(scenario()) == {"data": [{"id": "1"}]}
+    assert len(handler.requests) == 3
+    assert handler.requests[0].headers["X-N8N-API-KEY"] == "test-key"
+
+
+def test_gives_up_after_max_retries():
+    handler = Responses(503)
+
+    async def scenario():
+        client = make_client(handler, max_retries=2)
+        try:
+            await client._make_request("GET", "/executions")
+        finally:
+            await client.aclose()
+
+    with pytest.raises(N8NUnavailableError):
+        run(scenario())
+    assert len(handler.requests) == 3
+
+
+def test_post_is_not_retried_after_it_was_sent():
+    handler = Responses(503, 200)
+
+    async def scenario():
+        client = make_client(handler)
+        try:
+            await client.execute_workflow("1")
+        finally:
+            await client.aclose()
+
+    with pytest.raises(N8NUnavailableError):
+        run(scenario())
+    assert len(handler.requests) == 1
+
+
+def test_post_is_retried_when_connection_failed():
+    # Si no se pudo conectar la petición no llegó a N8N: repetirla no duplica la ejecución
+    handler = Responses(httpx.ConnectError("refused"), 200, body={"data": {"id": "9"}})
+
+    async def scenario():
+        client = make_client(handler)
+        try:
+            return await client.execute_workflow("1", {"order": 1})
+        finally:
+            await client.aclose()
+
+    assert run(scenario()) == {"data": {"id": "9"}}
+    assert len(handler.requests) == 2
+    assert json.loads(handler.requests[-1].content) == {"order": 1}
+
+
+def test_client_errors_are_raised_and_do_not_trip_the_breaker():
+    handler = Responses(404)
+    client = make_client(handler)
+
+    async def scenario():
+        try:
+            missing = await client.get_execution("404")
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.activate_workflow("404")
+            return missing
+        finally:
+            await client.aclose()
+
+    assert run(scenario()) is None
+    # 4xx no se reintenta ni cuenta como caída de N8N
+    assert len(handler.requests) == 2
+    assert client.breaker.consecutive_failures == 0
+
+
+def test_open_circuit_rejects_without_calling_n8n():
+    handler = Responses(503)
+    breaker = CircuitBreaker("n8n-test", failure_threshold=2, reset_timeout=30)
+    client = make_client(handler, max_retries=0, breaker=breaker)
+
+    async def scenario():
+        try:
+            for _ in range(2):
+                with pytest.raises(N8NUnavailableError):
+                    await client._make_request("GET", "/executions")
+            with pytest.raises(N8NUnavailableError) as rejected:
+                await client._make_request("GET", "/executions")
+            return rejected.value
+        finally:
+            await client.aclose()
+
+    error = run(scenario())
+    assert breaker.is_open
+    assert len(handler.requests) == 2
+    assert 0 < error.retry_after <= 30
+
+
+def test_in_flight_requests_are_limited():
+    active = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return httpx.Response(200, json={"data": []})
+
+    async def scenario():
+        client = make_client(handler, max_in_flight=3)
+        try:
+            await asyncio.gather(*[client._make_request("GET", "/executions") for _ in range(12)])
+        finally:
+            await client.aclose()
+
+    run(scenario())
+    assert peak == 3
+
+
+def test_connections_are_reused_across_requests():
+    with StubN8N() as stub:
+        async def scenario():
+            client = make_client(base_url=stub.base_url, max_connections=2, max_in_flight=2)
+            try:
+                for _ in range(3):
+                    await asyncio.gather(*[client.get_execution("1") for _ in range(10)])
+            finally:
+                await client.aclose()
+
+        stub.add_execution("1")
+        run(scenario())
+        assert stub.requests == 30
+        assert stub.connections <= 2
+
+
+def test_per_call_timeout_is_enforced():
+    with StubN8N(latency=0.5) as stub:
+        async def scenario():
+            client = make_client(base_url=stub.base_url, max_retries=0)
+            try:
+                await client._make_request("GET", "/workflows", timeout=0.05)
+            finally:
+                await client.aclose()
+
+        started = time.perf_counter()
+        with pytest.raises(N8NUnavailableError):
+            run(scenario())
+        assert time.perf_counter() - started < 0.4
+
+
+def test_retry_after_is_short_while_the_circuit_is_closed():
+    handler = Responses(503)
+    breaker = CircuitBreaker("n8n-test", failure_threshold=5, reset_timeout=30)
+    client = make_client(handler, max_retries=0, breaker=breaker)
+
+    async def scenario():
+        try:
+            await client._make_request("GET", "/executions")
+        finally:
+            await client.aclose()
+
+    with pytest.raises(N8NUnavailableError) as error:
+        run(scenario())
+    assert not breaker.is_open
+    assert error.value.retry_after == UNAVAILABLE_RETRY_AFTER
+
+
+def test_stale_list_responses_keep_their_labels():
+    handler = Responses(200, 503, body={"data": [{"id": "1", "name": "Uno", "active": True}]})
+    client = make_client(handler, max_retries=0)
+
+    async def scenario():
+        try:
+            return await client.get_workflows(), await client.get_workflows()
+        finally:
+            await client.aclose()
+
+    live, stale = run(scenario())
+    assert [w.id for w in live["data"]] == ["1"] and "stale" not in live
+    assert [w.id for w in stale["data"]] == ["1"]
+    assert stale["stale"] is True and stale["fetched_at"]
+
+
+def test_invalid_workflows_are_skipped_not_the_whole_page():
+    page = {"data": [{"id": "1", "name": "Uno", "active": True},
+                     {"id": "2", "name": "Dos", "active": "maybe"},
+                     {"id": "3", "name": "Tres", "active": False, "nodes": [{"type": "x"}]}],
+            "nextCursor": None}
+    handler = Responses(200, body=page)
+    client = make_client(handler)
+
+    async def scenario():
+        try:
+            return [w.id for batch in [b async for b in client.iter_workflow_pages()] for w in batch]
+        finally:
+            await client.aclose()
+
+    assert run(scenario()) == ["1", "3"]
+    assert len(handler.requests) == 1
+    assert client.breaker.consecutive_failures == 0
+
+
+def test_unreadable_body_is_raised_without_counting_as_an_outage():
+    def handler(request):
+        return httpx.Response(200, content=b"<html>proxy</html>")
+
+    client = make_client(handler, mock_data=True)
+
+    async def scenario():
+        try:
+            await client._make_request("GET", "/workflows", allow_stale=True)
+        finally:
+            await client.aclose()
+
+    # Ni datos mock ni reintentos: el error es del contenido, no de la disponibilidad
+    with pytest.raises(ValueError):
+        run(scenario())
+    assert client.breaker.consecutive_failures == 0
@@ -0,0 +1,60 @@
+"""
+ExecutionReconciler: un ciclo aplica lo que pudo consultar aunque algunas
+consultas a N8N fallen.
+
+Uso (desde backend/):
+    python -m pytest tests/test_reconciler.py
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from app.database import create_database
+from app.n8n_client import N8NUnavailableError
+from app.reconciler import ExecutionReconciler
+
+STARTED = datetime.now() - timedelta(minutes=5)
+
+
+def n8n_execution(execution_id: str, status: str) -> dict:
+    return {"id": execution_id, "status": status,
+            "startedAt": STARTED.isoformat(), "stoppedAt": datetime.now().isoformat()}
+
+
+class FlakyN8N:
+    """Una página con la ejecución 1; las consultas sueltas de 2 y 3 fallan de distinta forma"""
+
+    async def iter_execution_pages(self, page_size=100, workflow_id=None):
+        yield [n8n_execution("1", "success")]
+
+    async def get_execution(self, execution_id):
+        if execution_id == "2":
+            raise N8NUnavailableError("N8N no está disponible (timeout)", retry_after=5)
+        if execution_id == "3":
+            raise RuntimeError("respuesta inesperada")
+        return n8n_execution(execution_id, "error")
+
+
+def test_failed_lookups_do_not_discard_the_rest_of_the_cycle(tmp_path):
+    db = create_database(f"sqlite:///{tmp_path / 'reconcile.db'}")
+    db.seed_sample_data()
+    db.insert_executions([{
+        "id": f"exec-flight-{n}", "workflow_id": "wf-001",
+        "workflow_name": "E-commerce Order Processing", "n8n_execution_id": str(n),
+        "status": "running", "start_time": STARTED.isoformat(), "end_time": None,
+        "duration": None, "triggered_by": "Manual", "data_processed": 0, "error_message": None,
+    } for n in range(1, 5)])
+    reconciler = ExecutionReconciler(db, FlakyN8N(), interval=0.01)
+
+    try:
+        result = asyncio.run(reconciler.run_once())
+        assert result["updated"] == 2
+        assert result["lookups"] == 3
+        assert result["lookup_errors"] == 2
+
+        statuses = {e.id: e.status for e in db.get_executions(workflow_id="wf-001", limit=500)}
+        assert statuses["exec-flight-1"] == "success"
+        assert statuses["exec-flight-4"] == "error"
+        # Las que fallaron quedan en curso para el próximo ciclo
+        assert statuses["exec-flight-2"] == statuses["exec-flight-3"] == "running"
+    finally:
+        db.close()
@@ -0,0 +1,61 @@
+"""
+El JSON armado directo desde filas es el mismo que produciría response_model.
+
+Uso (desde backend/):
+    python -m pytest tests/test_serialization.py
+"""
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app import serialization
+from app.models import Execution, Workflow
+from app.serialization import EXECUTION_FIELDS, WORKFLOW_FIELDS, encode_executions, encode_workflows
+
+TIMESTAMPS = [
+    "2024-01-15T10:00:00.000Z",
+    "2024-01-15T10:00:00+00:00",
+    "2024-01-15T10:00:00.250-03:00",
+    "2024-01-15 10:00:00",
+    "2024-01-15T10:00:00",
+    "2024-01-15T10:00:00.123456",
+    datetime(2024, 1, 15, 10, 0, tzinfo=timezone.utc),
+    datetime(2024, 1, 15, 10, 0, 0, 500),
+]
+
+
+@pytest.fixture(params=["orjson", "json"])
+def encoder(request, monkeypatch):
+    """Con orjson y con la biblioteca estándar (orjson es opcional)"""
+    if request.param == "json":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson no está instalado")
+
+
+@pytest.mark.parametrize("timestamp", TIMESTAMPS)
+def test_workflow_rows_match_response_model(encoder, timestamp):
+    row = {
+        "name": "Sync", "description": None, "category": "General", "status": "active",
+        "id": "n8n-1", "n8n_id": "1", "created_at": timestamp, "updated_at": timestamp,
+        "last_execution": None, "total_executions": 3, "success_rate": 66.7,
+        "avg_execution_time": 1200.5, "time_saved_hours": 0.0,
+        "triggers": '["Webhook"]', "actions": "[]",
+    }
+    expected = Workflow(**{**row, "triggers": ["Webhook"], "actions": []}).model_dump_json()
+    encoded = encode_workflows([tuple(row[field] for field in WORKFLOW_FIELDS)])
+    assert json.loads(encoded) == [json.loads(expected)]
+
+
+@pytest.mark.parametrize("timestamp", TIMESTAMPS)
+def test_execution_rows_match_response_model(encoder, timestamp):
+    row = {
+        "workflow_id": "wf-001", "status": "success", "triggered_by": "Manual",
+        "data_processed": 2, "id": "exec-1", "workflow_name": "Sync",
+        "start_time": timestamp, "end_time": timestamp, "duration": 0.0,
+        "error_message": None, "n8n_execution_id": "9",
+    }
+    expected = Execution(**row).model_dump_json()
+    encoded = encode_executions([tuple(row[field] for field in EXECUTION_FIELDS)])
+    assert json.loads(encoded) == [json.loads(expected)]
@@ -0,0 +1,253 @@
+"""
+Contrato de StorageBackend: las mismas comprobaciones contra SQLite y
+PostgreSQL (fixture storage en conftest.py).
+
+Uso (desde backend/):
+    python -m pytest tests/test_storage_contract.py
+    TEST_POSTGRES_URL=postgresql://postgres@localhost/test python -m pytest tests/test_storage_contract.py
+"""
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.archive import ExecutionArchiver
+from app.database import StorageBackend, create_database
+from app.models import DashboardStats, Execution, Workflow
+
+WORKFLOW = {
+    "id": "wf-contract", "n8n_id": "900", "name": "Contract Workflow", "status": "active",
+    "created_at": None, "triggers": "[]", "actions": "[]",
+    "n8n_updated_at": "2026-01-01T00:00:00.000Z",
+}
+# Hora en punto anterior: todas las ejecuciones de prueba caen en buckets cerrados
+BASE_TIME = datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=3)
+
+
+def execution(index: int, status: str = "success", start_time: datetime = None,
+              duration: float = 1000.0, n8n_execution_id: str = None) -> dict:
+    start_time = start_time or BASE_TIME + timedelta(minutes=5 * index)
+    finished = status in ("success", "error")
+    return {
+        "id": f"exec-contract-{index:04d}",
+        "workflow_id": WORKFLOW["id"],
+        "workflow_name": WORKFLOW["name"],
+        "n8n_execution_id": n8n_execution_id,
+        "status": status,
+        "start_time": start_time.isoformat(),
+        "end_time": (start_time + timedelta(milliseconds=duration)).isoformat() if finished else None,
+        "duration": duration if finished else None,
+        "triggered_by": "Manual",
+        "data_processed": 1,
+        "error_message": "boom" if status == "error" else None,
+    }
+
+
+def contract_workflow(db: StorageBackend) -> Workflow:
+    return next(w for w in db.get_workflows() if w.id == WORKFLOW["id"])
+
+
+def test_backend_missing_methods_fails_on_creation():
+    class Incomplete(StorageBackend):
+        def close(self):
+            pass
+
+    with pytest.raises(TypeError, match="abstract"):
+        Incomplete()
+
+
+def test_migrations_run_once_in_order(storage_url):
+    db = create_database(storage_url, migrate=False)
+    try:
+        assert db.get_schema_version() == 0
+        assert db.migrate() == list(range(1, len(db.MIGRATIONS) + 1))
+        assert db.get_schema_version() == len(db.MIGRATIONS)
+        assert db.migrate() == []
+    finally:
+        db.close()
+
+    # Otro proceso que arranca sobre la misma base no vuelve a migrar
+    again = create_database(storage_url)
+    try:
+        assert again.get_schema_version() == len(again.MIGRATIONS)
+        assert again.migrate() == []
+    finally:
+        again.close()
+
+
+def test_reads_return_shared_models(storage):
+    storage.seed_sample_data()
+
+    workflows = storage.get_workflows()
+    assert {w.id for w in workflows} == {"wf-001", "wf-002", "wf-003"}
+    assert all(isinstance(w, Workflow) for w in workflows)
+    assert [w.id for w in storage.get_workflows(category="e-commerce")] == ["wf-001"]
+    assert [w.id for w in storage.get_workflows(status="error")] == ["wf-003"]
+
+    stats = storage.get_dashboard_stats()
+    assert isinstance(stats, DashboardStats)
+    assert stats.total_workflows == 3
+    assert all(isinstance(e, Execution) for e in storage.get_executions(limit=5))
+
+    assert set(storage.resolve_workflows(["wf-001", "2", "missing"])) == {"wf-001", "2"}
+
+
+def test_insert_executions_skips_duplicates_and_notifies(storage):
+    storage.upsert_workflows([WORKFLOW])
+    events = []
+    storage.add_listener(lambda event, payload: events.append((event, len(payload))))
+
+    rows = [execution(i, n8n_execution_id=f"n8n-{i}") for i in range(10)]
+    assert storage.insert_executions(rows) == 10
+    # Mismo id o mismo n8n_execution_id: no se duplica
+    assert storage.insert_executions(rows[:5] + [dict(rows[6], id="exec-other")]) == 0
+    assert storage.insert_executions([execution(10)]) == 1
+
+    assert events == [("executions_inserted", 10), ("executions_inserted", 1)]
+    assert storage.get_known_n8n_execution_ids(["n8n-1", "n8n-99"]) == {"n8n-1"}
+    assert contract_workflow(storage).total_executions == 11
+
+
+def test_keyset_pagination_returns_every_row_once(storage):
+    storage.upsert_workflows([WORKFLOW])
+    # De a pares con el mismo start_time: el cursor desempata por id
+    rows = [execution(i, status="error" if i % 3 == 0 else "success",
+                      start_time=BASE_TIME + timedelta(minutes=i // 2)) for i in range(125)]
+    storage.insert_executions(rows)
+
+    def walk(**filters):
+        seen, cursor = [], None
+        while True:
+            page, cursor = storage.get_executions_page(limit=20, cursor=cursor, **filters)
+            seen.extend(e.id for e in page)
+            if cursor is None:
+                return seen
+
+    expected = [r["id"] for r in sorted(rows, key=lambda r: (r["start_time"], r["id"]), reverse=True)]
+    assert walk() == expected
+    assert walk(status="error") == [i for i in expected if int(i[-4:]) % 3 == 0]
+
+    # start_time de cada par: minuto i // 2
+    start, end = BASE_TIME + timedelta(minutes=10), BASE_TIME + timedelta(minutes=20)
+    window = walk(workflow_id=WORKFLOW["id"], start_time=start, end_time=end)
+    assert window == [i for i in expected if 20 <= int(i[-4:]) < 40]
+
+
+def test_rollups_follow_inserts_and_status_updates(storage):
+    storage.upsert_workflows([WORKFLOW])
+    before = storage.get_dashboard_stats().total_executions
+    statuses = ["success"] * 12 + ["error"] * 4 + ["running"] * 4
+    rows = [execution(i, status) for i, status in enumerate(statuses)]
+    storage.insert_executions(rows)
+
+    workflow = contract_workflow(storage)
+    assert workflow.total_executions == 20
+    assert workflow.success_rate == 75.0
+    assert workflow.avg_execution_time == 1000.0
+    assert storage.get_dashboard_stats().total_executions == before + 20
+
+    series = storage.get_timeseries("hour", BASE_TIME, BASE_TIME + timedelta(hours=3),
+                                    workflow_id=WORKFLOW["id"])
+    assert sum(point.executions for point in series) == 20
+    assert sum(point.successes for point in series) == 12
+    assert sum(point.errors for point in series) == 4
+    # 5 minutos entre ejecuciones: 12 por hora
+    assert [point.executions for point in series if point.executions] == [12, 8]
+
+    updates = [{"id": row["id"], "status": "success", "end_time": datetime.now(),
+                "duration": 3000.0, "error_message": None} for row in rows[-4:]]
+    assert storage.update_execution_statuses(updates) == 4
+    # Ya terminadas: repetir no cambia nada
+    assert storage.update_execution_statuses(updates) == 0
+    assert not [e for e in storage.get_inflight_executions() if e["workflow_id"] == WORKFLOW["id"]]
+
+    workflow = contract_workflow(storage)
+    assert workflow.success_rate == 80.0
+    assert workflow.avg_execution_time == 1400.0
+    series = storage.get_timeseries("hour", BASE_TIME, BASE_TIME + timedelta(hours=3),
+                                    workflow_id=WORKFLOW["id"])
+    assert sum(point.successes for point in series) == 16
+
+
+def test_execution_events_are_idempotent(storage):
+    storage.upsert_workflows([WORKFLOW])
+    started = execution(1, "running", n8n_execution_id="n8n-event")
+    assert storage.record_execution_events([started]) == (1, 0)
+
+    finished = dict(execution(1, "error", n8n_execution_id="n8n-event"), id="exec-event-copy")
+    assert storage.record_execution_events([finished]) == (0, 1)
+    assert storage.record_execution_events([finished]) == (0, 0)
+    assert contract_workflow(storage).total_executions == 1
+    assert contract_workflow(storage).success_rate == 0.0
+
+
+def test_table_versions_change_only_on_writes(storage):
+    storage.upsert_workflows([WORKFLOW])
+    version = storage.get_table_version("workflows")
+    storage.get_workflows()
+    assert storage.get_table_version("workflows") == version
+
+    storage.set_workflow_status("900", "inactive")
+    assert storage.get_table_version("workflows") > version
+    version = storage.get_table_version("workflows")
+
+    storage.upsert_workflows([dict(WORKFLOW, name="Renamed")])
+    assert storage.get_table_version("workflows") > version
+    assert storage.get_workflow_watermarks()["900"] == WORKFLOW["n8n_updated_at"]
+    assert not storage.set_workflow_status("missing", "active")
+
+
+def test_leases_are_exclusive_until_released_or_expired(storage):
+    assert storage.try_acquire_lease("sync", "worker-a", ttl=60)
+    assert not storage.try_acquire_lease("sync", "worker-b", ttl=60)
+    # El dueño puede renovarlo
+    assert storage.try_acquire_lease("sync", "worker-a", ttl=60)
+
+    storage.release_lease("sync", "worker-a")
+    assert storage.try_acquire_lease("sync", "worker-b", ttl=0.05)
+    time.sleep(0.1)
+    assert storage.try_acquire_lease("sync", "worker-a", ttl=60)
+    # Liberar un lease ajeno no hace nada
+    storage.release_lease("sync", "worker-b")
+    assert not storage.try_acquire_lease("sync", "worker-b", ttl=60)
+
+
+def test_archive_months_split_on_space_separated_timestamps(storage, tmp_path):
+    storage.upsert_workflows([WORKFLOW])
+    # Con espacio como CURRENT_TIMESTAMP y las filas anteriores a las migraciones
+    storage.insert_executions([
+        dict(execution(1), start_time="2020-04-30T23:00:00", end_time=None),
+        dict(execution(2), start_time="2020-05-01 08:00:00", end_time=None),
+    ])
+    archiver = ExecutionArchiver(storage, str(tmp_path / "archive"))
+
+    assert storage.get_execution_months(datetime(2020, 5, 1)) == ["2020-04"]
+    assert archiver.archive_month("2020-04")["rows"] == 1
+    assert archiver.archive_month("2020-05")["rows"] == 1
+    assert [a["month"] for a in storage.get_execution_archives()] == ["2020-04", "2020-05"]
+
+
+def test_archive_is_not_committed_if_a_status_changed_after_export(storage, tmp_path, monkeypatch):
+    storage.upsert_workflows([WORKFLOW])
+    running = dict(execution(1, "running"), start_time="2020-04-10T10:00:00")
+    storage.insert_executions([running, dict(execution(2), start_time="2020-04-11T10:00:00")])
+    export = storage.iter_execution_rows
+
+    def export_then_finish(*args, **kwargs):
+        yield from export(*args, **kwargs)
+        storage.update_execution_statuses([{"id": running["id"], "status": "success",
+                                            "end_time": datetime(2020, 4, 10, 10, 1),
+                                            "duration": 60000.0, "error_message": None}])
+
+    monkeypatch.setattr(storage, "iter_execution_rows", export_then_finish)
+    archive_dir = tmp_path / "archive"
+    archiver = ExecutionArchiver(storage, str(archive_dir))
+    with pytest.raises(RuntimeError, match="cambió"):
+        archiver.archive_month("2020-04")
+    assert list(archive_dir.iterdir()) == []
+    assert storage.get_execution_archives() == []
+
+    # El próximo intento archiva el estado actual
+    monkeypatch.setattr(storage, "iter_execution_rows", export)
+    assert archiver.archive_month("2020-04")["rows"] == 2
+    assert storage.get_execution_months(datetime(2020, 5, 1)) == []
@@ -0,0 +1,109 @@
+"""
+Webhook de ejecuciones de N8N: sin secreto configurado no acepta nada, y un
+lote que no se pudo guardar se reintenta o queda en el spool en disco.
+
+Uso (desde backend/):
+    python -m pytest tests/test_webhooks.py
+"""
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database import create_database
+from app.models import ExecutionEvent
+from app.routers import webhooks as webhooks_router
+from app.webhooks import ExecutionEventWriter, read_spool, verify_webhook_secret
+
+EVENT = {"execution_id": "501", "workflow_id": "wf-001", "status": "success"}
+
+
+class FailingDatabase:
+    """Delegar en db, pero record_execution_events falla las primeras `failures` veces"""
+
+    def __init__(self, db, failures: int):
+        self.db = db
+        self.failures = failures
+        self.calls = 0
+
+    def record_execution_events(self, records):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("database is locked")
+        return self.db.record_execution_events(records)
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = create_database(f"sqlite:///{tmp_path / 'webhooks.db'}")
+    db.seed_sample_data()
+    yield db
+    db.close()
+
+
+def webhook_rows(db):
+    rows, _ = db.get_executions_page(limit=50, triggered_by="webhook")
+    return {row.n8n_execution_id: row.status.value for row in rows}
+
+
+def ingest(writer: ExecutionEventWriter, events):
+    async def scenario():
+        writer.start()
+        accepted = writer.accept([ExecutionEvent(**event) for event in events])
+        await writer.stop()
+        return accepted
+
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("secret, header", [("", None), ("", "algo"), ("s3", None), ("s3", "otro")])
+def test_requests_without_the_configured_secret_are_rejected(monkeypatch, secret, header):
+    monkeypatch.setenv("N8N_WEBHOOK_SECRET", secret)
+    app = FastAPI()
+    app.include_router(webhooks_router.router)
+    headers = {"x-webhook-secret": header} if header is not None else {}
+
+    response = TestClient(app).post("/api/webhooks/n8n/executions", json=EVENT, headers=headers)
+    assert response.status_code == 401
+
+
+def test_matching_secret_is_accepted(monkeypatch):
+    monkeypatch.setenv("N8N_WEBHOOK_SECRET", "s3")
+    assert verify_webhook_secret("s3")
+    assert not verify_webhook_secret("s3 ")
+
+
+def test_failed_batch_is_retried_after_the_202(db):
+    flaky = FailingDatabase(db, failures=2)
+    writer = ExecutionEventWriter(flaky, write_attempts=3, retry_delay=0.01, flush_interval=0.01)
+
+    assert ingest(writer, [EVENT]) == (1, 0)
+    assert flaky.calls == 3
+    assert writer.failed == 0
+    assert webhook_rows(db) == {"501": "success"}
+
+
+def test_batch_that_keeps_failing_is_spooled_and_replayed(db, tmp_path):
+    spool = str(tmp_path / "spool.ndjson")
+    broken = FailingDatabase(db, failures=100)
+    writer = ExecutionEventWriter(broken, write_attempts=2, retry_delay=0.01,
+                                  flush_interval=0.01, spool_path=spool)
+    events = [EVENT, {**EVENT, "execution_id": "502", "workflow_id": "nope"}]
+
+    assert ingest(writer, events) == (2, 0)
+    assert writer.failed == 2
+    assert writer.totals["spooled"] == 2
+    assert [record["n8n_execution_id"] for _, record in read_spool(spool)] == ["501", "502"]
+    assert webhook_rows(db) == {}
+
+    # El próximo arranque repone el spool con la base ya sana
+    restarted = ExecutionEventWriter(db, flush_interval=0.01, spool_path=spool)
+    ingest(restarted, [])
+    assert webhook_rows(db) == {"501": "success"}
+    assert restarted.totals["unknown_workflow"] == 1
+    assert not (tmp_path / "spool.ndjson").exists()
+    assert not (tmp_path / "spool.ndjson.replay").exists()
@@ -0,0 +1,74 @@
+"""
+GET /api/workflows/: ETag y cuerpo siempre de la misma versión, aunque la
+cache de lecturas de este proceso no se haya enterado todavía de una
+escritura hecha por otro worker.
+
+Uso (desde backend/):
+    python -m pytest tests/test_workflows_etag.py
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.cache import TTLCache
+from app.database import create_database, get_database
+from app.routers import workflows
+
+
+@pytest.fixture
+def dbs(tmp_path):
+    """Dos procesos sobre el mismo archivo: este (con cache) y otro worker"""
+    url = f"sqlite:///{tmp_path / 'etag.db'}"
+    local = create_database(url, cache=TTLCache())
+    local.seed_sample_data()
+    other = create_database(url)
+    yield local, other
+    local.close()
+    other.close()
+
+
+@pytest.fixture
+def client(dbs):
+    app = FastAPI()
+    app.include_router(workflows.router)
+    app.dependency_overrides[get_database] = lambda: dbs[0]
+    return TestClient(app)
+
+
+def rename(db, name):
+    db.upsert_workflows([{"id": "wf-001", "n8n_id": "1", "name": name, "status": "active",
+                          "created_at": None, "triggers": "[]", "actions": "[]",
+                          "n8n_updated_at": name}])
+
+
+def test_write_from_another_worker_is_never_served_with_a_stale_body(dbs, client):
+    local, other = dbs
+    first = client.get("/api/workflows/")
+    assert first.status_code == 200
+
+    # La cache de este proceso sigue con el cuerpo anterior (nadie la invalidó)
+    rename(other, "Renombrado")
+    second = client.get("/api/workflows/", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.headers["etag"] != first.headers["etag"]
+    assert "Renombrado" in {w["name"] for w in second.json()}
+
+    third = client.get("/api/workflows/", headers={"If-None-Match": second.headers["etag"]})
+    assert third.status_code == 304
+
+
+@pytest.mark.parametrize("header, matches", [
+    ('{etag}', True),
+    ('W/{etag}', True),
+    ('"otro", {etag}', True),
+    ('"otro",W/{etag}', True),
+    ('*', True),
+    ('"otro"', False),
+    ('{unquoted}', False),
+    ('{etag_prefix}', False),
+])
+def test_if_none_match_lists_weak_tags_and_wildcard(client, header, matches):
+    etag = client.get("/api/workflows/").headers["etag"]
+    value = header.format(etag=etag, unquoted=etag.strip('"'), etag_prefix=etag[:-2] + '"')
+    response = client.get("/api/workflows/", headers={"If-None-Match": value})
+    assert response.status_code == (304 if matches else 200)
@@ -1,14 +1,73 @@
 // hooks/useWorkflows.ts
-import useSWR from 'swr'
-import { workflowAPI, executionAPI } from '@/lib/api'
+import { useEffect, useState } from 'react'
+import useSWR, { mutate } from 'swr'
+import { workflowAPI, executionAPI, EVENTS_URL } from '@/lib/api'
 import type { Workflow, DashboardStats, Execution } from '@/lib/types'
 
+// Con el flujo SSE conectado el polling queda sólo como respaldo
+const LIVE_FALLBACK_INTERVAL = 60000
+
+// Una sola conexión SSE compartida por todos los hooks de la página
+let eventSource: EventSource | null = null
+let liveSubscribers = 0
+const connectionListeners = new Set<(connected: boolean) => void>()
+
+function isKey(key: unknown, ...names: string[]) {
+  return Array.isArray(key) && names.includes(key[0])
+}
+
+function openEventSource() {
+  const source = new EventSource(EVENTS_URL)
+  const notify = (connected: boolean) => connectionListeners.forEach((listener) => listener(connected))
+
+  source.onopen = () => notify(true)
+  source.onerror = () => notify(false) // EventSource reintenta solo
+
+  source.addEventListener('stats', (event) => {
+    const { stats } = JSON.parse((event as MessageEvent).data)
+    mutate('dashboard-stats', stats, { revalidate: false })
+  })
+  source.addEventListener('executions', () => {
+    mutate((key) => isKey(key, 'executions', 'recent-executions'))
+  })
+  source.addEventListener('workflows', () => {
+    mutate((key) => isKey(key, 'workflows'))
+  })
+
+  return source
+}
+
+function useLiveUpdates() {
+  const [connected, setConnected] = useState(false)
+
+  useEffect(() => {
+    if (typeof window === 'undefined' || !('EventSource' in window)) return
+
+    connectionListeners.add(setConnected)
+    liveSubscribers += 1
+    if (!eventSource) eventSource = openEventSource()
+    setConnected(eventSource.readyState === EventSource.OPEN)
+
+    return () => {
+      connectionListeners.delete(setConnected)
+      liveSubscribers -= 1
+      if (liveSubscribers === 0 && eventSource) {
+        eventSource.close()
+        eventSource = null
+      }
+    }
+  }, [])
+
+  return connected
+}
+
 export function useWorkflows(filters?: { category?: string; status?: string }) {
+  const live = useLiveUpdates()
   const { data, error, mutate } = useSWR(
     ['workflows', filters],
     () => workflowAPI.getAll(filters),
     {
-      refreshInterval: 10000, // Actualizar cada 10 segundos
+      refreshInterval: live ? LIVE_FALLBACK_INTERVAL : 10000, // Sin SSE: cada 10 segundos
       revalidateOnFocus: true,
       revalidateOnReconnect: true
     }
@@ -23,11 +82,12 @@ export function useWorkflows(filters?: { category?: string; status?: string }) {
 }
 
 export function useDashboardStats() {
+  const live = useLiveUpdates()
   const { data, error, mutate } = useSWR(
     'dashboard-stats',
     workflowAPI.getStats,
     {
-      refreshInterval: 5000, // Actualizar cada 5 segundos
+      refreshInterval: live ? LIVE_FALLBACK_INTERVAL : 5000, // Sin SSE: cada 5 segundos
       revalidateOnFocus: true
     }
   )
@@ -41,11 +101,12 @@ export function useDashboardStats() {
 }
 
 export function useExecutions(workflowId?: string, limit: number = 50) {
+  const live = useLiveUpdates()
   const { data, error, mutate } = useSWR(
     ['executions', workflowId, limit],
     () => executionAPI.getAll(workflowId, limit),
     {
-      refreshInterval: 3000, // Actualizar cada 3 segundos
+      refreshInterval: live ? LIVE_FALLBACK_INTERVAL : 3000, // Sin SSE: cada 3 segundos
       revalidateOnFocus: true
     }
   )
@@ -59,11 +120,12 @@ export function useExecutions(workflowId?: string, limit: number = 50) {
 }
 
 export function useRecentExecutions(limit: number = 10) {
+  const live = useLiveUpdates()
   const { data, error, mutate } = useSWR(
     ['recent-executions', limit],
     () => executionAPI.getRecent(limit),
     {
-      refreshInterval: 2000, // Actualizar cada 2 segundos
+      refreshInterval: live ? LIVE_FALLBACK_INTERVAL : 2000, // Sin SSE: cada 2 segundos
       revalidateOnFocus: true
     }
   )
@@ -1,6 +1,9 @@
 // lib/api.ts
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
 
+// Flujo SSE con actualizaciones en vivo (ejecuciones, workflows y estadísticas)
+export const EVENTS_URL = `${API_BASE_URL}/api/events/`
+
 class APIError extends Error {
   constructor(message: string, public status?: number) {
     super(message)